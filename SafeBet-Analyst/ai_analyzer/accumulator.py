@@ -0,0 +1,168 @@
+"""
+SafeBet Analyst - Accumulator Builder
+Builds multi-leg accumulators (one leg per match) that reach a target combined odd
+while maximizing joint probability or expected return
+"""
+
+import math
+import numpy as np
+
+
+# Width of a log-odds bucket; leg odds are rounded down to a bucket so a
+# slip that reaches the target in buckets always reaches it in real odds
+LOG_ODDS_RESOLUTION = 0.01
+MIN_LEG_ODD = 1.01
+
+
+def legs_from_prediction(prediction):
+    """
+    Get every selectable leg of a predict_match_outcome() result
+    Legs are priced at the fair odd of the model probability unless the
+    prediction carries bookmaker odds under 'market_odds'
+    """
+    markets = prediction['betting_markets']
+    home, _, away = prediction['match'].partition(" vs ")
+    market_odds = prediction.get('market_odds', {})
+
+    selections = [
+        ("Match Result", f"{home} Win", markets['MatchResult']['Win'], ('MatchResult', 'Win')),
+        ("Match Result", "Draw", markets['MatchResult']['Draw'], ('MatchResult', 'Draw')),
+        ("Match Result", f"{away} Win", markets['MatchResult']['Lose'], ('MatchResult', 'Lose')),
+    ]
+    for name, probability in markets.get('DoubleChance', {}).items():
+        selections.append(("Double Chance", name.replace("TeamA", home).replace("TeamB", away), probability, ('DoubleChance', name)))
+    for line, outcomes in markets.get('OverUnder', {}).items():
+        for side, probability in outcomes.items():
+            selections.append(("Over/Under", f"{side} {line}", probability, ('OverUnder', line, side)))
+    for side, probability in markets.get('BTTS', {}).items():
+        selections.append(("BTTS", side, probability, ('BTTS', side)))
+
+    legs = []
+    for market, selection, probability, key in selections:
+        if not probability or probability <= 0:
+            continue
+        odds = market_odds.get(key) or 100 / probability
+        if odds < MIN_LEG_ODD:
+            continue
+        legs.append({
+            "match": prediction['match'],
+            "market": market,
+            "selection": selection,
+            "probability": probability,
+            "odds": round(odds, 2)
+        })
+    return legs
+
+
+class AccumulatorBuilder:
+    def __init__(self, max_legs=5, min_leg_probability=0.0, objective="probability"):
+        """
+        objective is 'probability' (maximize the chance the slip wins) or
+        'ev' (maximize expected return per unit staked; only meaningful with
+        bookmaker odds, as every leg priced at its fair odd scores zero)
+        """
+        if objective not in ("probability", "ev"):
+            raise ValueError("objective must be 'probability' or 'ev'")
+        self.max_legs = max_legs
+        self.min_leg_probability = min_leg_probability
+        self.objective = objective
+
+    def _leg_value(self, leg):
+        """
+        Log-space score of a leg; slip scores are sums of leg scores
+        """
+        p = leg['probability'] / 100
+        if self.objective == "ev":
+            return math.log(p * leg['odds'])
+        return math.log(p)
+
+    def build(self, legs, target_odd):
+        """
+        Pick at most max_legs legs, one per match, whose combined odd is at
+        least target_odd and whose objective is highest
+
+        Solved as a multiple-choice knapsack over log-odds buckets: the state is
+        (legs used, log-odds reached, capped at the target) and each match adds
+        one of its legs or nothing. Runs in O(matches x legs x max_legs x buckets).
+        Returns None when no combination reaches the target.
+        """
+        buckets = max(1, math.ceil(math.log(target_odd) / LOG_ODDS_RESOLUTION - 1e-9))
+
+        groups = {}
+        for leg in legs:
+            if leg['probability'] < self.min_leg_probability or leg['odds'] < MIN_LEG_ODD:
+                continue
+            weight = int(math.log(leg['odds']) / LOG_ODDS_RESOLUTION)
+            if weight > 0:
+                groups.setdefault(leg['match'], []).append((min(weight, buckets), self._leg_value(leg), leg))
+        matches = list(groups.values())
+        if not matches:
+            return None
+
+        max_legs = self.max_legs
+        best = np.full((max_legs + 1, buckets + 1), -np.inf)
+        best[0, 0] = 0.0
+        history = []
+
+        for options in matches:
+            updated = best.copy()
+            choice = np.full(best.shape, -1, dtype=np.int16)
+            previous = np.zeros(best.shape, dtype=np.int32)
+            source = best[:-1]
+
+            for j, (weight, value, _) in enumerate(options):
+                candidate = np.full(source.shape, -np.inf)
+                origin = np.zeros(source.shape, dtype=np.int32)
+                # States below the target move up by the leg's weight
+                candidate[:, weight:buckets] = source[:, :buckets - weight] + value
+                origin[:, weight:buckets] = np.arange(buckets - weight)
+                # Everything that would pass the target lands in the capped bucket
+                tail = source[:, buckets - weight:]
+                tail_best = tail.argmax(axis=1)
+                candidate[:, buckets] = tail[np.arange(max_legs), tail_best] + value
+                origin[:, buckets] = buckets - weight + tail_best
+
+                improved = candidate > updated[1:]
+                updated[1:][improved] = candidate[improved]
+                choice[1:][improved] = j
+                previous[1:][improved] = origin[improved]
+
+            history.append((choice, previous))
+            best = updated
+
+        # Fewest legs wins ties
+        reached = best[1:, buckets]
+        if not np.isfinite(reached).any():
+            return None
+        legs_used = int(np.argmax(reached == reached.max())) + 1
+
+        chosen = []
+        bucket = buckets
+        for options, (choice, previous) in zip(reversed(matches), reversed(history)):
+            j = choice[legs_used, bucket]
+            if j < 0:
+                continue
+            chosen.append(options[j][2])
+            bucket = previous[legs_used, bucket]
+            legs_used -= 1
+        chosen.reverse()
+
+        return self._slip(chosen, target_odd)
+
+    def build_slips(self, legs, targets=(2.0, 5.0, 10.0)):
+        """
+        Build the best accumulator for each target combined odd
+        """
+        return {target: self.build(legs, target) for target in targets}
+
+    def _slip(self, legs, target_odd):
+        combined_odd = math.prod(leg['odds'] for leg in legs)
+        joint_probability = math.prod(leg['probability'] / 100 for leg in legs)
+        return {
+            "target_odd": target_odd,
+            "legs": legs,
+            "combined_odd": round(combined_odd, 2),
+            "joint_probability": round(joint_probability * 100, 2),
+            "expected_return": round(joint_probability * combined_odd - 1, 3),
+            "objective": self.objective
+        }
@@ -0,0 +1,68 @@
+"""
+SafeBet Analyst - Analysis Cache
+LRU cache of LLM bet-slip analyses keyed by the bet fields the prompt uses,
+so repeated analyses of an unchanged slip skip the LLM call
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from utils.snapshots import snapshot_manager
+
+
+# Bet fields that appear in the bet-slip prompt
+ANALYSIS_KEY_FIELDS = ("match_name", "bet_type", "odds", "stake", "status", "potential_win", "actual_win")
+
+
+def analysis_key(bet_data):
+    return json.dumps([bet_data.get(field) for field in ANALYSIS_KEY_FIELDS], default=str)
+
+
+class AnalysisCache:
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, bet_data):
+        """
+        Cached analysis for a bet (a copy), or None
+        """
+        key = analysis_key(bet_data)
+        with self.lock:
+            analysis = self.entries.get(key)
+            if analysis is None:
+                return None
+            self.entries.move_to_end(key)
+        return dict(analysis)
+
+    def put(self, bet_data, analysis):
+        """
+        Cache an analysis; fallback results are never cached
+        """
+        if not isinstance(analysis, dict) or analysis.get("is_fallback"):
+            return
+        with self.lock:
+            self.entries[analysis_key(bet_data)] = dict(analysis)
+            self.entries.move_to_end(analysis_key(bet_data))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def dump(self):
+        with self.lock:
+            return list(self.entries.items())
+
+    def load(self, items):
+        with self.lock:
+            for key, analysis in items:
+                self.entries[key] = analysis
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+# Global instance shared by all predictors, persisted in warm-start snapshots
+analysis_cache = AnalysisCache()
+snapshot_manager.register("analysis_cache", analysis_cache.dump, analysis_cache.load)
@@ -0,0 +1,307 @@
+"""
+SafeBet Analyst - Backtesting
+Replays historical fixtures through UpcomingEventPredictor and scores the
+predictions: accuracy, Brier score, calibration and ROI per market
+"""
+
+import os
+import sys
+import json
+import time
+import random
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.team_ratings import TeamRatingStore
+
+
+REQUIRED_COLUMNS = ["date", "home_team", "away_team", "home_goals", "away_goals"]
+# Optional bookmaker odds used for ROI
+ODDS_COLUMNS = ["odds_home", "odds_draw", "odds_away", "odds_over25", "odds_under25", "odds_btts_yes", "odds_btts_no"]
+PROBABILITY_COLUMNS = ["p_home", "p_draw", "p_away", "p_over25", "p_btts_yes"]
+CALIBRATION_BINS = 10
+PLACEHOLDER_PLAYERS = ["Player 1", "Player 2", "Player 3"]
+
+
+def load_fixtures(path):
+    """
+    Load historical fixtures and results from a CSV or Parquet file, oldest first
+    """
+    if path.endswith(".parquet"):
+        fixtures = pd.read_parquet(path)
+    else:
+        fixtures = pd.read_csv(path)
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in fixtures.columns]
+    if missing:
+        raise ValueError(f"Fixture file is missing columns: {', '.join(missing)}")
+
+    fixtures["date"] = pd.to_datetime(fixtures["date"])
+    return fixtures.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def build_match_records(fixtures, form_length=5, h2h_length=5):
+    """
+    Build predictor inputs from results known before each kick-off:
+    rolling form (W=3, D=1, L=0, oldest first), the last head-to-head meetings
+    and pre-match Elo ratings
+    Fixtures of a team without an earlier result carry no form or head-to-head
+    data, so they are predicted from ratings alone like such live fixtures
+    """
+    form = defaultdict(lambda: deque(maxlen=form_length))
+    meetings = defaultdict(lambda: deque(maxlen=h2h_length))
+    ratings = TeamRatingStore()
+    records = []
+
+    columns = [fixtures[c].to_numpy() for c in ("date", "home_team", "away_team", "home_goals", "away_goals")]
+    leagues = fixtures["league"].to_numpy() if "league" in fixtures.columns else None
+    for i, (date, home, away, home_goals, away_goals) in enumerate(zip(*columns)):
+        pair = frozenset((home, away))
+        winners = list(meetings[pair])
+        record = {
+            "match_id": f"bt_{i}",
+            "home_team": home,
+            "away_team": away,
+            "league": leagues[i] if leagues is not None else "Unknown",
+            "date": pd.Timestamp(date).strftime("%Y-%m-%d %H:%M"),
+            "ratings": {"home": ratings.rating(home), "away": ratings.rating(away)},
+            "key_players_home": PLACEHOLDER_PLAYERS,
+            "key_players_away": PLACEHOLDER_PLAYERS,
+            "venue": f"{home} Stadium"
+        }
+        if form[home] and form[away]:
+            record["h2h_last_5"] = {
+                "home_wins": winners.count(home),
+                "away_wins": winners.count(away),
+                "draws": winners.count(None)
+            }
+            record["recent_form"] = {"home": list(form[home]), "away": list(form[away])}
+        records.append(record)
+
+        # Results become visible only after the fixture has been predicted
+        ratings.record_result(None, home, away, home_goals, away_goals, save=False)
+        if home_goals > away_goals:
+            form[home].append(3)
+            form[away].append(0)
+            meetings[pair].append(home)
+        elif home_goals < away_goals:
+            form[home].append(0)
+            form[away].append(3)
+            meetings[pair].append(away)
+        else:
+            form[home].append(1)
+            form[away].append(1)
+            meetings[pair].append(None)
+
+    return records
+
+
+def _replay_chunk(args):
+    """
+    Predict one chunk of fixtures; runs in a worker process
+    """
+    from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
+    from utils.lineup_index import LineupIndex
+    from ai_analyzer.calibration import ProbabilityCalibrator
+
+    records, start, seed, params = args
+    # A private lineup index keeps replayed fixtures out of the live one, and an
+    # empty calibrator keeps replays independent of what the app has learned
+    predictor = UpcomingEventPredictor(params=params, lineups=LineupIndex(), calibrator=ProbabilityCalibrator())
+    rows = []
+    for offset, record in enumerate(records):
+        # The predictor draws news impacts from `random`; seeding per fixture
+        # keeps results independent of chunk size and worker count
+        random.seed(seed * 1_000_003 + start + offset)
+        markets = predictor.predict_match_outcome(record)['betting_markets']
+        rows.append((
+            markets['MatchResult']['Win'] / 100,
+            markets['MatchResult']['Draw'] / 100,
+            markets['MatchResult']['Lose'] / 100,
+            markets['OverUnder']['2.5']['Over'] / 100,
+            markets['BTTS']['Yes'] / 100
+        ))
+    return rows
+
+
+def replay(records, workers=None, chunk_size=500, seed=0, params=None):
+    """
+    Run every record through the predictor in multi-process chunks
+    Returns an array of shape (len(records), 5) in PROBABILITY_COLUMNS order
+    params defaults to the predictor's configured parameters
+    """
+    if params is None:
+        from ai_analyzer.upcoming_predictor import load_predictor_params
+        params = load_predictor_params()
+    chunks = [(records[i:i + chunk_size], i, seed, params) for i in range(0, len(records), chunk_size)]
+    workers = workers or min(len(chunks), os.cpu_count() or 1)
+
+    if workers <= 1 or len(chunks) <= 1:
+        results = [_replay_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_replay_chunk, chunks))
+
+    rows = [row for chunk_rows in results for row in chunk_rows]
+    return np.array(rows, dtype=float).reshape(-1, len(PROBABILITY_COLUMNS))
+
+
+def _calibration_curve(predicted, observed, bins=CALIBRATION_BINS):
+    """
+    Mean predicted probability vs observed frequency per probability bin
+    """
+    index = np.clip((predicted * bins).astype(int), 0, bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    predicted_sum = np.bincount(index, weights=predicted, minlength=bins)
+    observed_sum = np.bincount(index, weights=observed, minlength=bins)
+    curve = []
+    for b in np.nonzero(counts)[0]:
+        curve.append({
+            "bin": f"{b / bins:.1f}-{(b + 1) / bins:.1f}",
+            "predicted": round(float(predicted_sum[b] / counts[b]), 3),
+            "observed": round(float(observed_sum[b] / counts[b]), 3),
+            "count": int(counts[b])
+        })
+    return curve
+
+
+def _roi(odds, won):
+    """
+    Flat one-unit stake on every pick with a known price
+    """
+    priced = ~np.isnan(odds)
+    bets = int(priced.sum())
+    if not bets:
+        return None, 0
+    profit = np.where(won[priced], odds[priced] - 1, -1.0).sum()
+    return round(float(profit / bets), 4), bets
+
+
+def _binary_market(p, outcome, odds_yes, odds_no):
+    pick_yes = p >= 0.5
+    won = pick_yes == outcome.astype(bool)
+    roi, bets = _roi(np.where(pick_yes, odds_yes, odds_no), won)
+    return {
+        "accuracy": round(float(won.mean()), 4),
+        "brier": round(float(np.mean((p - outcome) ** 2)), 4),
+        "calibration": _calibration_curve(p, outcome),
+        "roi": roi,
+        "bets": bets
+    }
+
+
+def score_predictions(probabilities, fixtures):
+    """
+    Vectorized scoring of predicted probabilities against results
+    probabilities: array (n, 5) in PROBABILITY_COLUMNS order
+    """
+    probabilities = np.asarray(probabilities, dtype=float)
+    home_goals = fixtures["home_goals"].to_numpy(dtype=float)
+    away_goals = fixtures["away_goals"].to_numpy(dtype=float)
+
+    def odds(column):
+        if column in fixtures.columns:
+            return fixtures[column].to_numpy(dtype=float)
+        return np.full(len(fixtures), np.nan)
+
+    # Match result: 0 home, 1 draw, 2 away
+    result = np.where(home_goals > away_goals, 0, np.where(home_goals == away_goals, 1, 2))
+    p_result = probabilities[:, :3]
+    outcome_matrix = np.eye(3)[result]
+    pick = p_result.argmax(axis=1)
+    won = pick == result
+    result_odds = np.stack([odds("odds_home"), odds("odds_draw"), odds("odds_away")], axis=1)
+    roi, bets = _roi(result_odds[np.arange(len(pick)), pick], won)
+
+    markets = {
+        "MatchResult": {
+            "accuracy": round(float(won.mean()), 4),
+            "brier": round(float(np.mean(np.sum((p_result - outcome_matrix) ** 2, axis=1))), 4),
+            "calibration": _calibration_curve(p_result.ravel(), outcome_matrix.ravel()),
+            "roi": roi,
+            "bets": bets
+        },
+        "OverUnder 2.5": _binary_market(probabilities[:, 3], (home_goals + away_goals > 2.5).astype(float),
+                                        odds("odds_over25"), odds("odds_under25")),
+        "BTTS": _binary_market(probabilities[:, 4], ((home_goals > 0) & (away_goals > 0)).astype(float),
+                               odds("odds_btts_yes"), odds("odds_btts_no"))
+    }
+    return {"matches": len(fixtures), "markets": markets}
+
+
+def run_backtest(fixtures, workers=None, chunk_size=500, seed=0, params=None):
+    """
+    Replay fixtures (DataFrame or path) and score the predictions
+    """
+    if isinstance(fixtures, str):
+        fixtures = load_fixtures(fixtures)
+    start = time.perf_counter()
+    records = build_match_records(fixtures)
+    probabilities = replay(records, workers=workers, chunk_size=chunk_size, seed=seed, params=params)
+    report = score_predictions(probabilities, fixtures)
+    report["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def generate_synthetic_season(n_teams=20, seasons=1, margin=1.05, seed=0):
+    """
+    Double round-robin seasons with Poisson scores from latent team strengths
+    and bookmaker odds priced from the true probabilities plus a margin
+    """
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {i + 1:02d}" for i in range(n_teams)]
+    attack = rng.normal(0, 0.3, n_teams)
+    defence = rng.normal(0, 0.3, n_teams)
+
+    pairs = [(h, a) for h in range(n_teams) for a in range(n_teams) if h != a]
+    fixtures_per_season = [rng.permutation(len(pairs)) for _ in range(seasons)]
+    home_index = np.concatenate([[pairs[i][0] for i in order] for order in fixtures_per_season])
+    away_index = np.concatenate([[pairs[i][1] for i in order] for order in fixtures_per_season])
+
+    n = len(home_index)
+    home_rate = np.exp(0.25 + 0.15 + attack[home_index] - defence[away_index])
+    away_rate = np.exp(0.15 + attack[away_index] - defence[home_index])
+    home_goals = rng.poisson(home_rate)
+    away_goals = rng.poisson(away_rate)
+
+    # True market probabilities from the Poisson score grid
+    goals = np.arange(11)
+    log_fact = np.cumsum(np.log(np.maximum(goals, 1)))
+    home_pmf = np.exp(goals * np.log(home_rate[:, None]) - home_rate[:, None] - log_fact)
+    away_pmf = np.exp(goals * np.log(away_rate[:, None]) - away_rate[:, None] - log_fact)
+    grid = home_pmf[:, :, None] * away_pmf[:, None, :]
+    diff = goals[:, None] - goals[None, :]
+    total = goals[:, None] + goals[None, :]
+    p_home = grid[:, diff > 0].sum(axis=1)
+    p_draw = grid[:, diff == 0].sum(axis=1)
+    p_away = grid[:, diff < 0].sum(axis=1)
+    p_over = grid[:, total > 2.5].sum(axis=1)
+    p_btts = home_pmf[:, 1:].sum(axis=1) * away_pmf[:, 1:].sum(axis=1)
+
+    def price(p):
+        return np.round(np.maximum(1.01, 1 / (np.clip(p, 0.01, 0.99) * margin)), 2)
+
+    start = pd.Timestamp("2023-08-01 15:00")
+    return pd.DataFrame({
+        "date": start + pd.to_timedelta(np.arange(n) // 10 * 24, unit="h"),
+        "league": "Synthetic League",
+        "home_team": np.array(teams)[home_index],
+        "away_team": np.array(teams)[away_index],
+        "home_goals": home_goals,
+        "away_goals": away_goals,
+        "odds_home": price(p_home),
+        "odds_draw": price(p_draw),
+        "odds_away": price(p_away),
+        "odds_over25": price(p_over),
+        "odds_under25": price(1 - p_over),
+        "odds_btts_yes": price(p_btts),
+        "odds_btts_no": price(1 - p_btts)
+    })
+
+
+if __name__ == "__main__":
+    # python -m ai_analyzer.backtest [fixtures.csv|fixtures.parquet]
+    source = sys.argv[1] if len(sys.argv) > 1 else generate_synthetic_season()
+    report = run_backtest(source)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,163 @@
+"""
+SafeBet Analyst - Probability Calibration
+Maps raw model probabilities to observed hit rates using lookup tables fitted
+on tracked prediction results, one per (market, VIP section)
+"""
+
+import threading
+from collections import deque
+import numpy as np
+
+
+MAX_KNOTS = 64
+# Samples kept per (market, VIP section); refits only see the most recent ones
+MAX_SAMPLES = 5000
+
+
+def fit_isotonic(probabilities, outcomes, max_knots=MAX_KNOTS):
+    """
+    Pool-adjacent-violators fit; returns (x, y) knots of a non-decreasing map
+    """
+    # Identical probabilities start in one block so knots stay strictly increasing
+    x, inverse = np.unique(np.asarray(probabilities, dtype=float), return_inverse=True)
+    y = np.bincount(inverse, weights=np.asarray(outcomes, dtype=float))
+    counts = np.bincount(inverse)
+
+    # Blocks of (sum of x, sum of y, count), merged while they violate monotonicity
+    blocks = []
+    for xi, yi, ni in zip(x, y, counts):
+        blocks.append([xi * ni, yi, ni])
+        while len(blocks) > 1 and blocks[-2][1] / blocks[-2][2] >= blocks[-1][1] / blocks[-1][2]:
+            last = blocks.pop()
+            blocks[-1][0] += last[0]
+            blocks[-1][1] += last[1]
+            blocks[-1][2] += last[2]
+
+    knots_x = np.array([b[0] / b[2] for b in blocks])
+    knots_y = np.array([b[1] / b[2] for b in blocks])
+    if len(knots_x) > max_knots:
+        keep = np.unique(np.linspace(0, len(knots_x) - 1, max_knots).astype(int))
+        knots_x, knots_y = knots_x[keep], knots_y[keep]
+    return knots_x, knots_y
+
+
+def fit_platt(probabilities, outcomes, grid_size=101, iterations=25, l2=1e-3):
+    """
+    Logistic fit on the logit of the raw probability, tabulated on a grid
+    """
+    p = np.clip(np.asarray(probabilities, dtype=float), 1e-4, 1 - 1e-4)
+    y = np.asarray(outcomes, dtype=float)
+    features = np.column_stack([np.log(p / (1 - p)), np.ones(len(p))])
+
+    def loss(w):
+        z = features @ w
+        return np.sum(np.logaddexp(0, z) - y * z) + l2 / 2 * w @ w
+
+    # Newton steps, halved until the penalized log loss improves
+    weights = np.array([1.0, 0.0])
+    current = loss(weights)
+    for _ in range(iterations):
+        fitted = 1 / (1 + np.exp(-np.clip(features @ weights, -30, 30)))
+        gradient = features.T @ (fitted - y) + l2 * weights
+        hessian = features.T @ (features * (fitted * (1 - fitted))[:, None]) + l2 * np.eye(2)
+        step = np.linalg.solve(hessian, gradient)
+        scale = 1.0
+        while scale > 1e-4 and loss(weights - scale * step) > current:
+            scale /= 2
+        weights = weights - scale * step
+        previous, current = current, loss(weights)
+        if previous - current < 1e-9:
+            break
+
+    knots_x = np.linspace(0.001, 0.999, grid_size)
+    knots_y = 1 / (1 + np.exp(-np.clip(weights[0] * np.log(knots_x / (1 - knots_x)) + weights[1], -30, 30)))
+    return knots_x, knots_y
+
+
+class ProbabilityCalibrator:
+    def __init__(self, method="isotonic", min_samples=30, max_samples=MAX_SAMPLES):
+        """
+        Each table is fitted on a rolling window of its last max_samples results,
+        so memory and refit time stay bounded as results accumulate
+        """
+        if method not in ("isotonic", "platt"):
+            raise ValueError("method must be 'isotonic' or 'platt'")
+        self.method = method
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.samples = {}
+        self.tables = {}
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+    def record(self, market, vip_section, probability, outcome):
+        """
+        Add one resolved prediction (probability 0-1, outcome True/False)
+        Samples also go to the market-wide (vip_section=None) table
+        """
+        self.record_many([(market, vip_section, probability, outcome)])
+
+    def record_many(self, samples):
+        """
+        Add many (market, vip_section, probability, outcome) samples under a single lock
+        """
+        with self.lock:
+            for market, vip_section, probability, outcome in samples:
+                for key in {(market, vip_section), (market, None)}:
+                    self.samples.setdefault(key, (deque(maxlen=self.max_samples), deque(maxlen=self.max_samples)))
+                    self.samples[key][0].append(float(probability))
+                    self.samples[key][1].append(1.0 if outcome else 0.0)
+                    self.dirty.add(key)
+
+    def _table(self, key):
+        """
+        Lookup table for a key, refitting it first if new samples arrived
+        """
+        if key in self.dirty:
+            with self.lock:
+                probabilities, outcomes = self.samples[key]
+                if len(probabilities) >= self.min_samples:
+                    fit = fit_isotonic if self.method == "isotonic" else fit_platt
+                    self.tables[key] = fit(np.fromiter(probabilities, float), np.fromiter(outcomes, float))
+                self.dirty.discard(key)
+        return self.tables.get(key)
+
+    def is_fitted(self, market, vip_section=None):
+        return self._table((market, vip_section)) is not None or self._table((market, None)) is not None
+
+    def apply(self, market, vip_section, probabilities):
+        """
+        Calibrate probabilities (0-1, scalar or array) with the section table,
+        falling back to the market-wide table; unchanged when neither is fitted
+        """
+        table = self._table((market, vip_section))
+        if table is None and vip_section is not None:
+            table = self._table((market, None))
+        if table is None:
+            return probabilities
+        calibrated = np.interp(probabilities, table[0], table[1])
+        return float(calibrated) if np.ndim(calibrated) == 0 else calibrated
+
+    def reset(self):
+        """
+        Drop all samples and fitted tables
+        """
+        with self.lock:
+            self.samples.clear()
+            self.tables.clear()
+            self.dirty.clear()
+
+    def export_tables(self):
+        """
+        Fitted tables as plain lists, e.g. for display or saving
+        """
+        for key in list(self.dirty):
+            self._table(key)
+        return {
+            f"{market}/{section or 'all'}": {"x": [round(v, 4) for v in xs], "y": [round(v, 4) for v in ys]}
+            for (market, section), (xs, ys) in self.tables.items()
+        }
+
+
+# Global instance fed by LiveScoreUpdater.track_prediction_result
+calibrator = ProbabilityCalibrator()
@@ -0,0 +1,154 @@
+"""
+SafeBet Analyst - In-Play Model
+Re-prices 1X2, Over/Under and BTTS for every live match from the score, minute,
+red cards and pre-match goal expectations, using Poisson goal rates for the
+remaining time. All live matches are priced in one vectorized pass.
+"""
+
+import threading
+import numpy as np
+from utils.metrics import metrics
+from utils.live_score_updater import live_updater
+
+
+MATCH_MINUTES = 90
+MAX_REMAINING_GOALS = 10
+OVER_UNDER_LINES = (0.5, 1.5, 2.5, 3.5)
+# Pre-match goal expectations for matches the predictor has not seen
+DEFAULT_EXPECTED_GOALS = (1.4, 1.1)
+# Scoring rate multipliers per red card: the short-handed side scores less, the other side more
+RED_CARD_OWN_FACTOR = 0.67
+RED_CARD_OPPONENT_FACTOR = 1.2
+
+
+def _poisson_pmf(rates, max_goals=MAX_REMAINING_GOALS):
+    """
+    P(k goals) for k = 0..max_goals, one row per rate
+    """
+    pmf = np.empty((len(rates), max_goals + 1))
+    pmf[:, 0] = np.exp(-rates)
+    for k in range(1, max_goals + 1):
+        pmf[:, k] = pmf[:, k - 1] * rates / k
+    return pmf
+
+
+def inplay_probabilities(home_xg, away_xg, home_goals, away_goals, minute, home_reds=0, away_reds=0):
+    """
+    In-play probabilities (0-1) for arrays of live matches
+    Returns a dict of arrays: home/draw/away, over_<line> per OVER_UNDER_LINES and btts
+    """
+    home_goals = np.asarray(home_goals, dtype=float)
+    away_goals = np.asarray(away_goals, dtype=float)
+    remaining = np.clip(MATCH_MINUTES - np.asarray(minute, dtype=float), 0, MATCH_MINUTES) / MATCH_MINUTES
+    home_reds = np.asarray(home_reds, dtype=float)
+    away_reds = np.asarray(away_reds, dtype=float)
+
+    home_rate = np.asarray(home_xg, dtype=float) * remaining * RED_CARD_OWN_FACTOR ** home_reds * RED_CARD_OPPONENT_FACTOR ** away_reds
+    away_rate = np.asarray(away_xg, dtype=float) * remaining * RED_CARD_OWN_FACTOR ** away_reds * RED_CARD_OPPONENT_FACTOR ** home_reds
+
+    # Joint distribution of the goals still to come, shape (matches, home goals, away goals)
+    joint = _poisson_pmf(home_rate)[:, :, None] * _poisson_pmf(away_rate)[:, None, :]
+    extra = np.arange(MAX_REMAINING_GOALS + 1)
+    final_home = home_goals[:, None, None] + extra[None, :, None]
+    final_away = away_goals[:, None, None] + extra[None, None, :]
+
+    result = {
+        "home": (joint * (final_home > final_away)).sum(axis=(1, 2)),
+        "draw": (joint * (final_home == final_away)).sum(axis=(1, 2)),
+        "away": (joint * (final_home < final_away)).sum(axis=(1, 2)),
+        "btts": (joint * ((final_home > 0) & (final_away > 0))).sum(axis=(1, 2))
+    }
+    total = final_home + final_away
+    for line in OVER_UNDER_LINES:
+        result[f"over_{line}"] = (joint * (total > line)).sum(axis=(1, 2))
+    return result
+
+
+def _minute_played(match):
+    """
+    Minutes played from a live data entry ('VS' before kick-off, 'FT' at full time)
+    """
+    if match['status'] == "FINISHED":
+        return MATCH_MINUTES
+    if match['status'] != "LIVE":
+        return 0
+    try:
+        return min(MATCH_MINUTES, int(match['minute']))
+    except (TypeError, ValueError):
+        return 0
+
+
+class InPlayPricer:
+    def __init__(self):
+        self.expected_goals = {}
+        self.prices = {}
+        self.lock = threading.Lock()
+
+    def set_expectations(self, match_id, home_xg, away_xg):
+        """
+        Store the pre-match goal expectations of a match
+        """
+        self.expected_goals[match_id] = (home_xg, away_xg)
+
+    def price_matches(self, live_matches):
+        """
+        Price every started match in live_matches (match_id -> live data entry)
+        Returns match_id -> betting markets in the predictor's 0-100 format
+        """
+        started = [(match_id, match) for match_id, match in live_matches.items() if match['status'] in ("LIVE", "FINISHED")]
+        if not started:
+            return {}
+
+        xg = np.array([self.expected_goals.get(match_id, DEFAULT_EXPECTED_GOALS) for match_id, _ in started], dtype=float)
+        probabilities = inplay_probabilities(
+            xg[:, 0], xg[:, 1],
+            [match['home_score'] for _, match in started],
+            [match['away_score'] for _, match in started],
+            [_minute_played(match) for _, match in started],
+            [(match.get('red_cards') or {}).get('home', 0) for _, match in started],
+            [(match.get('red_cards') or {}).get('away', 0) for _, match in started]
+        )
+        pct = {name: np.round(values * 100, 1).tolist() for name, values in probabilities.items()}
+
+        prices = {}
+        for i, (match_id, match) in enumerate(started):
+            prices[match_id] = {
+                "MatchResult": {"Win": pct["home"][i], "Draw": pct["draw"][i], "Lose": pct["away"][i]},
+                "OverUnder": {
+                    str(line): {"Over": pct[f"over_{line}"][i], "Under": round(100 - pct[f"over_{line}"][i], 1)}
+                    for line in OVER_UNDER_LINES
+                },
+                "BTTS": {"Yes": pct["btts"][i], "No": round(100 - pct["btts"][i], 1)},
+                "minute": _minute_played(match),
+                "score": f"{match['home_score']}-{match['away_score']}"
+            }
+        return prices
+
+    def on_update(self, live_matches):
+        """
+        LiveScoreUpdater update listener: re-price all live matches on every tick
+        """
+        with metrics.time("inplay_pricing_seconds", "Time to re-price live matches"):
+            prices = self.price_matches(live_matches)
+        with self.lock:
+            self.prices = prices
+
+    def markets_for(self, match_id):
+        """
+        Latest in-play markets for a match, None when it is not being priced
+        """
+        return self.prices.get(match_id)
+
+    def price(self, match_id, market, selection, line=None):
+        """
+        In-play probability (0-100) of one selection, e.g. price(match_id, "OverUnder", "Over", "2.5")
+        """
+        markets = self.prices.get(match_id)
+        if markets is None:
+            return None
+        return markets[market][line][selection] if line is not None else markets[market][selection]
+
+
+# Global instance refreshed by the app's live score updater
+inplay_pricer = InPlayPricer()
+live_updater.add_update_listener(inplay_pricer.on_update)
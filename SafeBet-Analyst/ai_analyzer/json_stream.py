@@ -0,0 +1,83 @@
+"""
+SafeBet Analyst - Incremental JSON Parsing
+Pulls top-level fields out of a JSON object while it is still being streamed
+"""
+
+import json
+
+
+class IncrementalJSONObjectParser:
+    """
+    Feed text chunks of a single JSON object; each call to feed() returns the
+    (key, value) pairs whose values completed in that chunk
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start = None
+        self.fields = {}
+        self.done = False
+
+    def feed(self, chunk):
+        completed = []
+        if self.done or not chunk:
+            return completed
+
+        self.buffer += chunk
+        while self.pos < len(self.buffer):
+            char = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                if self.depth == 1 and char == "{":
+                    self.member_start = self.pos + 1
+            elif char in "}]":
+                if self.depth == 1:
+                    self._complete_member(self.pos, completed)
+                    self.done = True
+                self.depth -= 1
+            elif char == "," and self.depth == 1:
+                self._complete_member(self.pos, completed)
+                self.member_start = self.pos + 1
+
+            self.pos += 1
+            if self.done:
+                break
+
+        return completed
+
+    def _complete_member(self, end, completed):
+        """
+        Parse one `"key": value` member of the top-level object
+        """
+        if self.member_start is None:
+            return
+        member = self.buffer[self.member_start:end].strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return
+        for key, value in parsed.items():
+            self.fields[key] = value
+            completed.append((key, value))
+
+    def result(self):
+        """
+        Get every field parsed so far
+        """
+        return dict(self.fields)
@@ -0,0 +1,179 @@
+"""
+SafeBet Analyst - LLM Client
+Dedicated OpenAI-compatible client for the Qwen API with a pooled HTTP
+connection, per-call timeouts, jittered exponential retries and a circuit breaker
+"""
+
+import os
+import time
+import random
+import threading
+import httpx
+import openai
+from utils.metrics import metrics
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is skipped because the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and skips calls
+    for `reset_timeout` seconds, then lets a single trial call through
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """
+        Check whether a call may go out right now
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let one trial call through
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    metrics.inc("llm_circuit_opened_total", 1, "Times the LLM circuit breaker opened")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+def _is_retryable(error):
+    """
+    429s, 5xx responses, timeouts and connection errors are worth retrying
+    """
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+class LLMClient:
+    def __init__(self, api_key, base_url="https://api.openai.com/v1", model="gpt-4o",
+                 timeout=20.0, connect_timeout=5.0, max_retries=3, backoff_base=0.5,
+                 backoff_max=8.0, max_connections=10, breaker=None):
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        # One pooled connection set per client, reused across calls
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout)
+        )
+        # Retries are handled here so they can share the circuit breaker
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=0,
+            timeout=timeout
+        )
+
+    @classmethod
+    def from_env(cls, api_key=None):
+        """
+        Build a client from the QWEN_* environment variables
+        """
+        api_key = api_key or os.getenv("QWEN_API_KEY") or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("QWEN_API_KEY or OPENAI_API_KEY environment variable is required")
+
+        return cls(
+            api_key=api_key,
+            base_url=os.getenv("QWEN_BASE_URL", "https://api.openai.com/v1"),
+            model=os.getenv("QWEN_MODEL", "gpt-4o"),
+            timeout=float(os.getenv("QWEN_TIMEOUT", "20")),
+            max_retries=int(os.getenv("QWEN_MAX_RETRIES", "3"))
+        )
+
+    def _backoff_delay(self, attempt, error=None):
+        """
+        Full-jitter exponential backoff, honouring Retry-After on 429s
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except (TypeError, ValueError):
+                pass
+        return delay
+
+    def create_chat_completion(self, messages, temperature=0.3, max_tokens=500, response_format=None, timeout=None, stream=False):
+        """
+        Create a chat completion, retrying transient failures
+        Raises CircuitOpenError without calling out while the breaker is open
+        """
+        if not self.breaker.allow_request():
+            metrics.inc("llm_circuit_skipped_total", 1, "LLM calls skipped by the open circuit breaker")
+            raise CircuitOpenError("LLM circuit breaker is open - skipping call")
+
+        request = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "timeout": timeout or self.timeout
+        }
+        if response_format:
+            request["response_format"] = response_format
+        if stream:
+            request["stream"] = True
+
+        last_error = None
+        answered = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self.client.chat.completions.create(**request)
+                    answered = True
+                    return response
+                except Exception as e:
+                    if not _is_retryable(e):
+                        # Bad requests are our fault, not an outage: the server answered
+                        answered = True
+                        raise
+                    last_error = e
+                    if attempt < self.max_retries:
+                        metrics.inc("llm_retries_total", 1, "LLM calls retried after a transient error")
+                        time.sleep(self._backoff_delay(attempt, e))
+            raise last_error
+        finally:
+            # Every exit records an outcome, so a half-open trial call can never leave the breaker stuck
+            if answered:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def close(self):
+        """
+        Close the pooled HTTP connections
+        """
+        self.http_client.close()
@@ -0,0 +1,181 @@
+"""
+SafeBet Analyst - Market Odds
+Ingests bookmaker odds snapshots into an indexed store and joins them to
+model predictions to find value bets in a single vectorized pass
+"""
+
+import os
+import glob
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.data_utils import calculate_expected_value_array
+
+
+SNAPSHOT_COLUMNS = ["match_id", "market", "selection", "odds", "bookmaker", "timestamp"]
+MARKET_KEYS = ["match_id", "market", "selection"]
+
+
+def flatten_predictions(predictions):
+    """
+    One row per (match_id, market, selection) with the model probability (0-100)
+    Over/Under lines become markets such as 'OverUnder 2.5'
+    """
+    rows = []
+    for pred in predictions:
+        markets = pred['betting_markets']
+        base = (pred['match_id'], pred['match'])
+        for market in ("MatchResult", "DoubleChance", "BTTS"):
+            for selection, probability in markets.get(market, {}).items():
+                rows.append(base + (market, selection, probability))
+        for line, outcomes in markets.get('OverUnder', {}).items():
+            for selection, probability in outcomes.items():
+                rows.append(base + (f"OverUnder {line}", selection, probability))
+    return pd.DataFrame(rows, columns=["match_id", "match", "market", "selection", "probability"])
+
+
+def accumulator_key(market, selection):
+    """
+    Map a (market, selection) row to the key used by legs_from_prediction()
+    """
+    if market.startswith("OverUnder "):
+        return ("OverUnder", market.split(" ", 1)[1], selection)
+    return (market, selection)
+
+
+class MarketOddsStore:
+    def __init__(self):
+        self.frame = pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+        self._best = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def ingest(self, rows):
+        """
+        Add a snapshot (list of dicts or DataFrame); the latest price per
+        bookmaker and market replaces older ones
+        """
+        snapshot = pd.DataFrame(rows)
+        if snapshot.empty:
+            return 0
+        missing = [c for c in ("match_id", "market", "selection", "odds") if c not in snapshot.columns]
+        if missing:
+            raise ValueError(f"Odds snapshot is missing columns: {', '.join(missing)}")
+        if "bookmaker" not in snapshot.columns:
+            snapshot["bookmaker"] = "default"
+        if "timestamp" not in snapshot.columns:
+            snapshot["timestamp"] = datetime.now().isoformat()
+
+        snapshot = snapshot[SNAPSHOT_COLUMNS].astype({"match_id": str, "market": str, "selection": str, "bookmaker": str})
+        snapshot["odds"] = pd.to_numeric(snapshot["odds"], errors="coerce")
+        snapshot = snapshot[snapshot["odds"] > 1]
+
+        combined = pd.concat([self.frame, snapshot], ignore_index=True) if len(self.frame) else snapshot
+        self.frame = (combined.sort_values("timestamp", kind="stable")
+                      .drop_duplicates(MARKET_KEYS + ["bookmaker"], keep="last")
+                      .reset_index(drop=True))
+        self._best = None
+        return len(snapshot)
+
+    def ingest_file(self, path):
+        """
+        Ingest a .json (list of rows) or .csv snapshot file
+        """
+        if path.endswith(".csv"):
+            return self.ingest(pd.read_csv(path, dtype={"match_id": str, "selection": str}))
+        with open(path, "r") as f:
+            return self.ingest(json.load(f))
+
+    def ingest_directory(self, directory):
+        """
+        Ingest every snapshot file in a directory, oldest file first
+        """
+        paths = sorted(glob.glob(os.path.join(directory, "*.json")) + glob.glob(os.path.join(directory, "*.csv")),
+                       key=os.path.getmtime)
+        total = 0
+        for path in paths:
+            try:
+                total += self.ingest_file(path)
+            except Exception as e:
+                print(f"Error ingesting odds snapshot {path}: {str(e)}")
+        return total
+
+    def best_prices(self):
+        """
+        Best available price per market, indexed by (match_id, market, selection)
+        """
+        if self._best is None:
+            frame = self.frame
+            if frame.empty:
+                self._best = pd.DataFrame(columns=["odds", "bookmaker"],
+                                          index=pd.MultiIndex.from_tuples([], names=MARKET_KEYS))
+            else:
+                best_rows = frame.loc[frame.groupby(MARKET_KEYS, sort=False)["odds"].idxmax()]
+                self._best = best_rows.set_index(MARKET_KEYS)[["odds", "bookmaker"]].sort_index()
+        return self._best
+
+    def odds_for(self, match_id):
+        """
+        Best prices for one match keyed like legs_from_prediction() expects
+        """
+        best = self.best_prices()
+        if match_id not in best.index.get_level_values(0):
+            return {}
+        match_prices = best.xs(match_id, level="match_id")
+        return {accumulator_key(market, selection): float(odds)
+                for (market, selection), odds in match_prices["odds"].items()}
+
+
+def find_value_bets(predictions, store, min_edge=0.0):
+    """
+    Join predictions to the best bookmaker prices and score every market
+    edge = p * odds - 1, kelly = edge / (odds - 1), expected_value as in calculate_expected_value
+    Returns a DataFrame sorted by edge with an is_value flag
+    """
+    markets = predictions if isinstance(predictions, pd.DataFrame) else flatten_predictions(predictions)
+    joined = markets.merge(store.best_prices().reset_index(), on=MARKET_KEYS, how="inner")
+    if joined.empty:
+        return joined.assign(implied_probability=[], edge=[], kelly_fraction=[], expected_value=[], is_value=[])
+
+    odds = joined["odds"].to_numpy(dtype=float)
+    p = joined["probability"].to_numpy(dtype=float) / 100
+    edge = p * odds - 1
+
+    joined["implied_probability"] = np.round(100 / odds, 1)
+    joined["edge"] = np.round(edge, 4)
+    joined["kelly_fraction"] = np.round(np.clip(edge / (odds - 1), 0, 1), 4)
+    joined["expected_value"] = calculate_expected_value_array(odds, joined["probability"].to_numpy())
+    joined["is_value"] = edge > min_edge
+    return joined.sort_values("edge", ascending=False, kind="stable").reset_index(drop=True)
+
+
+class StubOddsFeed:
+    """
+    Local stand-in for a bookmaker feed: prices every predicted market from a
+    noisy view of the model probability plus a bookmaker margin
+    """
+
+    def __init__(self, bookmakers=("StubBook A", "StubBook B"), margin=1.06, noise=0.1, seed=None):
+        self.bookmakers = bookmakers
+        self.margin = margin
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+    def snapshot(self, predictions):
+        markets = predictions if isinstance(predictions, pd.DataFrame) else flatten_predictions(predictions)
+        p = np.clip(markets["probability"].to_numpy(dtype=float) / 100, 0.02, 0.98)
+        timestamp = datetime.now().isoformat()
+        frames = []
+        for bookmaker in self.bookmakers:
+            view = np.clip(p * self.rng.lognormal(0, self.noise, len(p)), 0.02, 0.98)
+            frames.append(pd.DataFrame({
+                "match_id": markets["match_id"].to_numpy(),
+                "market": markets["market"].to_numpy(),
+                "selection": markets["selection"].to_numpy(),
+                "odds": np.round(np.maximum(1.01, 1 / (view * self.margin)), 2),
+                "bookmaker": bookmaker,
+                "timestamp": timestamp
+            }))
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,354 @@
+"""
+SafeBet Analyst - Predictor Parameter Search
+Tunes UpcomingEventPredictor's factor weights on historical fixtures with a
+vectorized scorer and a process pool, and writes the best set to the config
+file the predictor loads at startup when it beats the defaults
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import itertools
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ai_analyzer.upcoming_predictor import DEFAULT_PREDICTOR_PARAMS, save_predictor_params
+from utils.team_ratings import team_ratings
+from utils.lineup_index import lineup_keys, availability
+from ai_analyzer.backtest import load_fixtures, build_match_records, run_backtest
+
+
+# (low, high) ranges are sampled uniformly; lists are discrete choices
+SEARCH_SPACE = {
+    "h2h_scale": (2.0, 20.0),
+    "form_scale": (2.0, 20.0),
+    "venue_bonus": (0.0, 4.0),
+    "player_impact_scale": (0.0, 8.0),
+    "news_impact_range": (0.0, 3.0),
+    "rating_weight": (0.0, 2.0),
+    "rating_only_weight": (0.0, 4.0),
+    "max_advantage": (10.0, 40.0),
+    "probability_adjustment": (0.1, 0.6),
+    "form_weights": [
+        [0.15, 0.15, 0.2, 0.25, 0.25],
+        [0.2, 0.2, 0.2, 0.2, 0.2],
+        [0.05, 0.1, 0.15, 0.3, 0.4]
+    ]
+}
+
+# Feature columns each searched parameter scales; a parameter whose columns are
+# constant on the fixtures cannot be scored, so it keeps its default
+PARAMETER_FEATURES = {
+    "h2h_scale": ("h2h_diff",),
+    "form_scale": ("form_home", "form_away"),
+    "form_weights": ("form_home", "form_away"),
+    "player_impact_scale": ("player_diff",),
+    "rating_weight": ("form_rating_gap",),
+    "rating_only_weight": ("rating_only_gap",),
+}
+
+_worker_features = None
+
+
+def extract_features(records, seed=0):
+    """
+    Parameter-independent inputs of the match result model, one row per record
+    The news draws replay the `random` sequence ai_analyzer.backtest.replay uses,
+    so scores here match a full replay with the same seed
+    """
+    n = len(records)
+    h2h_diff = np.zeros(n)
+    form_home = np.zeros((n, 5))
+    form_away = np.zeros((n, 5))
+    player_diff = np.zeros(n)
+    news_home = np.zeros(n)
+    news_away = np.zeros(n)
+    form_rating_gap = np.zeros(n)
+    rating_only_gap = np.zeros(n)
+
+    for i, record in enumerate(records):
+        ratings = record.get('ratings') or {
+            'home': team_ratings.rating(record['home_team']),
+            'away': team_ratings.rating(record['away_team'])
+        }
+        rating_gap = max(-1.0, min(1.0, (ratings['home'] - ratings['away']) / 400))
+
+        # Fixtures without form/H2H data are predicted from ratings alone, with their own weight
+        if 'recent_form' not in record or 'h2h_last_5' not in record:
+            rating_only_gap[i] = rating_gap
+        else:
+            form_rating_gap[i] = rating_gap
+            h2h = record['h2h_last_5']
+            total = h2h['home_wins'] + h2h['away_wins'] + h2h['draws']
+            if total:
+                h2h_diff[i] = (h2h['home_wins'] - h2h['away_wins']) / total
+
+            for row, form in ((form_home, record['recent_form']['home']), (form_away, record['recent_form']['away'])):
+                for j, x in enumerate(form[:5]):
+                    row[i, j] = 3 if x == 3 else 1 if x == 1 else 0
+
+        # Key player availability counts only when the record carries both lineups
+        lineups = record.get('lineups')
+        if lineups and record.get('key_players_home') and record.get('key_players_away'):
+            player_diff[i] = (
+                availability(lineup_keys(lineups['home']), record['key_players_home'])['availability_rate']
+                - availability(lineup_keys(lineups['away']), record['key_players_away'])['availability_rate']
+            )
+
+        # Same call order as _calculate_news_impact
+        random.seed(seed * 1_000_003 + i)
+        news_home[i] = random.random()
+        news_away[i] = random.random()
+
+    return {
+        "h2h_diff": h2h_diff, "form_home": form_home, "form_away": form_away,
+        "player_diff": player_diff, "news_home": news_home, "news_away": news_away,
+        "form_rating_gap": form_rating_gap, "rating_only_gap": rating_only_gap
+    }
+
+
+def informative_space(space, features):
+    """
+    The space without parameters whose feature columns are constant, e.g.
+    player_impact_scale when no fixture carries lineups
+    """
+    def constant(name):
+        columns = PARAMETER_FEATURES.get(name, ())
+        return bool(columns) and all(np.ptp(features[column]) == 0 for column in columns)
+
+    return {name: spec for name, spec in space.items() if not constant(name)}
+
+
+def _column(candidates, name):
+    return np.array([c[name] for c in candidates], dtype=float)[None, :]
+
+
+def match_result_probabilities(features, candidates):
+    """
+    Vectorized predict_match_outcome() 1X2 probabilities for many parameter sets
+    Returns (home, draw, away) arrays of shape (matches, candidates)
+    """
+    weights = np.array([c['form_weights'] for c in candidates], dtype=float)
+    form_scale = _column(candidates, 'form_scale')
+    max_points = 3 * weights.sum(axis=1)[None, :]
+    scaled_form = (features['form_home'] @ weights.T - features['form_away'] @ weights.T) / max_points * form_scale
+    form = np.clip(scaled_form, -form_scale, form_scale)
+
+    news_range = _column(candidates, 'news_impact_range')
+    news_home = -news_range + 2 * news_range * features['news_home'][:, None]
+    news_away = -news_range + 2 * news_range * features['news_away'][:, None]
+
+    advantage = (
+        2 * features['h2h_diff'][:, None] * _column(candidates, 'h2h_scale')
+        + 2 * form
+        + 2 * _column(candidates, 'venue_bonus')
+        + 2 * features['player_diff'][:, None] * _column(candidates, 'player_impact_scale')
+        + news_home - news_away
+        + 2 * _column(candidates, 'rating_scale') * (
+            features['form_rating_gap'][:, None] * _column(candidates, 'rating_weight')
+            + features['rating_only_gap'][:, None] * _column(candidates, 'rating_only_weight'))
+    )
+
+    base = _column(candidates, 'base_probability')
+    shift = advantage / _column(candidates, 'max_advantage') * _column(candidates, 'probability_adjustment')
+    home = base + shift
+    away = base - shift
+    draw = 1 - home - away
+
+    low, high = _column(candidates, 'min_probability'), _column(candidates, 'max_probability')
+    home, draw, away = np.clip(home, low, high), np.clip(draw, low, high), np.clip(away, low, high)
+    total = home + draw + away
+    return home / total, draw / total, away / total
+
+
+def score_candidates(features, results, candidates, objective="brier"):
+    """
+    Mean 1X2 Brier score or log loss per candidate (lower is better)
+    results: 0 home win, 1 draw, 2 away win
+    """
+    home, draw, away = match_result_probabilities(features, candidates)
+    outcome = np.eye(3)[results]
+    if objective == "log_loss":
+        observed = np.choose(results[:, None], [home, draw, away])
+        return -np.mean(np.log(np.clip(observed, 1e-12, 1)), axis=0)
+    brier = (home - outcome[:, 0:1]) ** 2 + (draw - outcome[:, 1:2]) ** 2 + (away - outcome[:, 2:3]) ** 2
+    return brier.mean(axis=0)
+
+
+def _init_worker(features, results):
+    global _worker_features
+    _worker_features = (features, results)
+
+
+def _score_batch(args):
+    candidates, objective = args
+    features, results = _worker_features
+    return score_candidates(features, results, candidates, objective).tolist()
+
+
+def grid_candidates(space, points=3):
+    """
+    Cartesian product of the space; ranges contribute `points` evenly spaced values
+    """
+    axes = []
+    for name, spec in space.items():
+        values = spec if isinstance(spec, list) else [float(v) for v in np.linspace(spec[0], spec[1], points)]
+        axes.append([(name, v) for v in values])
+    return [dict(DEFAULT_PREDICTOR_PARAMS, **dict(combo)) for combo in itertools.product(*axes)]
+
+
+def random_candidates(space, n, rng):
+    """
+    n parameter sets sampled uniformly from the space
+    """
+    candidates = []
+    for _ in range(n):
+        candidate = dict(DEFAULT_PREDICTOR_PARAMS)
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                candidate[name] = spec[rng.integers(len(spec))]
+            else:
+                candidate[name] = float(rng.uniform(spec[0], spec[1]))
+        candidates.append(candidate)
+    return candidates
+
+
+def _narrow(space, best, factor):
+    """
+    Shrink every range around the best candidate, keeping it inside the original bounds
+    """
+    narrowed = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            narrowed[name] = spec
+            continue
+        half = (spec[1] - spec[0]) * factor / 2
+        narrowed[name] = (max(spec[0], best[name] - half), min(spec[1], best[name] + half))
+    return narrowed
+
+
+class ParameterSearch:
+    def __init__(self, fixtures, space=None, objective="brier", workers=None, batch_size=256, seed=0):
+        """
+        fixtures: DataFrame or CSV/Parquet path of historical results
+        """
+        if isinstance(fixtures, str):
+            fixtures = load_fixtures(fixtures)
+        if objective not in ("brier", "log_loss"):
+            raise ValueError("objective must be 'brier' or 'log_loss'")
+        self.fixtures = fixtures
+        self.objective = objective
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        self.features = extract_features(build_match_records(fixtures), seed=seed)
+        space = space or SEARCH_SPACE
+        self.space = informative_space(space, self.features)
+        self.pinned = sorted(set(space) - set(self.space))
+        home_goals = fixtures["home_goals"].to_numpy()
+        away_goals = fixtures["away_goals"].to_numpy()
+        self.results = np.where(home_goals > away_goals, 0, np.where(home_goals == away_goals, 1, 2))
+
+    def evaluate(self, candidates):
+        """
+        Score candidates in batches across the process pool
+        """
+        batches = [(candidates[i:i + self.batch_size], self.objective) for i in range(0, len(candidates), self.batch_size)]
+        if self.workers <= 1 or len(batches) <= 1:
+            _init_worker(self.features, self.results)
+            scores = [_score_batch(batch) for batch in batches]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(self.features, self.results)) as pool:
+                scores = list(pool.map(_score_batch, batches))
+        return [score for batch in scores for score in batch]
+
+    def run(self, strategy="random", trials=500, grid_points=3, rounds=4):
+        """
+        Search with 'grid', 'random' or 'refine' (random search whose ranges
+        shrink around the best candidate each round)
+        """
+        if strategy == "grid":
+            candidates = grid_candidates(self.space, grid_points)
+            scores = self.evaluate(candidates)
+        elif strategy == "random":
+            candidates = random_candidates(self.space, trials, self.rng)
+            scores = self.evaluate(candidates)
+        elif strategy == "refine":
+            candidates, scores, space = [], [], self.space
+            for round_index in range(rounds):
+                batch = random_candidates(space, max(1, trials // rounds), self.rng)
+                candidates += batch
+                scores += self.evaluate(batch)
+                best = candidates[int(np.argmin(scores))]
+                space = _narrow(self.space, best, 0.5 ** (round_index + 1))
+        else:
+            raise ValueError("strategy must be 'grid', 'random' or 'refine'")
+
+        default_score = self.evaluate([dict(DEFAULT_PREDICTOR_PARAMS)])[0]
+        order = np.argsort(scores)
+        best = candidates[int(order[0])]
+        return {
+            "best_params": best,
+            "best_score": round(float(scores[order[0]]), 6),
+            "default_score": round(float(default_score), 6),
+            "objective": self.objective,
+            "strategy": strategy,
+            "trials": len(candidates),
+            "pinned": self.pinned,
+            "top": [{"score": round(float(scores[i]), 6), "params": candidates[int(i)]} for i in order[:5]]
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune UpcomingEventPredictor parameters on historical fixtures")
+    parser.add_argument("fixtures", help="CSV or Parquet file of historical fixtures")
+    parser.add_argument("--strategy", choices=["grid", "random", "refine"], default="refine")
+    parser.add_argument("--trials", type=int, default=2000)
+    parser.add_argument("--objective", choices=["brier", "log_loss"], default="brier")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.getenv("SAFEBET_PREDICTOR_CONFIG", "predictor_params.json"))
+    args = parser.parse_args(argv)
+
+    fixtures = load_fixtures(args.fixtures)
+    search = ParameterSearch(fixtures, objective=args.objective, workers=args.workers, seed=args.seed)
+    result = search.run(strategy=args.strategy, trials=args.trials)
+
+    # Confirm on a full replay against the defaults before writing the config
+    backtest = run_backtest(fixtures, workers=args.workers, seed=args.seed, params=result["best_params"])
+    baseline = run_backtest(fixtures, workers=args.workers, seed=args.seed, params=dict(DEFAULT_PREDICTOR_PARAMS))
+    improved = (result["best_score"] < result["default_score"]
+                and backtest["markets"]["MatchResult"]["brier"] <= baseline["markets"]["MatchResult"]["brier"])
+    if improved:
+        save_predictor_params(result["best_params"], args.output, meta={
+            "objective": result["objective"],
+            "score": result["best_score"],
+            "default_score": result["default_score"],
+            "strategy": result["strategy"],
+            "trials": result["trials"],
+            "pinned": result["pinned"],
+            "matches": len(fixtures),
+            "tuned_at": datetime.now().isoformat()
+        })
+
+    print(json.dumps({
+        "best_score": result["best_score"],
+        "default_score": result["default_score"],
+        "best_params": result["best_params"],
+        "pinned": result["pinned"],
+        "backtest_accuracy": backtest["markets"]["MatchResult"]["accuracy"],
+        "backtest_brier": backtest["markets"]["MatchResult"]["brier"],
+        "default_backtest_brier": baseline["markets"]["MatchResult"]["brier"],
+        "written_to": args.output if improved else None
+    }, indent=2))
+    result["written"] = improved
+    return result
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
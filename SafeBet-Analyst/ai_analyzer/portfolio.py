@@ -0,0 +1,146 @@
+"""
+SafeBet Analyst - Portfolio Analytics
+Columnar (pandas/NumPy) view of analyzed bets for summary reports:
+exposure, expected return and variance, and Monte Carlo P&L simulation
+"""
+
+import numpy as np
+import pandas as pd
+from ai_analyzer.pre_scorer import BetPreScorer
+
+
+class PortfolioAnalyzer:
+    def __init__(self, analyzed_bets):
+        """
+        Build the columnar portfolio from batch_analyze_bets() results in one pass
+        """
+        n = len(analyzed_bets)
+        stake = np.zeros(n)
+        odds = np.zeros(n)
+        payout = np.zeros(n)
+        potential_win = np.zeros(n)
+        win_prob = np.zeros(n)
+        active = np.zeros(n, dtype=bool)
+        high_risk = np.zeros(n, dtype=bool)
+        league = []
+        market = []
+        suggestions = []
+        scorer = BetPreScorer()
+
+        for i, item in enumerate(analyzed_bets):
+            bet = item.get('bet_data', {})
+            analysis = item.get('analysis', {})
+            stake[i] = bet.get('stake') or 0
+            odds[i] = bet.get('odds') or 0
+            potential_win[i] = bet.get('potential_win') or 0
+            # Fall back to stake x odds when the slip has no potential win
+            payout[i] = potential_win[i] or stake[i] * odds[i]
+            win_prob[i] = (analysis.get('win_probability') or 0) / 100
+            # Settled bets carry no remaining risk
+            active[i] = scorer.settled_outcome(bet) is None
+            high_risk[i] = analysis.get('risk_level') == 'High'
+            league.append(bet.get('league') or 'Unknown')
+            market.append(bet.get('bet_type') or 'Unknown')
+            suggestions.append(analysis.get('ai_suggestion', ''))
+
+        self.frame = pd.DataFrame({
+            'stake': stake,
+            'odds': odds,
+            'payout': payout,
+            'potential_win': potential_win,
+            'win_probability': np.clip(win_prob, 0, 1),
+            'active': active,
+            'high_risk': high_risk,
+            'league': pd.Categorical(league),
+            'market': pd.Categorical(market)
+        })
+        self.recommendations = suggestions
+
+    def exposure(self, by):
+        """
+        Total stake and potential payout of active bets, grouped by 'league' or 'market'
+        """
+        active = self.frame[self.frame['active']]
+        if active.empty:
+            return {}
+        grouped = active.groupby(by, observed=True)[['stake', 'payout']].sum().round(2)
+        return {key: {'stake': row['stake'], 'potential_payout': row['payout']} for key, row in grouped.iterrows()}
+
+    def expected_return(self):
+        """
+        Expected profit and its variance over active bets, treating bets as independent
+        """
+        active = self.frame[self.frame['active']]
+        p = active['win_probability'].to_numpy()
+        payout = active['payout'].to_numpy()
+        stake = active['stake'].to_numpy()
+
+        expected_pnl = float(np.sum(p * payout - stake))
+        variance = float(np.sum(p * (1 - p) * payout ** 2))
+        return {
+            'expected_pnl': round(expected_pnl, 2),
+            'pnl_variance': round(variance, 2),
+            'pnl_std': round(float(np.sqrt(variance)), 2)
+        }
+
+    def simulate_pnl(self, n_draws=100_000, seed=None, chunk_size=None):
+        """
+        Monte Carlo distribution of total P&L across active bets
+        Each draw settles every bet as a Bernoulli trial on its win probability
+        """
+        active = self.frame[self.frame['active']]
+        n_bets = len(active)
+        if n_bets == 0 or n_draws <= 0:
+            return None
+
+        p = active['win_probability'].to_numpy(dtype=np.float32)
+        payout = active['payout'].to_numpy(dtype=np.float32)
+        total_stake = float(active['stake'].sum())
+
+        # Small chunks keep the working set in cache; buffers are reused across chunks
+        chunk_size = chunk_size or max(1, 250_000 // n_bets)
+        rng = np.random.default_rng(seed)
+        uniforms = np.empty((chunk_size, n_bets), dtype=np.float32)
+        wins = np.empty((chunk_size, n_bets), dtype=np.float32)
+        pnl = np.empty(n_draws, dtype=np.float64)
+        for start in range(0, n_draws, chunk_size):
+            rows = min(chunk_size, n_draws - start)
+            rng.random(out=uniforms[:rows], dtype=np.float32)
+            np.less(uniforms[:rows], p, out=wins[:rows])
+            pnl[start:start + rows] = wins[:rows] @ payout - total_stake
+
+        percentiles = np.percentile(pnl, [5, 25, 50, 75, 95])
+        return {
+            'draws': n_draws,
+            'mean_pnl': round(float(pnl.mean()), 2),
+            'std_pnl': round(float(pnl.std()), 2),
+            'probability_of_profit': round(float((pnl > 0).mean()) * 100, 1),
+            'value_at_risk_95': round(float(-percentiles[0]), 2),
+            'percentiles': {
+                'p5': round(float(percentiles[0]), 2),
+                'p25': round(float(percentiles[1]), 2),
+                'p50': round(float(percentiles[2]), 2),
+                'p75': round(float(percentiles[3]), 2),
+                'p95': round(float(percentiles[4]), 2)
+            }
+        }
+
+    def summary(self, n_draws=10_000, seed=None):
+        """
+        Full portfolio summary used by generate_summary_report
+        """
+        frame = self.frame
+        return {
+            "total_bets": len(frame),
+            "total_staked": round(float(frame['stake'].sum()), 2),
+            # As reported on the slips; exposure and P&L use the stake x odds fallback
+            "total_potential_wins": round(float(frame['potential_win'].sum()), 2),
+            "average_win_probability": round(float(frame['win_probability'].mean()) * 100, 2) if len(frame) else 0,
+            "high_risk_count": int(frame['high_risk'].sum()),
+            "active_bets": int(frame['active'].sum()),
+            "exposure_by_league": self.exposure('league'),
+            "exposure_by_market": self.exposure('market'),
+            **self.expected_return(),
+            "recommendations_summary": self.recommendations,
+            "pnl_simulation": self.simulate_pnl(n_draws=n_draws, seed=seed)
+        }
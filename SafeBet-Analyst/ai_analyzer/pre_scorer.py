@@ -0,0 +1,132 @@
+"""
+SafeBet Analyst - Bet Pre-Scorer
+Fast local scoring of bet slips to decide which ones actually need an LLM call
+"""
+
+from utils.data_utils import calculate_expected_value
+
+
+# Statuses (lower-cased) whose outcome is already known
+WON_STATUSES = ("won", "win", "paid")
+LOST_STATUSES = ("lost", "lose", "loss")
+CASHED_OUT_STATUSES = ("cashed out", "cashout", "cashed-out")
+VOID_STATUSES = ("void", "returned", "refund", "refunded", "cancelled", "canceled")
+OPEN_STATUSES = ("active", "pending", "open", "live", "unknown status")
+
+# Typical bookmaker overround, removed from the implied probability
+BOOKMAKER_MARGIN = 1.05
+
+
+class BetPreScorer:
+    def __init__(self, low_risk_odds=1.3, high_risk_odds=6.0):
+        # Bets at or below low_risk_odds are clear favourites, at or above
+        # high_risk_odds clear long shots; anything in between is ambiguous
+        self.low_risk_odds = low_risk_odds
+        self.high_risk_odds = high_risk_odds
+
+    def settled_outcome(self, bet):
+        """
+        Get 'won', 'lost', 'void' or 'cashed_out' for settled bets, None for open ones
+        A cash-out is neither a win nor a loss; its return is the bet's actual_win
+        """
+        status = str(bet.get('status') or '').strip().lower()
+        if status in WON_STATUSES:
+            return 'won'
+        if status in LOST_STATUSES:
+            return 'lost'
+        if status in VOID_STATUSES:
+            return 'void'
+        if status in CASHED_OUT_STATUSES:
+            return 'cashed_out'
+
+        # Fall back to the payout when the status text is unfamiliar
+        actual_win = bet.get('actual_win')
+        if status not in OPEN_STATUSES and isinstance(actual_win, (int, float)):
+            return 'won' if actual_win > 0 else 'lost'
+        return None
+
+    def score(self, bet):
+        """
+        Score a single bet locally
+        """
+        try:
+            odds = float(bet.get('odds') or 0)
+        except (TypeError, ValueError):
+            odds = 0.0
+
+        implied_probability = round(100 / odds, 1) if odds > 1 else None
+        fair_probability = round(implied_probability / BOOKMAKER_MARGIN, 1) if implied_probability else None
+        expected_value = calculate_expected_value(odds, fair_probability) if fair_probability else 0.0
+
+        if odds <= 1:
+            risk_level = "Unknown"
+        elif odds <= self.low_risk_odds:
+            risk_level = "Low"
+        elif odds >= self.high_risk_odds:
+            risk_level = "High"
+        else:
+            risk_level = "Medium"
+
+        settled = self.settled_outcome(bet)
+        if settled:
+            reason = "settled"
+        elif risk_level in ("Low", "High"):
+            reason = "trivial"
+        else:
+            reason = None
+
+        return {
+            "implied_probability": implied_probability,
+            "fair_probability": fair_probability,
+            "expected_value": expected_value,
+            "risk_level": risk_level,
+            "settled_outcome": settled,
+            "needs_llm": reason is None,
+            "skip_reason": reason
+        }
+
+    def local_analysis(self, bet, score):
+        """
+        Build an analyze_bet_slip-style result for a bet that skips the LLM
+        """
+        settled = score['settled_outcome']
+        if settled == 'won':
+            win_probability, suggestion, confidence = 100.0, "Settled - bet won", "High"
+        elif settled == 'lost':
+            win_probability, suggestion, confidence = 0.0, "Settled - bet lost", "High"
+        elif settled == 'void':
+            win_probability, suggestion, confidence = 0.0, "Settled - stake returned", "High"
+        elif settled == 'cashed_out':
+            win_probability, suggestion, confidence = 0.0, "Settled - cashed out", "High"
+        elif score['risk_level'] == "Low":
+            win_probability, suggestion, confidence = score['fair_probability'], "High Probability - Stay in", "Medium"
+        else:
+            win_probability, suggestion, confidence = score['fair_probability'], "Risk Detected - Long shot, consider cashout if possible", "Medium"
+
+        return {
+            "win_probability": win_probability,
+            "momentum_analysis": "Not assessed - classified locally from odds and status",
+            "player_status_analysis": "Not assessed - classified locally from odds and status",
+            "ai_suggestion": suggestion,
+            "risk_level": "Low" if settled else score['risk_level'],
+            "confidence_level": confidence,
+            "implied_probability": score['implied_probability'],
+            "expected_value": score['expected_value'],
+            "source": "pre_scorer",
+            "skip_reason": score['skip_reason']
+        }
+
+    def triage(self, bets_list):
+        """
+        Split bets into locally resolved analyses and the indices that need the LLM
+        Returns (local_analyses: {index: analysis}, llm_indices: [index, ...])
+        """
+        local_analyses = {}
+        llm_indices = []
+        for i, bet in enumerate(bets_list):
+            score = self.score(bet)
+            if score['needs_llm']:
+                llm_indices.append(i)
+            else:
+                local_analyses[i] = self.local_analysis(bet, score)
+        return local_analyses, llm_indices
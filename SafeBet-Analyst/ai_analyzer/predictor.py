@@ -3,33 +3,54 @@ SafeBet Analyst - AI Analysis Module
 Handles sending data to Qwen AI and processing predictions
 """
 
-import openai
-import os
 import json
+import time
 from datetime import datetime
 from dotenv import load_dotenv
+from ai_analyzer.llm_client import LLMClient
+from ai_analyzer.pre_scorer import BetPreScorer
+from ai_analyzer.json_stream import IncrementalJSONObjectParser
+from ai_analyzer.portfolio import PortfolioAnalyzer
+from utils.metrics import metrics
+from utils.momentum import momentum_tracker
+from utils.entity_resolution import fixture_resolver
+from utils.live_score_updater import live_updater
+from ai_analyzer.inplay_model import inplay_pricer
+from ai_analyzer.analysis_cache import analysis_cache
 
 # Load environment variables
 load_dotenv()
 
-class AIPredictor:
-    def __init__(self):
-        # Initialize OpenAI client for Qwen API
-        # Note: This assumes Qwen API is compatible with OpenAI format
-        api_key = os.getenv("QWEN_API_KEY") or os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("QWEN_API_KEY or OPENAI_API_KEY environment variable is required")
-
-        openai.api_key = api_key
+# Instructions for packed (multi-bet) requests, sent once per request instead of once per bet
+PACKED_SYSTEM_PROMPT = (
+    "You are an expert sports analyst assessing betting slips objectively, without encouraging gambling. "
+    "You receive a pipe-separated table of bets (columns: id|match|bet|odds|stake|status|potential_win|actual_win; '-' means unknown). "
+    "For every row estimate the probability (0-100) that the slip wins and give a short recommendation. "
+    'Reply with JSON: {"results":[{"id":str,"win_probability":float,"momentum_analysis":str,'
+    '"player_status_analysis":str,"ai_suggestion":str,"risk_level":"Low|Medium|High","confidence_level":"Low|Medium|High"}]}. '
+    "One entry per id, text fields at most one short sentence."
+)
+PACKED_COLUMNS = ("match_name", "bet_type", "odds", "stake", "status", "potential_win", "actual_win")
+PACKED_TOKENS_PER_BET = 90
+ANALYSIS_FIELDS = ("win_probability", "momentum_analysis", "player_status_analysis", "ai_suggestion", "risk_level", "confidence_level")
 
-        # Base URL for Qwen API (adjust as needed)
-        base_url = os.getenv("QWEN_BASE_URL", "https://api.openai.com/v1")
-        openai.base_url = base_url
+class AIPredictor:
+    def __init__(self, llm_client=None, cache=None):
+        # Dedicated client for the Qwen API (OpenAI-compatible), configured from
+        # QWEN_API_KEY / QWEN_BASE_URL / QWEN_MODEL / QWEN_TIMEOUT / QWEN_MAX_RETRIES
+        self.llm_client = llm_client or LLMClient.from_env()
+        self.pre_scorer = BetPreScorer()
+        self.cache = cache if cache is not None else analysis_cache
 
     def analyze_bet_slip(self, bet_data):
         """
         Analyze a single bet slip using Qwen AI
         """
+        cached = self.cache.get(bet_data)
+        if cached is not None:
+            metrics.inc("analysis_cache_hits_total", 1, "Bet analyses served from the analysis cache")
+            return cached
+
         # Prepare prompt for Qwen
         prompt = f"""
         Analyze this betting slip for potential outcome:
@@ -60,36 +81,123 @@ class AIPredictor:
         """
 
         try:
-            response = openai.chat.completions.create(
-                model=os.getenv("QWEN_MODEL", "gpt-4o"),
+            result = self._chat_completion(
+                "bet_slip",
                 messages=[
                     {"role": "system", "content": "You are an expert sports analyst with deep knowledge of betting strategies and probability assessment. Focus on providing accurate, data-driven analysis without encouraging gambling. Your analysis should be objective and based on the information provided."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=500,
-                response_format={"type": "json_object"}
+                max_tokens=500
             )
-
-            # Parse the response
-            result = json.loads(response.choices[0].message.content)
+            self.cache.put(bet_data, result)
             return result
 
         except Exception as e:
             print(f"Error in AI analysis: {str(e)}")
-            # Return a default response in case of error
+            metrics.inc("llm_errors_total", 1, "Failed LLM requests", operation="bet_slip")
+            # Return a default response in case of error, marked so callers can tell it apart
             return {
                 "win_probability": 50.0,
                 "momentum_analysis": "Unable to assess momentum due to insufficient live data",
                 "player_status_analysis": "Unable to assess player status due to insufficient live data",
                 "ai_suggestion": "Insufficient data for accurate prediction",
                 "risk_level": "Medium",
-                "confidence_level": "Low"
+                "confidence_level": "Low",
+                "is_fallback": True,
+                "fallback_reason": str(e)
             }
 
     def analyze_active_bet_with_live_data(self, bet_data, live_match_data=None):
         """
         Analyze an active bet with live match data if available
+        Without live_match_data, the bet is matched to a live fixture by its match name
+        """
+        if live_match_data is None:
+            live_match_data = self.live_data_for_bet(bet_data)
+        try:
+            result = self._chat_completion(
+                "live_bet",
+                messages=self._build_live_messages(bet_data, live_match_data),
+                temperature=0.2,
+                max_tokens=600
+            )
+            return result
+
+        except Exception as e:
+            print(f"Error in live AI analysis: {str(e)}")
+            metrics.inc("llm_errors_total", 1, "Failed LLM requests", operation="live_bet")
+            return self._live_fallback(e)
+
+    def stream_active_bet_analysis(self, bet_data, live_match_data=None):
+        """
+        Streaming variant of analyze_active_bet_with_live_data
+        Yields (field, value) pairs as soon as each JSON field is complete, so
+        updated_win_probability and cashout_recommendation arrive first
+        """
+        if live_match_data is None:
+            live_match_data = self.live_data_for_bet(bet_data)
+        parser = IncrementalJSONObjectParser()
+        request_start = time.perf_counter()
+        first_field_seen = False
+        try:
+            stream = self.llm_client.create_chat_completion(
+                messages=self._build_live_messages(bet_data, live_match_data),
+                temperature=0.2,
+                max_tokens=600,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                for field, value in parser.feed(chunk.choices[0].delta.content or ""):
+                    if not first_field_seen:
+                        first_field_seen = True
+                        metrics.observe("llm_first_field_seconds", time.perf_counter() - request_start, "Time to the first parsed field of a streamed LLM response", operation="live_bet")
+                    yield field, value
+            self._record_llm_metrics("live_bet_stream", None, time.perf_counter() - request_start)
+
+        except Exception as e:
+            print(f"Error in streaming live AI analysis: {str(e)}")
+            metrics.inc("llm_errors_total", 1, "Failed LLM requests", operation="live_bet_stream")
+            # Fill in whatever the stream did not deliver
+            received = parser.result()
+            for field, value in self._live_fallback(e).items():
+                if field not in received:
+                    yield field, value
+            return
+
+        # A stream that ends early without an error still leaves fields unfinished
+        received = parser.result()
+        fallback = self._live_fallback("LLM stream ended before the analysis was complete")
+        if any(field not in received for field in fallback if field not in ("is_fallback", "fallback_reason")):
+            for field, value in fallback.items():
+                if field not in received:
+                    yield field, value
+
+    def live_data_for_bet(self, bet_data):
+        """
+        Live data for the fixture a bet's match name resolves to, with the local
+        in-play prices when available; None when the bet cannot be matched or is not live
+        """
+        resolution = fixture_resolver.resolve(bet_data.get('match_name'))
+        if not resolution:
+            return None
+        live = live_updater.get_match_details(resolution['match_id'])
+        if not live:
+            return None
+
+        live_match_data = dict(live, match_id=resolution['match_id'], resolution_confidence=resolution['confidence'])
+        live_match_data.setdefault('score', f"{live.get('home_score', 0)}-{live.get('away_score', 0)}")
+        inplay = inplay_pricer.markets_for(resolution['match_id'])
+        if inplay:
+            live_match_data['inplay_markets'] = inplay
+        return live_match_data
+
+    def _build_live_messages(self, bet_data, live_match_data=None):
+        """
+        Build the chat messages for a live bet analysis
         """
         # Prepare prompt for Qwen with live data
         live_info = ""
@@ -106,6 +214,23 @@ class AIPredictor:
             Red Cards (Home/Away): {live_match_data.get('red_cards', {}).get('home', 'N/A')} / {live_match_data.get('red_cards', {}).get('away', 'N/A')}
             """
 
+            # Local in-play model prices, when the match is being priced
+            inplay = live_match_data.get('inplay_markets')
+            if inplay:
+                live_info += f"""
+            Model In-Play 1X2 (Home/Draw/Away): {inplay['MatchResult']['Win']}% / {inplay['MatchResult']['Draw']}% / {inplay['MatchResult']['Lose']}%
+            Model In-Play Over 2.5 / BTTS: {inplay['OverUnder']['2.5']['Over']}% / {inplay['BTTS']['Yes']}%
+            """
+
+            # Windowed stats from the live stat ring buffers, when the match is tracked
+            recent = momentum_tracker.momentum(live_match_data.get('match_id'), window=10)
+            if recent:
+                stats = recent['stats']
+                live_info += f"""
+            Last 10 Minutes (Home/Away): Dangerous Attacks {stats['dangerous_attacks']['home']:.0f} / {stats['dangerous_attacks']['away']:.0f}, Shots {stats['shots']['home']:.0f} / {stats['shots']['away']:.0f}, Corners {stats['corners']['home']:.0f} / {stats['corners']['away']:.0f}, Possession {stats['possession']['home']}% / {stats['possession']['away']}%
+            Momentum Last 10 Minutes (Home/Away): {recent['home']}% / {recent['away']}%
+            """
+
         prompt = f"""
         Analyze this ACTIVE betting slip with live match data:
 
@@ -125,62 +250,189 @@ class AIPredictor:
         4. Updated Win Probability: Adjust the win probability based on live data
         5. Recommendation: Should the user stay in the bet or consider cashing out?
 
-        Respond in JSON format with the following structure:
+        Respond in JSON format with the following structure, keeping the fields in this order:
         {{
           "updated_win_probability": float,
+          "cashout_recommendation": string,
           "current_momentum": string,
           "risk_assessment": string,
-          "cashout_recommendation": string,
           "stay_in_recommendation": string,
           "confidence_in_prediction": string
         }}
         """
 
+        return [
+            {"role": "system", "content": "You are an expert sports analyst providing real-time analysis of active bets. Focus on objective assessment based on live data without encouraging gambling. Your recommendations should be data-driven and responsible."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _live_fallback(self, error):
+        """
+        Default live analysis, marked so callers can tell it apart
+        """
+        return {
+            "updated_win_probability": 50.0,
+            "cashout_recommendation": "Not enough information to recommend cashout",
+            "current_momentum": "Unable to assess with current data",
+            "risk_assessment": "Insufficient live data for accurate assessment",
+            "stay_in_recommendation": "Continue monitoring the match",
+            "confidence_in_prediction": "Low",
+            "is_fallback": True,
+            "fallback_reason": str(error)
+        }
+
+    def _chat_completion(self, operation, messages, temperature, max_tokens):
+        """
+        Send a JSON-mode chat completion request and return the parsed content
+        """
+        request_start = time.perf_counter()
+        response = self.llm_client.create_chat_completion(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"}
+        )
+        self._record_llm_metrics(operation, response, time.perf_counter() - request_start)
+        return json.loads(response.choices[0].message.content)
+
+    def _record_llm_metrics(self, operation, response, elapsed):
+        """
+        Record latency and token usage for a completed LLM request
+        """
+        if not metrics.enabled:
+            return
+        metrics.observe("llm_request_seconds", elapsed, "LLM request latency", operation=operation)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            metrics.inc("llm_tokens_total", usage.prompt_tokens or 0, "LLM tokens used", operation=operation, kind="prompt")
+            metrics.inc("llm_tokens_total", usage.completion_tokens or 0, "LLM tokens used", operation=operation, kind="completion")
+
+            # Providers with prompt caching report how much of the prompt was served from cache
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = details.get("cached_tokens", 0) if isinstance(details, dict) else getattr(details, "cached_tokens", 0)
+            if cached_tokens:
+                metrics.inc("llm_cache_hits_total", 1, "LLM requests with a prompt cache hit", operation=operation)
+                metrics.inc("llm_tokens_total", cached_tokens, "LLM tokens used", operation=operation, kind="cached")
+
+    def _encode_bet_table(self, bets_with_ids):
+        """
+        Encode bets as a compact pipe-separated table, one row per bet
+        """
+        rows = ["id|match|bet|odds|stake|status|potential_win|actual_win"]
+        for bet_id, bet in bets_with_ids:
+            cells = [bet_id]
+            for column in PACKED_COLUMNS:
+                value = bet.get(column)
+                cells.append("-" if value is None or value == "" else str(value).replace("|", "/").replace("\n", " "))
+            rows.append("|".join(cells))
+        return "\n".join(rows)
+
+    def _validate_packed_result(self, entry):
+        """
+        Check a single packed result and normalise it to the analyze_bet_slip format
+        Returns None if the entry is unusable
+        """
+        if not isinstance(entry, dict):
+            return None
         try:
-            response = openai.chat.completions.create(
-                model=os.getenv("QWEN_MODEL", "gpt-4o"),
-                messages=[
-                    {"role": "system", "content": "You are an expert sports analyst providing real-time analysis of active bets. Focus on objective assessment based on live data without encouraging gambling. Your recommendations should be data-driven and responsible."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                max_tokens=600,
-                response_format={"type": "json_object"}
-            )
+            win_probability = float(entry.get("win_probability"))
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= win_probability <= 100:
+            return None
 
-            # Parse the response
-            result = json.loads(response.choices[0].message.content)
-            return result
+        analysis = {"win_probability": win_probability}
+        for field in ANALYSIS_FIELDS[1:]:
+            analysis[field] = str(entry.get(field) or "N/A")
+        if analysis["risk_level"] not in ("Low", "Medium", "High"):
+            analysis["risk_level"] = "Medium"
+        return analysis
 
-        except Exception as e:
-            print(f"Error in live AI analysis: {str(e)}")
-            # Return a default response in case of error
-            return {
-                "updated_win_probability": 50.0,
-                "current_momentum": "Unable to assess with current data",
-                "risk_assessment": "Insufficient live data for accurate assessment",
-                "cashout_recommendation": "Not enough information to recommend cashout",
-                "stay_in_recommendation": "Continue monitoring the match",
-                "confidence_in_prediction": "Low"
-            }
+    def analyze_bets_packed(self, bets_list, pack_size=8):
+        """
+        Analyze bets K at a time in a single request each, retrying missing ones individually
+        Returns analyses in the same order as bets_list
+        """
+        analyses = [None] * len(bets_list)
+
+        for start in range(0, len(bets_list), pack_size):
+            pack = [(f"b{start + i}", bet) for i, bet in enumerate(bets_list[start:start + pack_size])]
+            try:
+                response = self._chat_completion(
+                    "bet_slip_packed",
+                    messages=[
+                        {"role": "system", "content": PACKED_SYSTEM_PROMPT},
+                        {"role": "user", "content": self._encode_bet_table(pack)}
+                    ],
+                    temperature=0.3,
+                    max_tokens=PACKED_TOKENS_PER_BET * len(pack) + 50
+                )
+                entries = response.get("results", []) if isinstance(response, dict) else []
+            except Exception as e:
+                print(f"Error in packed AI analysis: {str(e)}")
+                metrics.inc("llm_errors_total", 1, "Failed LLM requests", operation="bet_slip_packed")
+                entries = []
 
-    def batch_analyze_bets(self, bets_list):
+            # Split the packed response back per bet
+            by_id = {str(entry.get("id")): entry for entry in entries if isinstance(entry, dict)}
+            for bet_id, bet in pack:
+                index = int(bet_id[1:])
+                analyses[index] = self._validate_packed_result(by_id.get(bet_id))
+
+        # Anything the model skipped or got wrong is retried on its own
+        missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+        if missing:
+            metrics.inc("llm_packed_retries_total", len(missing), "Bets retried individually after a packed request")
+        for i in missing:
+            analyses[i] = self.analyze_bet_slip(bets_list[i])
+
+        return analyses
+
+    def batch_analyze_bets(self, bets_list, pack_size=None, triage=True):
         """
         Analyze multiple bets at once
+        With triage, settled and clear-cut bets are scored locally and only ambiguous
+        active bets go to the LLM; with pack_size > 1 those are sent in packed requests
         """
         results = []
-        for bet in bets_list:
-            analysis = self.analyze_bet_slip(bet)
-            results.append({
-                "bet_data": bet,
-                "analysis": analysis,
-                "timestamp": datetime.now().isoformat()
-            })
+        with metrics.time("analysis_batch_seconds", "Time to analyze a batch of bets"):
+            if triage:
+                analyses, llm_indices = self.pre_scorer.triage(bets_list)
+                for analysis in analyses.values():
+                    metrics.inc("llm_calls_skipped_total", 1, "Bets resolved by the local pre-scorer", reason=analysis['skip_reason'])
+            else:
+                analyses, llm_indices = {}, list(range(len(bets_list)))
+
+            # Unchanged slips reuse their cached analysis
+            cached = {i: self.cache.get(bets_list[i]) for i in llm_indices}
+            cached = {i: analysis for i, analysis in cached.items() if analysis is not None}
+            if cached:
+                metrics.inc("analysis_cache_hits_total", len(cached), "Bet analyses served from the analysis cache")
+                analyses.update(cached)
+                llm_indices = [i for i in llm_indices if i not in cached]
+
+            llm_bets = [bets_list[i] for i in llm_indices]
+            if pack_size and pack_size > 1:
+                llm_analyses = self.analyze_bets_packed(llm_bets, pack_size=pack_size)
+                for bet, analysis in zip(llm_bets, llm_analyses):
+                    self.cache.put(bet, analysis)
+            else:
+                llm_analyses = [self.analyze_bet_slip(bet) for bet in llm_bets]
+            analyses.update(zip(llm_indices, llm_analyses))
+            analyses = [analyses[i] for i in range(len(bets_list))]
+
+            for bet, analysis in zip(bets_list, analyses):
+                results.append({
+                    "bet_data": bet,
+                    "analysis": analysis,
+                    "timestamp": datetime.now().isoformat()
+                })
         return results
 
-    def generate_summary_report(self, analyzed_bets):
+    def generate_summary_report(self, analyzed_bets, n_draws=10_000, seed=None):
         """
         Generate a summary report of all analyzed bets
+        Includes exposure by league/market, expected P&L and a Monte Carlo P&L distribution
         """
         if not analyzed_bets:
             return {
@@ -192,18 +444,5 @@ class AIPredictor:
                 "recommendations_summary": []
             }
 
-        total_staked = sum(bet['bet_data'].get('stake', 0) for bet in analyzed_bets)
-        total_potential = sum(bet['bet_data'].get('potential_win', 0) for bet in analyzed_bets)
-        avg_win_prob = sum(bet['analysis'].get('win_probability', 0) for bet in analyzed_bets) / len(analyzed_bets)
-        high_risk_count = sum(1 for bet in analyzed_bets if bet['analysis'].get('risk_level') == 'High')
-
-        recommendations = [bet['analysis'].get('ai_suggestion', '') for bet in analyzed_bets]
-
-        return {
-            "total_bets": len(analyzed_bets),
-            "total_staked": round(total_staked, 2),
-            "total_potential_wins": round(total_potential, 2),
-            "average_win_probability": round(avg_win_prob, 2),
-            "high_risk_count": high_risk_count,
-            "recommendations_summary": recommendations
-        }
\ No newline at end of file
+        with metrics.time("summary_report_seconds", "Time to build a portfolio summary report"):
+            return PortfolioAnalyzer(analyzed_bets).summary(n_draws=n_draws, seed=seed)
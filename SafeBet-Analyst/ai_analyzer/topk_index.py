@@ -0,0 +1,84 @@
+"""
+SafeBet Analyst - Top-K Prediction Index
+Keeps predictions sorted per odds bucket so best-probability queries for any
+odds threshold are answered without re-sorting every fixture
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+
+
+# Upper edges of the odds buckets; the last bucket is open-ended
+ODDS_BUCKET_EDGES = (1.5, 2.0, 3.0, 5.0, 10.0)
+
+
+class PredictionTopKIndex:
+    def __init__(self, bucket_edges=ODDS_BUCKET_EDGES):
+        self.bucket_edges = list(bucket_edges)
+        # Each bucket is a list of (-score, key) kept in ascending order,
+        # i.e. best score first
+        self.buckets = [[] for _ in range(len(self.bucket_edges) + 1)]
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def keys(self):
+        return list(self.entries)
+
+    def _bucket_for(self, odd):
+        return bisect_right(self.bucket_edges, odd)
+
+    def upsert(self, key, odd, score, item):
+        """
+        Insert or replace one fixture's entry; only its bucket is touched
+        """
+        if key in self.entries:
+            self.remove(key)
+        bucket = self._bucket_for(odd)
+        insort(self.buckets[bucket], (-score, key))
+        self.entries[key] = (odd, score, bucket, item)
+
+    def remove(self, key):
+        """
+        Drop a fixture from the index
+        """
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        odd, score, bucket, _ = entry
+        ranked = self.buckets[bucket]
+        del ranked[bisect_left(ranked, (-score, key))]
+
+    def _stream(self, bucket, min_odd, max_odd, check):
+        """
+        Ranked (-score, key) pairs of one bucket, filtered by odds at the edges
+        """
+        if not check:
+            return iter(self.buckets[bucket])
+        return (
+            ranked for ranked in self.buckets[bucket]
+            if min_odd <= self.entries[ranked[1]][0] and (max_odd is None or self.entries[ranked[1]][0] <= max_odd)
+        )
+
+    def top(self, n, min_odd=0.0, max_odd=None):
+        """
+        Get the n highest-scoring items with min_odd <= odd <= max_odd
+        Only the boundary buckets are filtered; the rest are merged lazily
+        """
+        first = self._bucket_for(min_odd)
+        last = self._bucket_for(max_odd) if max_odd is not None else len(self.buckets) - 1
+        streams = [
+            self._stream(bucket, min_odd, max_odd, bucket in (first, last))
+            for bucket in range(first, last + 1)
+        ]
+
+        results = []
+        for _, key in heapq.merge(*streams):
+            if len(results) >= n:
+                break
+            results.append(self.entries[key][3])
+        return results
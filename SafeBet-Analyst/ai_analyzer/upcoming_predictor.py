@@ -5,13 +5,131 @@ Enhanced with professional football analysis features
 """
 
 from utils.data_utils import load_mock_match_data, simulate_live_match_data, calculate_momentum_factor, check_player_availability
+from utils.metrics import metrics
+from ai_analyzer.accumulator import AccumulatorBuilder, legs_from_prediction
+from ai_analyzer.topk_index import PredictionTopKIndex
+from ai_analyzer.market_odds import MarketOddsStore, StubOddsFeed, find_value_bets
+from ai_analyzer.calibration import calibrator as global_calibrator
+from utils.team_ratings import team_ratings
+from utils.settlement import settler
+from ai_analyzer.inplay_model import inplay_pricer
+from utils.lineup_index import lineup_index
+from utils.snapshots import snapshot_manager
+from utils.job_runner import job_runner
+from utils.columnar_store import columnar_store
+from utils.live_score_updater import live_updater
+import os
+import json
+import time
 import random
+import threading
 from datetime import datetime, timedelta
 
 
+# Factor weights and scaling of the match result model; tuned by ai_analyzer/param_search.py
+DEFAULT_PREDICTOR_PARAMS = {
+    "h2h_scale": 10.0,                              # H2H advantage range (+/-)
+    "form_weights": [0.15, 0.15, 0.2, 0.25, 0.25],  # Oldest to most recent game
+    "form_scale": 10.0,                             # Form advantage range (+/-)
+    "venue_bonus": 1.2,                             # Home advantage
+    "player_impact_scale": 5.0,                     # Key player availability range (+/-)
+    "news_impact_range": 1.5,                       # Injury/news noise range (+/-)
+    "rating_scale": 10.0,                           # Team rating advantage range (+/-), reached at 400 Elo points
+    "rating_weight": 0.5,                           # Rating factor weight when the fixture has form/H2H data
+    "rating_only_weight": 2.0,                      # Rating factor weight when ratings stand in for form and H2H
+    "max_advantage": 20.0,                          # Advantage that maps to the full adjustment
+    "base_probability": 0.33,
+    "probability_adjustment": 0.34,
+    "min_probability": 0.05,
+    "max_probability": 0.95
+}
+
+
+# Odds thresholds of the VIP sections, used to pick calibration tables
+VIP_SECTIONS = {2.0: "2+", 5.0: "5+"}
+
+
+def load_predictor_params(path=None):
+    """
+    Load predictor parameters from SAFEBET_PREDICTOR_CONFIG (default predictor_params.json),
+    falling back to the defaults for anything missing
+    """
+    params = dict(DEFAULT_PREDICTOR_PARAMS)
+    path = path or os.getenv("SAFEBET_PREDICTOR_CONFIG", "predictor_params.json")
+    if not os.path.exists(path):
+        return params
+    try:
+        with open(path, "r") as f:
+            loaded = json.load(f)
+        params.update({k: v for k, v in loaded.items() if k in DEFAULT_PREDICTOR_PARAMS})
+    except Exception as e:
+        print(f"Error loading predictor params from {path}: {str(e)}")
+    return params
+
+
+def save_predictor_params(params, path, meta=None):
+    """
+    Write a parameter set (plus optional metadata under "_meta") for load_predictor_params
+    """
+    data = {k: params[k] for k in DEFAULT_PREDICTOR_PARAMS if k in params}
+    if meta:
+        data["_meta"] = meta
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+class PredictionSnapshot:
+    """
+    Latest full prediction set of a default-configured predictor; new predictor
+    instances reuse it while it is younger than ttl seconds instead of re-predicting,
+    and serve older (e.g. restored) sets while a background refresh replaces them
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.created_at = None
+        self.predictions = []
+
+    def publish(self, predictions):
+        self.predictions, self.created_at = list(predictions), time.time()
+
+    def fresh(self):
+        """
+        The predictions, or None when there are none younger than ttl
+        """
+        if self.created_at is None or time.time() - self.created_at >= self.ttl:
+            return None
+        return self.predictions
+
+    def latest(self):
+        """
+        The predictions whatever their age, or None before the first publish or restore
+        """
+        return self.predictions if self.created_at is not None and self.predictions else None
+
+    def dump(self):
+        return {"created_at": self.created_at, "predictions": self.predictions}
+
+    def load(self, state):
+        if self.created_at is None:
+            self.created_at, self.predictions = state["created_at"], state["predictions"]
+
+
 class UpcomingEventPredictor:
-    def __init__(self):
+    def __init__(self, params=None, ratings=None, lineups=None, calibrator=None):
         self.matches_data = load_mock_match_data()
+        self.params = dict(DEFAULT_PREDICTOR_PARAMS, **params) if params is not None else load_predictor_params()
+        self.ratings = ratings or team_ratings
+        self.lineups = lineups or lineup_index
+        self.calibrator = calibrator or global_calibrator
+        # Only predictors on the app's own configuration share predictions
+        self.shares_predictions = params is None and ratings is None and lineups is None and calibrator is None
+        self.best_index = PredictionTopKIndex()
+        # Publish time of the shared prediction set the index holds; a predictor
+        # kept across reruns applies newer sets match by match
+        self.index_version = None
+        self.index_lock = threading.RLock()
+        self.odds_store = MarketOddsStore()
 
     def get_upcoming_matches(self):
         """
@@ -40,7 +158,12 @@ class UpcomingEventPredictor:
         """
         Predict outcome of a single match based on various factors
         Enhanced to provide all possible betting outcomes with probabilities
+        Fixtures without recent_form/h2h_last_5 are predicted from team ratings
         """
+        has_form_data = 'recent_form' in match_data and 'h2h_last_5' in match_data
+        if not has_form_data:
+            match_data = self._rating_fixture(match_data)
+
         # Calculate H2H advantage
         h2h_advantage = self._calculate_h2h_advantage(match_data['h2h_last_5'])
 
@@ -56,10 +179,14 @@ class UpcomingEventPredictor:
         # Calculate injury/news impact
         news_impact = self._calculate_news_impact(match_data)
 
+        # Calculate team rating advantage; it stands in for both H2H and form when those are missing
+        rating_advantage = self._calculate_rating_advantage(match_data)
+        rating_weight = self.params['rating_weight' if has_form_data else 'rating_only_weight']
+
         # Combine all factors to determine prediction
         total_advantage = {
-            'home': h2h_advantage['home'] + form_advantage['home'] + venue_advantage['home'] + player_impact['home'] + news_impact['home'],
-            'away': h2h_advantage['away'] + form_advantage['away'] + venue_advantage['away'] + player_impact['away'] + news_impact['away']
+            'home': h2h_advantage['home'] + form_advantage['home'] + venue_advantage['home'] + player_impact['home'] + news_impact['home'] + rating_weight * rating_advantage['home'],
+            'away': h2h_advantage['away'] + form_advantage['away'] + venue_advantage['away'] + player_impact['away'] + news_impact['away'] + rating_weight * rating_advantage['away']
         }
 
         # Determine winner based on total advantage
@@ -67,18 +194,20 @@ class UpcomingEventPredictor:
 
         # Calculate probabilities with more realistic distribution
         # Base probability is 1/3 for each outcome, adjusted by advantage
-        base_prob = 0.33
-        max_advantage = 20  # Maximum possible advantage from all factors
+        params = self.params
+        base_prob = params['base_probability']
+        max_advantage = params['max_advantage']  # Maximum possible advantage from all factors
 
         # Calculate adjusted probabilities
-        home_prob = base_prob + (home_advantage / max_advantage) * 0.34  # Max adjustment of 34%
-        away_prob = base_prob - (home_advantage / max_advantage) * 0.34
+        home_prob = base_prob + (home_advantage / max_advantage) * params['probability_adjustment']
+        away_prob = base_prob - (home_advantage / max_advantage) * params['probability_adjustment']
         draw_prob = 1 - home_prob - away_prob
 
         # Ensure probabilities are within bounds
-        home_prob = max(0.05, min(0.95, home_prob))
-        away_prob = max(0.05, min(0.95, away_prob))
-        draw_prob = max(0.05, min(0.95, draw_prob))
+        low, high = params['min_probability'], params['max_probability']
+        home_prob = max(low, min(high, home_prob))
+        away_prob = max(low, min(high, away_prob))
+        draw_prob = max(low, min(high, draw_prob))
 
         # Normalize to ensure they sum to 1
         total_prob = home_prob + away_prob + draw_prob
@@ -86,29 +215,47 @@ class UpcomingEventPredictor:
         away_prob /= total_prob
         draw_prob /= total_prob
 
+        # Calibration tables are fitted on these pre-calibration values, never on their own outputs
+        raw_probs = [home_prob, draw_prob, away_prob]
+        sorted_raw = sorted(raw_probs, reverse=True)
+        raw_confidence = min(99.9, round((sorted_raw[0] - sorted_raw[1]) * 100 + 50, 1))  # Scale to 50-100 range
+
+        # Map to observed hit rates once enough results have been tracked
+        if self.calibrator.is_fitted("MatchResult"):
+            calibrated = self.calibrator.apply("MatchResult", None, [home_prob, draw_prob, away_prob])
+            if calibrated.sum() > 0:
+                home_prob, draw_prob, away_prob = (float(p) for p in calibrated / calibrated.sum())
+
         # Determine most likely outcome
         outcomes = ['home_win', 'draw', 'away_win']
         probs = [home_prob, draw_prob, away_prob]
         predicted_outcome_idx = probs.index(max(probs))
         predicted_outcome = outcomes[predicted_outcome_idx]
 
-        # Calculate confidence based on the difference between the highest and second-highest probability
-        sorted_probs = sorted(probs, reverse=True)
-        confidence = round((sorted_probs[0] - sorted_probs[1]) * 100 + 50, 1)  # Scale to 50-100 range
+        # Confidence comes from the gap between the two most likely raw outcomes
+        confidence = round(self.calibrator.apply("confidence", None, raw_confidence / 100) * 100, 1)
 
         # Generate comprehensive betting market analysis
         betting_markets = self._generate_betting_markets(match_data, home_prob, away_prob, draw_prob)
 
         return {
+            'match_id': match_data.get('match_id') or f"{match_data['home_team']} vs {match_data['away_team']}",
             'match': f"{match_data['home_team']} vs {match_data['away_team']}",
             'predicted_outcome': self._format_outcome(predicted_outcome, match_data['home_team'], match_data['away_team']),
             'confidence': min(99.9, confidence),  # Cap at 99.9 to avoid 100% certainty
+            'raw_confidence': raw_confidence,
+            'raw_probabilities': {
+                'home_win': round(raw_probs[0] * 100, 1),
+                'draw': round(raw_probs[1] * 100, 1),
+                'away_win': round(raw_probs[2] * 100, 1)
+            },
             'probabilities': {
                 'home_win': round(home_prob * 100, 1),
                 'draw': round(draw_prob * 100, 1),
                 'away_win': round(away_prob * 100, 1)
             },
             'betting_markets': betting_markets,
+            'expected_goals': self._calculate_expected_goals(home_prob, away_prob, draw_prob),
             'key_factors': self._generate_key_factors(match_data, total_advantage),
             'h2h_stats': self._format_h2h_stats(match_data['h2h_last_5'], match_data['home_team'], match_data['away_team']),
             'match_date': match_data['date']
@@ -143,6 +290,20 @@ class UpcomingEventPredictor:
 
         return markets
 
+    def _calculate_expected_goals(self, home_prob, away_prob, draw_prob):
+        """
+        Pre-match goal expectations per team; the total matches the Over/Under markets
+        and is split by each side's win probability plus half the draw
+        """
+        total_prob = home_prob + away_prob + draw_prob
+        expected_total_goals = 2.5 + ((home_prob + away_prob) / total_prob - 1) * 0.5
+        home_share = (home_prob + draw_prob / 2) / total_prob
+
+        return {
+            'home': round(expected_total_goals * home_share, 2),
+            'away': round(expected_total_goals * (1 - home_share), 2)
+        }
+
     def _calculate_over_under_markets(self, expected_goals):
         """
         Calculate Over/Under probabilities for different goal thresholds
@@ -317,9 +478,9 @@ class UpcomingEventPredictor:
         home_ratio = home_wins / total_games
         away_ratio = away_wins / total_games
 
-        # Scale to -10 to 10 range
-        home_advantage = (home_ratio - away_ratio) * 10
-        away_advantage = (away_ratio - home_ratio) * 10
+        # Scale to -h2h_scale to h2h_scale range
+        home_advantage = (home_ratio - away_ratio) * self.params['h2h_scale']
+        away_advantage = (away_ratio - home_ratio) * self.params['h2h_scale']
 
         return {'home': home_advantage, 'away': away_advantage}
 
@@ -331,19 +492,20 @@ class UpcomingEventPredictor:
         away_form = form_data['away']
 
         # Convert form to points (W=3, D=1, L=0), with more weight to recent games
-        weights = [0.15, 0.15, 0.2, 0.25, 0.25]  # More weight to last 3 games
+        weights = self.params['form_weights']  # More weight to recent games
 
         home_points = sum([points * weights[i] for i, points in enumerate([3 if x == 3 else 1 if x == 1 else 0 for x in home_form])])
         away_points = sum([points * weights[i] for i, points in enumerate([3 if x == 3 else 1 if x == 1 else 0 for x in away_form])])
 
-        # Calculate advantage (scale to -10 to 10)
+        # Calculate advantage (scale to -form_scale to form_scale)
+        form_scale = self.params['form_scale']
         max_possible_points = 3 * sum(weights)  # Max points if all wins
         form_diff = home_points - away_points
-        scaled_diff = (form_diff / max_possible_points) * 10
+        scaled_diff = (form_diff / max_possible_points) * form_scale
 
         return {
-            'home': max(-10, min(10, scaled_diff)),
-            'away': max(-10, min(10, -scaled_diff))
+            'home': max(-form_scale, min(form_scale, scaled_diff)),
+            'away': max(-form_scale, min(form_scale, -scaled_diff))
         }
 
     def _calculate_venue_advantage(self, venue):
@@ -352,24 +514,66 @@ class UpcomingEventPredictor:
         """
         # Standard home advantage
         return {
-            'home': 1.2,  # Home advantage
-            'away': -1.2
+            'home': self.params['venue_bonus'],  # Home advantage
+            'away': -self.params['venue_bonus']
         }
 
+    def _calculate_rating_advantage(self, match_data):
+        """
+        Calculate advantage from team ratings, taken from match_data['ratings'] when
+        the fixture carries them and looked up in the rating store otherwise
+        """
+        ratings = match_data.get('ratings') or {
+            'home': self.ratings.rating(match_data['home_team']),
+            'away': self.ratings.rating(match_data['away_team'])
+        }
+
+        # Scale to -rating_scale to rating_scale range
+        rating_scale = self.params['rating_scale']
+        scaled_diff = (ratings['home'] - ratings['away']) / 400 * rating_scale
+        scaled_diff = max(-rating_scale, min(rating_scale, scaled_diff))
+
+        return {'home': scaled_diff, 'away': -scaled_diff}
+
+    def _rating_fixture(self, match_data):
+        """
+        Fill in a fixture that only names the teams so it can be predicted from ratings
+        """
+        fixture = dict(match_data)
+        fixture.setdefault('ratings', {
+            'home': self.ratings.rating(fixture['home_team']),
+            'away': self.ratings.rating(fixture['away_team'])
+        })
+        fixture['h2h_last_5'] = {'home_wins': 0, 'away_wins': 0, 'draws': 0}
+        fixture['recent_form'] = {'home': [], 'away': []}
+        fixture.setdefault('venue', f"{fixture['home_team']} Stadium")
+        fixture.setdefault('date', datetime.now().strftime("%Y-%m-%d %H:%M"))
+        return fixture
+
+    def predict_from_ratings(self, home_team, away_team, **details):
+        """
+        Predict any fixture from team ratings alone (details e.g. league, date, venue)
+        """
+        return self.predict_match_outcome(dict(details, home_team=home_team, away_team=away_team))
+
     def _calculate_player_impact(self, match_data):
         """
         Calculate impact based on key player availability
         """
-        # Simulate key player availability (in a real app, this would come from an API)
-        home_available = random.randint(1, len(match_data['key_players_home']))
-        away_available = random.randint(1, len(match_data['key_players_away']))
+        if not match_data.get('key_players_home') or not match_data.get('key_players_away'):
+            return {'home': 0, 'away': 0}
 
-        home_rate = home_available / len(match_data['key_players_home'])
-        away_rate = away_available / len(match_data['key_players_away'])
+        # No impact until both lineups are known (from match_data['lineups'] or the live feed)
+        available = self.lineups.match_availability(match_data)
+        if available is None:
+            return {'home': 0, 'away': 0}
 
-        # Scale to -5 to 5 range
-        home_impact = (home_rate - away_rate) * 5
-        away_impact = (away_rate - home_rate) * 5
+        home_rate = available['home']['availability_rate']
+        away_rate = available['away']['availability_rate']
+
+        # Scale to -player_impact_scale to player_impact_scale range
+        home_impact = (home_rate - away_rate) * self.params['player_impact_scale']
+        away_impact = (away_rate - home_rate) * self.params['player_impact_scale']
 
         return {
             'home': home_impact,
@@ -382,8 +586,9 @@ class UpcomingEventPredictor:
         """
         # Simulate news impact (in a real app, this would come from an API)
         # Randomly assign news impact for demo purposes
-        home_news_impact = random.uniform(-1.5, 1.5)
-        away_news_impact = random.uniform(-1.5, 1.5)
+        news_range = self.params['news_impact_range']
+        home_news_impact = random.uniform(-news_range, news_range)
+        away_news_impact = random.uniform(-news_range, news_range)
 
         return {
             'home': home_news_impact,
@@ -428,11 +633,20 @@ class UpcomingEventPredictor:
         else:
             factors.append(f"Form: Similar form ({home_form_points}-{away_form_points})")
 
+        # Rating factor
+        if 'ratings' in match_data:
+            factors.append(f"Ratings: {match_data['home_team']} {match_data['ratings']['home']:.0f} vs {match_data['away_team']} {match_data['ratings']['away']:.0f}")
+
         # Venue factor
         factors.append("Venue advantage for home team")
 
         # Player availability factor
-        factors.append("Key player availability considered")
+        available = self.lineups.match_availability(match_data) if match_data.get('key_players_home') and match_data.get('key_players_away') else None
+        missing = available['home']['missing'] + available['away']['missing'] if available else []
+        if missing:
+            factors.append(f"Key players missing: {', '.join(missing)}")
+        else:
+            factors.append("Key player availability considered")
 
         # News/injury factor
         factors.append("Recent news and injuries considered")
@@ -453,9 +667,11 @@ class UpcomingEventPredictor:
 
         # Predict for all matches
         predictions = []
-        for match in matches:
-            pred = self.predict_match_outcome(match)
-            predictions.append(pred)
+        with metrics.time("prediction_batch_seconds", "Time to predict a batch of matches"):
+            for match in matches:
+                pred = self.predict_match_outcome(match)
+                predictions.append(pred)
+        metrics.inc("predictions_total", len(predictions), "Match predictions generated")
 
         # Sort by confidence
         predictions.sort(key=lambda x: x['confidence'], reverse=True)
@@ -561,26 +777,153 @@ class UpcomingEventPredictor:
 
         return slip_format
 
-    def get_best_probability_predictions(self, odd_threshold=2.0, top_n=5):
+    def get_accumulator_slips(self, targets=(2.0, 5.0, 10.0), objective="probability", max_legs=5, min_leg_probability=0.0):
         """
-        Get predictions with the best winning probability for specific odd thresholds
+        Build multi-leg accumulators from the indexed predictions, one per target combined odd
+        The "ev" objective needs bookmaker odds: fair-priced legs all have zero
+        edge, so without odds the slips maximize win probability instead
         """
-        predictions = self.get_betting_slips_by_odd_range(min_odd=odd_threshold)
+        predictions = self._indexed_predictions()
+        if not len(self.odds_store):
+            objective = "probability"
+        legs = []
+        for pred in predictions:
+            if len(self.odds_store):
+                pred = dict(pred, market_odds=self.odds_store.odds_for(pred['match_id']))
+            legs.extend(legs_from_prediction(pred))
+
+        builder = AccumulatorBuilder(max_legs=max_legs, min_leg_probability=min_leg_probability, objective=objective)
+        with metrics.time("accumulator_build_seconds", "Time to build accumulator slips", objective=objective):
+            return builder.build_slips(legs, targets)
+
+    def _index_prediction(self, pred):
+        """
+        Add or replace a prediction in the best-probability index
+        """
+        match_result = pred['betting_markets']['MatchResult']
+        max_result = max(match_result, key=match_result.get)
+        probability = match_result[max_result]
+        implied_odd = 1 / (probability / 100)
+
+        entry = pred.copy()
+        entry['calculated_odd'] = round(implied_odd, 2)
+        entry['recommended_probability'] = probability
+        self.best_index.upsert(pred['match_id'], implied_odd, probability, entry)
 
-        # Sort by probability of the recommended outcome
-        sorted_predictions = []
+        # Keep the latest prediction per match so it is settled when the match finishes
+        sections = [section for threshold, section in sorted(VIP_SECTIONS.items()) if implied_odd >= threshold]
+        settler.register(entry, sections[-1] if sections else None)
+        inplay_pricer.set_expectations(pred['match_id'], pred['expected_goals']['home'], pred['expected_goals']['away'])
+
+    def refresh_predictions(self):
+        """
+        Re-predict every upcoming match and rebuild the best-probability index
+        """
+        predictions = self.predict_top_matches(count=len(self.get_upcoming_matches()))
+        with self.index_lock:
+            self._apply_predictions(predictions)
+            if self.shares_predictions:
+                prediction_snapshot.publish(predictions)
+                self.index_version = prediction_snapshot.created_at
+        if self.shares_predictions:
+            # Every app process refreshes; only the leader stores the predictions
+            if columnar_store is not None and live_updater.is_leader():
+                columnar_store.write_predictions(predictions)
+        return predictions
+
+    def _apply_predictions(self, predictions):
+        """
+        Upsert each prediction and drop matches no longer predicted; untouched
+        buckets of the index are not re-sorted
+        """
+        current = set()
         for pred in predictions:
-            match_result = pred['betting_markets']['MatchResult']
-            max_result = max(match_result, key=match_result.get)
-            pred_with_prob = pred.copy()
-            pred_with_prob['recommended_probability'] = match_result[max_result]
-            sorted_predictions.append(pred_with_prob)
+            self._index_prediction(pred)
+            current.add(pred['match_id'])
+        for match_id in self.best_index.keys():
+            if match_id not in current:
+                self.best_index.remove(match_id)
 
-        # Sort by recommended probability descending
-        sorted_predictions.sort(key=lambda x: x['recommended_probability'], reverse=True)
+    def _ensure_index(self):
+        """
+        Keep the best-probability index in step with the shared predictions, else fill it by re-predicting
+        Expired shared predictions are served while a background job refreshes them
+        """
+        with self.index_lock:
+            if not self.shares_predictions:
+                if not len(self.best_index):
+                    self.refresh_predictions()
+                return
+            version = prediction_snapshot.created_at
+            predictions = prediction_snapshot.fresh()
+            if predictions is None:
+                predictions = prediction_snapshot.latest()
+                if predictions is not None:
+                    job_runner.submit("refresh_predictions", refresh_shared_predictions, unique=True)
+            if predictions is None:
+                self.refresh_predictions()
+            elif version != self.index_version:
+                self._apply_predictions(predictions)
+                self.index_version = version
 
-        # Return top N predictions
-        return sorted_predictions[:top_n]
+    def _indexed_predictions(self):
+        """
+        Every prediction in the best-probability index
+        """
+        with self.index_lock:
+            self._ensure_index()
+            return [entry[3] for entry in self.best_index.entries.values()]
+
+    def refresh_match(self, match_data):
+        """
+        Re-predict a single match and update only its entry in the index
+        """
+        pred = self.predict_match_outcome(match_data)
+        with self.index_lock:
+            self._index_prediction(pred)
+        return pred
+
+    def refresh_market_odds(self, predictions=None):
+        """
+        Ingest bookmaker odds snapshots from SAFEBET_ODDS_DIR, or from the stub feed when unset
+        """
+        odds_dir = os.getenv("SAFEBET_ODDS_DIR")
+        with metrics.time("odds_ingest_seconds", "Time to ingest bookmaker odds snapshots"):
+            if odds_dir:
+                return self.odds_store.ingest_directory(odds_dir)
+            if predictions is None:
+                predictions = self.predict_top_matches(count=len(self.matches_data))
+            return self.odds_store.ingest(StubOddsFeed().snapshot(predictions))
+
+    def get_value_bets(self, min_edge=0.0):
+        """
+        Score every predicted market against the best bookmaker price
+        Returns rows with edge, Kelly fraction and expected value, best edge first
+        """
+        predictions = self._indexed_predictions()
+        if not len(self.odds_store):
+            self.refresh_market_odds(predictions)
+
+        with metrics.time("value_detection_seconds", "Time to score markets against bookmaker odds"):
+            scored = find_value_bets(predictions, self.odds_store, min_edge=min_edge)
+        return scored[scored['is_value']].to_dict('records')
+
+    def get_best_probability_predictions(self, odd_threshold=2.0, top_n=5):
+        """
+        Get predictions with the best winning probability for specific odd thresholds
+        """
+        with self.index_lock:
+            self._ensure_index()
+            # Copies so callers can annotate results without touching the index
+            results = [entry.copy() for entry in self.best_index.top(top_n, min_odd=odd_threshold)]
+
+        # VIP sections get their own confidence calibration once they have enough tracked results
+        section = VIP_SECTIONS.get(odd_threshold)
+        if section and results and self.calibrator.is_fitted("confidence", section):
+            raw = [entry['raw_confidence'] / 100 for entry in results]
+            for entry, calibrated in zip(results, self.calibrator.apply("confidence", section, raw)):
+                entry['confidence'] = min(99.9, round(float(calibrated) * 100, 1))
+        return results
 
     def get_2plus_best_predictions(self, top_n=5):
         """
@@ -592,4 +935,17 @@ class UpcomingEventPredictor:
         """
         Get best probability predictions for 5+ odds section
         """
-        return self.get_best_probability_predictions(odd_threshold=5.0, top_n=top_n)
\ No newline at end of file
+        return self.get_best_probability_predictions(odd_threshold=5.0, top_n=top_n)
+
+
+def refresh_shared_predictions(job):
+    """
+    Background job: re-predict with the app's configuration and publish the new set
+    """
+    job.report(0.1, "Re-predicting upcoming matches")
+    return len(UpcomingEventPredictor().refresh_predictions())
+
+
+# Global prediction set shared across reruns and kept in warm-start snapshots
+prediction_snapshot = PredictionSnapshot(ttl=int(os.getenv("SAFEBET_PREDICTION_TTL", "300")))
+snapshot_manager.register("predictions", prediction_snapshot.dump, prediction_snapshot.load)
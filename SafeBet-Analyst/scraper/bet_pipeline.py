@@ -0,0 +1,57 @@
+"""
+SafeBet Analyst - Bet Pipeline
+Scrape -> store -> analyze workflow run as a background job: scraped bets are
+published as partial results before the (slower) AI analysis starts
+"""
+
+import os
+import asyncio
+from scraper.bet_scraper import BetScraper
+from utils.columnar_store import columnar_store
+
+
+ANALYSIS_CHUNK_SIZE = 8
+
+
+async def fetch_and_analyze_bets(job, predictor, username=None, password=None, headless=True, scraper_factory=BetScraper,
+                                store=None):
+    """
+    Scrape active and historical bets read-only, then analyze the active bets
+    Scraped bets are appended to the columnar store (default: the global one, if enabled)
+    Partial results: bets_data once scraped, analyzed_bets as analysis progresses
+    """
+    store = store or columnar_store
+    scraper = scraper_factory()
+    try:
+        job.report(0.05, "Starting browser")
+        await scraper.initialize(headless=headless)
+        await scraper.ensure_read_only_mode()
+
+        job.report(0.15, "Logging in")
+        await scraper.login(username, password)
+
+        job.report(0.3, "Loading active bets")
+        active_bets = await scraper.get_active_bets()
+        job.report(0.4, f"Loaded {len(active_bets)} active bets", bets_data={'active': active_bets, 'historical': []})
+
+        job.report(0.45, "Loading bet history")
+        await scraper.navigate_to_history()
+        historical_bets = await scraper.scrape_bets()
+    finally:
+        await scraper.close()
+
+    bets_data = {'active': active_bets, 'historical': historical_bets}
+    if store is not None:
+        account = username or os.getenv("XBET_USERNAME") or "default"
+        await asyncio.to_thread(store.write_bets, bets_data, account)
+    job.report(0.6, f"Stored {len(active_bets)} active and {len(historical_bets)} historical bets", bets_data=bets_data)
+
+    # Analysis is sync (LLM calls); run chunks off the event loop and publish each one
+    analyzed_bets = []
+    for start in range(0, len(active_bets), ANALYSIS_CHUNK_SIZE):
+        chunk = active_bets[start:start + ANALYSIS_CHUNK_SIZE]
+        analyzed_bets += await asyncio.to_thread(predictor.batch_analyze_bets, chunk, pack_size=ANALYSIS_CHUNK_SIZE)
+        job.report(0.6 + 0.4 * len(analyzed_bets) / len(active_bets),
+                   f"Analyzed {len(analyzed_bets)}/{len(active_bets)} bets", analyzed_bets=list(analyzed_bets))
+
+    return {'bets_data': bets_data, 'analyzed_bets': analyzed_bets}
@@ -11,6 +11,7 @@ import time
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from utils.metrics import metrics
 
 # Load environment variables
 load_dotenv()
@@ -61,10 +62,11 @@ class BetScraper:
             raise ValueError("Username and password must be provided or set in environment variables")
 
         # Navigate to login page
-        await self.page.goto("https://1xbet.com/en/login")
+        with metrics.time("scrape_page_load_seconds", "Time to load a scraped page", page="login"):
+            await self.page.goto("https://1xbet.com/en/login")
 
-        # Wait for login form to load
-        await self.page.wait_for_selector('input[name="login"]', timeout=10000)
+            # Wait for login form to load
+            await self.page.wait_for_selector('input[name="login"]', timeout=10000)
 
         # Fill in credentials
         await self.page.fill('input[name="login"]', self.username)
@@ -87,10 +89,11 @@ class BetScraper:
     async def navigate_to_history(self):
         """Navigate to the bet history page - READ ONLY ACCESS"""
         # Go directly to the history page
-        await self.page.goto("https://1xbet.com/en/office/history")
+        with metrics.time("scrape_page_load_seconds", "Time to load a scraped page", page="history"):
+            await self.page.goto("https://1xbet.com/en/office/history")
 
-        # Wait for page to load
-        await self.page.wait_for_selector('.history-table, .bet-slip-history', timeout=15000)
+            # Wait for page to load
+            await self.page.wait_for_selector('.history-table, .bet-slip-history', timeout=15000)
 
         # Verify we're on the right page and not on payment/deposit sections
         current_url = self.page.url
@@ -104,6 +107,7 @@ class BetScraper:
 
         # Extract bet data using JavaScript evaluation
         # This is read-only and does not interact with any betting functions
+        extraction_start = time.perf_counter()
         bets_data = await self.page.evaluate("""
             () => {
                 // Look for different possible selectors for bet items
@@ -187,16 +191,20 @@ class BetScraper:
             }
         """)
 
+        metrics.observe("scrape_extraction_seconds", time.perf_counter() - extraction_start, "Time to extract bets from a page", page="history")
+        metrics.inc("scrape_bets_extracted_total", len(bets_data), "Bets extracted by the scraper", page="history")
         return bets_data
 
     async def get_active_bets(self):
         """Get currently active/pending bets - READ ONLY"""
         # Navigate to active bets section
-        await self.page.goto("https://1xbet.com/en/office/bets")
+        with metrics.time("scrape_page_load_seconds", "Time to load a scraped page", page="active_bets"):
+            await self.page.goto("https://1xbet.com/en/office/bets")
 
-        # Wait for active bets to load
-        await self.page.wait_for_selector('.active-bet, .current-bet, .live-bet', timeout=15000)
+            # Wait for active bets to load
+            await self.page.wait_for_selector('.active-bet, .current-bet, .live-bet', timeout=15000)
 
+        extraction_start = time.perf_counter()
         active_bets = await self.page.evaluate("""
             () => {
                 // Look for different possible selectors for active bets
@@ -268,6 +276,8 @@ class BetScraper:
             }
         """)
 
+        metrics.observe("scrape_extraction_seconds", time.perf_counter() - extraction_start, "Time to extract bets from a page", page="active_bets")
+        metrics.inc("scrape_bets_extracted_total", len(active_bets), "Bets extracted by the scraper", page="active_bets")
         return active_bets
 
     async def ensure_read_only_mode(self):
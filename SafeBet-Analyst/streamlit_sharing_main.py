@@ -4,13 +4,18 @@
 import streamlit as st
 import pandas as pd
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 import random
 from utils.data_utils import load_mock_match_data, load_prediction_history
 from utils.live_score_updater import live_updater
+from utils.live_state import live_state
+from utils.snapshots import snapshot_manager
 from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
 
 def run_dashboard():
+    # Warm-start from the last snapshot on the first run of this process
+    snapshot_manager.start()
+
     # Custom header with SpeedoVIP branding
     st.markdown("<h1 style='text-align: center; color: #4A90E2;'>🚀 SpeedoVIP - Premium Football Analysis</h1>", unsafe_allow_html=True)
     st.markdown("<h3 style='text-align: center; color: #50C878;'>AI-Powered Betting Analysis & Prediction Tool</h3>", unsafe_allow_html=True)
@@ -66,7 +71,7 @@ def run_dashboard():
     
     if st.sidebar.button("⚽ Refresh Live Scores"):
         # Update live scores in session state
-        st.session_state.live_scores = live_updater.live_matches
+        st.session_state.live_scores = live_state.refresh().matches
         st.rerun()
 
     # Navigation
@@ -269,59 +274,10 @@ def show_live_scores_streamlit_sharing():
     else:
         st.info("📡 Auto-update disabled")
     
-    # Simulate live matches
-    matches = load_mock_match_data()
-    now = datetime.now()
-    
-    # Filter to only show matches in the next 2 days
-    two_days_later = now + timedelta(days=2)
-    upcoming_matches = []
-    for match in matches:
-        match_date = datetime.strptime(match['date'], "%Y-%m-%d %H:%M")
-        if now <= match_date <= two_days_later:
-            upcoming_matches.append(match)
-    
-    # Simulate live scores for matches that have started
-    live_matches = []
-    finished_matches = []
-    
-    for match in upcoming_matches:
-        match_date = datetime.strptime(match['date'], "%Y-%m-%d %H:%M")
-        if match_date <= now:
-            # Match has started
-            time_since_start = now - match_date
-            minutes_elapsed = min(90, int(time_since_start.total_seconds() / 60))
-            
-            if minutes_elapsed < 90:
-                # Still live
-                home_goals = min(4, max(0, int(minutes_elapsed / 20) + random.randint(-1, 1)))
-                away_goals = min(4, max(0, int(minutes_elapsed / 25) + random.randint(-1, 1)))
-                
-                live_matches.append({
-                    'home_team': match['home_team'],
-                    'away_team': match['away_team'],
-                    'home_score': home_goals,
-                    'away_score': away_goals,
-                    'minute': minutes_elapsed,
-                    'status': 'LIVE',
-                    'league': match['league'],
-                    'venue': match['venue']
-                })
-            else:
-                # Finished
-                home_goals = min(5, max(0, random.randint(0, 4)))
-                away_goals = min(5, max(0, random.randint(0, 4)))
-                
-                finished_matches.append({
-                    'home_team': match['home_team'],
-                    'away_team': match['away_team'],
-                    'home_score': home_goals,
-                    'away_score': away_goals,
-                    'minute': 'FT',
-                    'status': 'FINISHED',
-                    'league': match['league'],
-                    'venue': match['venue']
-                })
+    # Shared live state; the feed refreshes at most once per update interval
+    snapshot = live_state.snapshot()
+    live_matches = list(snapshot.live().values())
+    finished_matches = list(snapshot.finished().values())
     
     # Tabs for different match states
     live_tab, finished_tab = st.tabs([f"🔴 Live Matches ({len(live_matches)})", f"✅ Finished ({len(finished_matches)})"])
@@ -0,0 +1,112 @@
+"""
+SafeBet Analyst - Accumulator Tests
+Validates the accumulator builder against brute force and on large candidate sets
+"""
+
+import os
+import sys
+import math
+import time
+import random
+from itertools import combinations, product
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.accumulator import AccumulatorBuilder, legs_from_prediction, LOG_ODDS_RESOLUTION
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
+
+
+def random_legs(n_matches, per_match, seed):
+    rng = random.Random(seed)
+    legs = []
+    for m in range(n_matches):
+        for s in range(per_match):
+            probability = round(rng.uniform(10, 90), 1)
+            # Bookmaker odds somewhere around the fair price
+            odds = round(100 / probability * rng.uniform(0.85, 1.15), 2)
+            if odds >= 1.05:
+                legs.append({"match": f"Match {m}", "market": "Test", "selection": f"S{s}",
+                             "probability": probability, "odds": odds})
+    return legs
+
+
+def brute_force(legs, target_odd, max_legs, value, margin):
+    """Best objective over every one-leg-per-match combination clearly above the target"""
+    groups = {}
+    for leg in legs:
+        groups.setdefault(leg['match'], []).append(leg)
+    best = -math.inf
+    for k in range(1, max_legs + 1):
+        for matches in combinations(groups.values(), k):
+            for combo in product(*matches):
+                if sum(math.log(l['odds']) for l in combo) >= math.log(target_odd) + margin:
+                    best = max(best, sum(value(l) for l in combo))
+    return best
+
+
+def test_matches_brute_force():
+    """The builder should reach the target and match brute force on small sets"""
+    for objective in ("probability", "ev"):
+        builder = AccumulatorBuilder(max_legs=3, objective=objective)
+        for seed in range(5):
+            legs = random_legs(7, 3, seed)
+            for target in (2.0, 5.0, 10.0):
+                slip = builder.build(legs, target)
+                assert slip is not None
+                assert slip['combined_odd'] >= target - 0.01, "Slip must reach the target odd"
+                assert len({l['match'] for l in slip['legs']}) == len(slip['legs']), "One leg per match"
+                assert len(slip['legs']) <= 3
+
+                achieved = sum(builder._leg_value(l) for l in slip['legs'])
+                # Any combination that survives bucket rounding is a lower bound
+                reference = brute_force(legs, target, 3, builder._leg_value, (3 + 1) * LOG_ODDS_RESOLUTION)
+                assert achieved >= reference - 1e-9, (objective, seed, target)
+    print("[OK] Brute force comparison validated")
+
+
+def test_unreachable_target():
+    """No slip should be returned when the legs cannot reach the target"""
+    legs = [{"match": "A vs B", "market": "Test", "selection": "X", "probability": 80.0, "odds": 1.25}]
+    assert AccumulatorBuilder().build(legs, 5.0) is None
+    assert AccumulatorBuilder().build([], 2.0) is None
+    print("[OK] Unreachable target validated")
+
+
+def test_scales_to_hundreds_of_legs():
+    """Hundreds of matches with several legs each should solve quickly"""
+    legs = random_legs(300, 8, seed=42)
+    builder = AccumulatorBuilder(max_legs=6)
+    start = time.perf_counter()
+    slips = builder.build_slips(legs, targets=(2.0, 5.0, 10.0))
+    elapsed = time.perf_counter() - start
+    assert all(slip and slip['combined_odd'] >= target - 0.01 for target, slip in slips.items())
+    assert elapsed < 2.0, f"Building took {elapsed:.2f}s"
+    print(f"[OK] {len(legs)} legs solved in {elapsed:.2f}s")
+
+
+def test_predictor_accumulators():
+    """Upcoming predictions should produce accumulators for each target"""
+    predictor = UpcomingEventPredictor()
+    predictions = predictor.predict_top_matches(count=len(predictor.matches_data))
+    legs = legs_from_prediction(predictions[0])
+    assert any(l['market'] == "Double Chance" for l in legs)
+
+    slips = predictor.get_accumulator_slips(targets=(2.0, 5.0))
+    for target, slip in slips.items():
+        assert slip['combined_odd'] >= target - 0.01
+        assert slip['joint_probability'] > 0
+
+    # Slips come from the indexed predictions, so reruns agree with each other and the index
+    assert predictor.get_accumulator_slips(targets=(2.0, 5.0)) == slips
+    indexed = {entry[3]['match'] for entry in predictor.best_index.entries.values()}
+    assert all(leg['match'] in indexed for slip in slips.values() for leg in slip['legs'])
+    # Without bookmaker odds every leg has zero edge; "ev" falls back to win probability
+    assert predictor.get_accumulator_slips(targets=(2.0, 5.0), objective="ev") == slips
+    print("[OK] Predictor accumulators validated")
+
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_unreachable_target()
+    test_scales_to_hundreds_of_legs()
+    test_predictor_accumulators()
+    print("\n[SUCCESS] Accumulator tests passed!")
@@ -0,0 +1,112 @@
+"""
+SafeBet Analyst - Backtest Tests
+Validates feature building, scoring and full-season replays
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.backtest import (build_match_records, score_predictions, run_backtest,
+                                  load_fixtures, generate_synthetic_season)
+from ai_analyzer.calibration import calibrator
+
+
+FIXTURES = pd.DataFrame({
+    "date": pd.to_datetime(["2024-01-01", "2024-01-08", "2024-01-15"]),
+    "home_team": ["A", "B", "A"],
+    "away_team": ["B", "A", "C"],
+    "home_goals": [2, 1, 0],
+    "away_goals": [0, 1, 0],
+    "odds_home": [2.0, 2.5, 1.8],
+    "odds_draw": [3.2, 3.0, 3.5],
+    "odds_away": [3.5, 2.8, 4.0],
+})
+
+
+def test_features_only_use_past_results():
+    """Form and head-to-head should only reflect fixtures already played"""
+    records = build_match_records(FIXTURES)
+    # Teams without an earlier result are left to the ratings
+    assert 'recent_form' not in records[0] and 'h2h_last_5' not in records[0]
+    assert 'recent_form' not in records[2], "C has not played yet"
+    # B hosts A after losing 2-0 there
+    assert records[1]['recent_form'] == {"home": [0], "away": [3]}
+    assert records[1]['h2h_last_5'] == {"home_wins": 0, "away_wins": 1, "draws": 0}
+    print("[OK] Feature building validated")
+
+
+def test_scoring_values():
+    """Accuracy, Brier and ROI should match hand-computed values"""
+    probabilities = np.array([
+        [0.6, 0.3, 0.1, 0.5, 0.5],   # picks home, home won
+        [0.2, 0.3, 0.5, 0.5, 0.5],   # picks away, draw
+        [0.5, 0.4, 0.1, 0.5, 0.5],   # picks home, draw
+    ])
+    report = score_predictions(probabilities, FIXTURES)
+    result = report['markets']['MatchResult']
+    assert result['accuracy'] == round(1 / 3, 4)
+    brier = np.mean([0.4 ** 2 + 0.3 ** 2 + 0.1 ** 2, 0.2 ** 2 + 0.7 ** 2 + 0.5 ** 2, 0.5 ** 2 + 0.6 ** 2 + 0.1 ** 2])
+    assert result['brier'] == round(brier, 4)
+    assert result['roi'] == round((1.0 - 1 - 1) / 3, 4)
+    assert report['markets']['BTTS']['roi'] is None, "No BTTS odds means no ROI"
+    assert sum(b['count'] for b in result['calibration']) == 9
+    print("[OK] Scoring validated")
+
+
+def test_file_inputs_and_repeatability():
+    """CSV and Parquet inputs should give the same, repeatable report"""
+    season = generate_synthetic_season(n_teams=10, seed=3)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "season.csv")
+        parquet_path = os.path.join(directory, "season.parquet")
+        season.to_csv(csv_path, index=False)
+        season.to_parquet(parquet_path, index=False)
+        assert len(load_fixtures(parquet_path)) == len(season)
+
+        from_csv = run_backtest(csv_path, workers=1)
+        from_parquet = run_backtest(parquet_path, workers=2, chunk_size=30)
+    assert from_csv['markets'] == from_parquet['markets'], "Chunking and file format must not change results"
+    print("[OK] File inputs and repeatability validated")
+
+
+def test_replays_ignore_live_calibration():
+    """Tables the app has learned must not leak into replays"""
+    season = generate_synthetic_season(n_teams=10, seed=4)
+    calibrator.reset()
+    baseline = run_backtest(season, workers=1)
+    try:
+        rng = np.random.default_rng(0)
+        for p in rng.uniform(0.2, 0.9, 200):
+            calibrator.record("MatchResult", None, p, rng.random() < 0.4)
+        assert calibrator.is_fitted("MatchResult")
+        assert run_backtest(season, workers=1)['markets'] == baseline['markets']
+    finally:
+        calibrator.reset()
+    print("[OK] Replays independent of live calibration")
+
+
+def test_full_season_speed():
+    """Several full seasons should replay in a few seconds"""
+    seasons = generate_synthetic_season(n_teams=20, seasons=5, seed=1)
+    start = time.perf_counter()
+    report = run_backtest(seasons)
+    elapsed = time.perf_counter() - start
+    assert report['matches'] == 5 * 380
+    assert 0 < report['markets']['MatchResult']['accuracy'] < 1
+    assert report['markets']['OverUnder 2.5']['bets'] == report['matches']
+    assert elapsed < 5.0, f"Backtest took {elapsed:.2f}s"
+    print(f"[OK] Replayed {report['matches']} fixtures in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_features_only_use_past_results()
+    test_scoring_values()
+    test_file_inputs_and_repeatability()
+    test_replays_ignore_live_calibration()
+    test_full_season_speed()
+    print("\n[SUCCESS] Backtest tests passed!")
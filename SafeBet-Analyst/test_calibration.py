@@ -0,0 +1,119 @@
+"""
+SafeBet Analyst - Calibration Tests
+Validates isotonic/Platt fitting, lazy refits and how calibration reaches predictions
+"""
+
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.calibration import ProbabilityCalibrator, fit_isotonic, calibrator, MAX_KNOTS
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
+from utils.live_score_updater import LiveScoreUpdater
+
+
+def overconfident_samples(n, seed=0):
+    """Raw probabilities in 0.5-1.0 whose true hit rate is much flatter"""
+    rng = np.random.default_rng(seed)
+    raw = rng.uniform(0.5, 1.0, n)
+    hits = rng.random(n) < 0.5 + (raw - 0.5) * 0.4
+    return raw, hits
+
+
+def test_fits_recover_hit_rates():
+    """Both methods should map raw probabilities close to observed hit rates"""
+    raw, hits = overconfident_samples(5000)
+    for method in ("isotonic", "platt"):
+        cal = ProbabilityCalibrator(method=method)
+        for p, hit in zip(raw, hits):
+            cal.record("confidence", "2+", p, hit)
+        calibrated = cal.apply("confidence", "2+", np.array([0.6, 0.8, 0.95]))
+        assert np.all(np.abs(calibrated - np.array([0.54, 0.62, 0.68])) < 0.05), (method, calibrated)
+        assert np.all(np.diff(calibrated) >= 0), "Calibration must stay monotone"
+
+    xs, ys = fit_isotonic(raw, hits)
+    assert len(xs) <= MAX_KNOTS and np.all(np.diff(xs) > 0)
+    print("[OK] Isotonic and Platt fits validated")
+
+
+def test_lazy_refit_and_fallbacks():
+    """Tables appear after min_samples, refit on new results and fall back to the market table"""
+    cal = ProbabilityCalibrator(min_samples=10)
+    for _ in range(9):
+        cal.record("MatchResult", "5+", 0.8, False)
+    assert cal.apply("MatchResult", "5+", 0.8) == 0.8, "Too few samples means no calibration"
+
+    cal.record("MatchResult", "5+", 0.8, False)
+    assert cal.apply("MatchResult", "5+", 0.8) == 0.0
+    assert cal.apply("MatchResult", "2+", 0.8) == 0.0, "Unknown sections use the market-wide table"
+
+    for _ in range(10):
+        cal.record("MatchResult", "5+", 0.8, True)
+    assert cal.apply("MatchResult", "5+", 0.8) == 0.5, "New results should trigger a refit"
+    assert "MatchResult/5+" in cal.export_tables()
+    print("[OK] Lazy refits and fallbacks validated")
+
+
+def test_rolling_window():
+    """Each table keeps only its last max_samples results, so old results age out of refits"""
+    cal = ProbabilityCalibrator(min_samples=10, max_samples=100)
+    for _ in range(1000):
+        cal.record("BTTS", "2+", 0.7, False)
+    assert cal.apply("BTTS", "2+", 0.7) == 0.0
+    for _ in range(100):
+        cal.record("BTTS", "2+", 0.7, True)
+    assert all(len(column) == 100 for column in cal.samples[("BTTS", "2+")])
+    assert cal.apply("BTTS", "2+", 0.7) == 1.0, "Only the most recent window should be fitted"
+    print("[OK] Rolling sample window validated")
+
+
+def test_tracked_results_calibrate_predictions():
+    """Results tracked by the live updater should recalibrate outgoing confidence"""
+    calibrator.reset()
+    try:
+        predictor = UpcomingEventPredictor()
+        match = predictor.matches_data[0]
+        before = predictor.predict_match_outcome(match)
+        assert before['confidence'] == before['raw_confidence']
+
+        updater = LiveScoreUpdater()
+        raw, hits = overconfident_samples(400, seed=1)
+        for i, (p, hit) in enumerate(zip(raw, hits)):
+            updater.track_prediction_result(f"p{i}", "m", "Win", "Win" if hit else "Loss", p * 100, "2+", probability=p * 100)
+        assert len(updater.get_vip_prediction_history("2+")) == 400
+
+        after = predictor.predict_match_outcome(match)
+        assert after['confidence'] < after['raw_confidence'], "Overconfident history should lower confidence"
+
+        best = predictor.get_2plus_best_predictions(top_n=5)
+        assert all(p['confidence'] <= p['raw_confidence'] for p in best)
+    finally:
+        calibrator.reset()
+    print("[OK] Prediction calibration validated")
+
+
+def test_apply_latency():
+    """Applying a fitted table to a large batch should be near free"""
+    cal = ProbabilityCalibrator()
+    raw, hits = overconfident_samples(2000)
+    for p, hit in zip(raw, hits):
+        cal.record("MatchResult", None, p, hit)
+    cal.apply("MatchResult", None, 0.7)
+
+    batch = np.random.default_rng(2).uniform(0, 1, 100_000)
+    start = time.perf_counter()
+    cal.apply("MatchResult", None, batch)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.05, f"Calibrating 100k probabilities took {elapsed:.3f}s"
+    print(f"[OK] Calibrated 100k probabilities in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_fits_recover_hit_rates()
+    test_lazy_refit_and_fallbacks()
+    test_rolling_window()
+    test_tracked_results_calibrate_predictions()
+    test_apply_latency()
+    print("\n[SUCCESS] Calibration tests passed!")
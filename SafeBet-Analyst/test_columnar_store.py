@@ -0,0 +1,155 @@
+"""
+SafeBet Analyst - Columnar Store Tests
+Validates typed bet/prediction/history datasets, date-range partition pruning,
+compaction and read speed on months of data
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.columnar_store import ColumnarStore, bet_rows, prediction_rows
+
+
+BETS = {
+    'active': [{'match_name': 'A vs B', 'bet_type': 'W1', 'odds': '2.10', 'stake': 5, 'potential_win': 10.5,
+                'status': 'Active', 'time_left': '2h', 'timestamp': '2026-03-02T18:00:00'}],
+    'historical': [{'match_name': 'C vs D', 'bet_type': 'X', 'odds': 3.2, 'stake': 'N/A', 'status': 'Lost',
+                    'actual_win': 0, 'date': 'yesterday'}]
+}
+
+PREDICTION = {
+    'match_id': 'm1', 'match': 'A vs B', 'predicted_outcome': 'A to Win', 'confidence': 71.5,
+    'probabilities': {'home_win': 55.0, 'draw': 25.0, 'away_win': 20.0},
+    'expected_goals': {'home': 1.6, 'away': 0.9}, 'match_date': '2026-03-03 20:00',
+    'betting_markets': {'MatchResult': {'Win': 55.0, 'Draw': 25.0, 'Lose': 20.0},
+                        'OverUnder': {'2.5': {'Over': 52.0, 'Under': 48.0}},
+                        'RiskLevel': 'Low', 'Confidence': 70.0}
+}
+
+
+def test_typed_rows_and_round_trip():
+    """Scraped bets and predictions are typed, partitioned and read back per account and day"""
+    for file_format in ("arrow", "parquet"):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ColumnarStore(tmp, file_format=file_format)
+            assert store.read("bets").empty and list(store.read("bets").columns)[-2:] == ["date", "account"]
+
+            scraped_at = datetime(2026, 3, 4, 9, 0)
+            assert store.write_bets(BETS, account="alice", scraped_at=scraped_at) == 2
+            store.write_bets(BETS, account="bob", scraped_at=scraped_at)
+            bets = store.read("bets", account="alice")
+            assert len(bets) == 2 and bets['odds'].dtype.kind == 'f' and bets['odds'].iloc[0] == 2.1
+            assert bets['stake'].isna().iloc[1], "Unparseable numbers should be stored as nulls"
+            assert sorted(bets['date']) == ['2026-03-02', '2026-03-04'], "Undated bets are dated by the scrape"
+            assert len(store.read("bets", start="2026-03-03", columns=['match_name', 'account'])) == 2
+
+            assert store.write_predictions([PREDICTION], predicted_at=datetime(2026, 3, 2, 12)) == 6
+            markets = store.read("markets", match_id="m1")
+            assert set(markets['market']) == {'MatchResult', 'OverUnder 2.5'}, "Non-probability entries are skipped"
+            predictions = store.read("predictions", start="2026-03-02", end="2026-03-02")
+            assert predictions['match_date'].iloc[0] == pd.Timestamp('2026-03-03 20:00', tz='UTC')
+    rows, markets = prediction_rows([])
+    assert rows == [] and markets == [] and bet_rows({}, "x") == []
+    print("[OK] Typed round trip validated")
+
+
+def test_history_and_compaction():
+    """Settled history is appended per write and small files are merged per partition"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ColumnarStore(tmp, max_files=4)
+        for i in range(10):
+            store.write_history([{"prediction_id": f"p{i}", "match_id": "m1", "predicted_outcome": "Home Win",
+                                  "actual_outcome": "Home Win", "confidence": 80, "vip_section": "2+",
+                                  "predicted_at": "2026-05-01T10:00:00", "was_correct": True}])
+        partition = os.path.join(tmp, "history", "date=2026-05-01")
+        assert len(os.listdir(partition)) <= 4, "Partitions should be compacted after max_files writes"
+        history = store.read("history")
+        assert sorted(history['prediction_id']) == sorted(f"p{i}" for i in range(10))
+        assert history['was_correct'].all() and history['probability'].isna().all()
+
+        assert store.compact("history") == 1 and len(os.listdir(partition)) == 1
+        assert store.compact("history") == 0
+
+        # Settlement records keep the score, settlement time and every settled market
+        store.write_history([{"prediction_id": "m2:2+", "match_id": "m2", "match": "A vs B",
+                              "predicted_outcome": "Win", "actual_outcome": "Draw", "confidence": 64.0,
+                              "vip_section": "2+", "predicted_at": "2026-05-01T12:00:00",
+                              "settled_at": "2026-05-01T21:50:00", "actual_score": "1-1", "was_correct": False,
+                              "market": "MatchResult", "probability": 55.0,
+                              "market_results": [{"market": "MatchResult", "selection": "Draw", "probability": 25.0,
+                                                  "won": True},
+                                                 {"market": "BTTS", "selection": "Yes", "probability": 48.0,
+                                                  "won": True}]}])
+        settled = store.read("history", match_id="m2").iloc[0]
+        assert settled['match'] == "A vs B" and settled['actual_score'] == "1-1"
+        assert settled['settled_at'] == pd.Timestamp('2026-05-01 21:50', tz='UTC')
+        assert [result['selection'] for result in settled['market_results']] == ["Draw", "Yes"]
+    print("[OK] History and compaction validated")
+
+
+def test_workers_sharing_a_directory():
+    """Stores of several workers writing and compacting one partition keep every row exactly once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = [ColumnarStore(tmp, max_files=2) for _ in range(4)]
+        failed, duplicates = [], []
+
+        def worker(index, store):
+            for i in range(15):
+                record = {"prediction_id": f"w{index}-{i}", "match_id": "m1", "predicted_outcome": "Draw",
+                          "actual_outcome": "Draw", "confidence": 60, "predicted_at": "2026-05-01T10:00:00",
+                          "was_correct": True}
+                if store.write_history([record]) != 1:
+                    failed.append(record["prediction_id"])
+                ids = store.read("history")['prediction_id']
+                duplicates.append(len(ids) - ids.nunique())
+
+        threads = [threading.Thread(target=worker, args=(i, store)) for i, store in enumerate(stores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        history = stores[0].read("history")
+        assert not failed, failed
+        assert sorted(history['prediction_id']) == sorted(f"w{w}-{i}" for w in range(4) for i in range(15))
+        assert not any(duplicates), "Readers should never see a merged file next to the files it replaces"
+    print("[OK] Shared directory validated")
+
+
+def test_months_of_data():
+    """A year of daily bet partitions: a one-month date-range read should take milliseconds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ColumnarStore(tmp)
+        start = datetime(2026, 1, 1)
+        rows = []
+        for i in range(365 * 200):
+            placed = start + timedelta(minutes=i * 7.2)
+            rows.append({'match_name': f'Team {i % 97} vs Team {i % 89}', 'bet_type': 'W1', 'odds': 1.5 + i % 7,
+                         'stake': 5.0, 'potential_win': 10.0, 'status': 'Won' if i % 3 else 'Lost',
+                         'timestamp': placed.isoformat()})
+        store.write_bets({'historical': rows}, account="alice", scraped_at=start)
+
+        begin = time.perf_counter()
+        march = store.read("bets", start="2026-03-01", end="2026-03-31", account="alice")
+        elapsed = time.perf_counter() - begin
+        assert len(march) == 31 * 200 and march['placed_at'].dt.month.eq(3).all()
+
+        begin = time.perf_counter()
+        year = store.read("bets", columns=['odds', 'status', 'date'])
+        full = time.perf_counter() - begin
+    assert len(year) == 365 * 200 and elapsed < 0.2 and full < 1.0, (elapsed, full)
+    print(f"[OK] One month of a 73k-bet year in {elapsed * 1000:.1f}ms, full year in {full * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_typed_rows_and_round_trip()
+    test_history_and_compaction()
+    test_workers_sharing_a_directory()
+    test_months_of_data()
+    print("\n[SUCCESS] Columnar store tests passed!")
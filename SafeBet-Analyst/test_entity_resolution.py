@@ -0,0 +1,101 @@
+"""
+SafeBet Analyst - Entity Resolution Tests
+Validates team-name normalization, fuzzy lookups and bet-to-fixture resolution
+"""
+
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath('.'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from utils.entity_resolution import normalize_team_name, split_match_name, FixtureResolver
+from utils.live_score_updater import live_updater
+from ai_analyzer.predictor import AIPredictor
+
+
+FIXTURES = [
+    {"match_id": "m1", "home_team": "Manchester United", "away_team": "Liverpool"},
+    {"match_id": "m2", "home_team": "Bayern Munich", "away_team": "Borussia Dortmund"},
+    {"match_id": "m3", "home_team": "Atlético Madrid", "away_team": "Real Madrid"},
+    {"match_id": "m4", "home_team": "PSG", "away_team": "Marseille"}
+]
+
+
+def test_normalization():
+    """Accents, punctuation, filler tokens and aliases should normalize away"""
+    assert normalize_team_name("Atlético Madrid") == "atletico madrid"
+    assert normalize_team_name("Arsenal F.C.") == "arsenal"
+    assert normalize_team_name("Man Utd") == "manchester united"
+    assert normalize_team_name("Paris Saint-Germain") == "psg"
+    assert split_match_name("Team A vs. Team B") == ("Team A", "Team B")
+    assert split_match_name("Team A - Team B") == ("Team A", "Team B")
+    assert split_match_name("Unknown Match") is None
+    print("[OK] Normalization validated")
+
+
+def test_resolution():
+    """Bets should resolve to fixtures with a confidence, including fuzzy and swapped names"""
+    resolver = FixtureResolver(FIXTURES)
+    exact = resolver.resolve("Manchester United vs Liverpool")
+    assert exact["match_id"] == "m1" and exact["confidence"] == 1.0
+
+    assert resolver.resolve("Man Utd v Liverpool FC")["match_id"] == "m1"
+    assert resolver.resolve("Bayern vs BVB")["match_id"] == "m2"
+    assert resolver.resolve("Paris Saint-Germain - Marseille")["match_id"] == "m4"
+
+    fuzzy = resolver.resolve("Atletico Madird vs Real Madrid")
+    assert fuzzy["match_id"] == "m3" and 0.5 <= fuzzy["confidence"] < 1.0, fuzzy
+
+    swapped = resolver.resolve("Liverpool vs Manchester United")
+    assert swapped["match_id"] == "m1" and swapped["confidence"] < 1.0
+
+    assert resolver.resolve("Unknown Match") is None
+    assert resolver.resolve("Chelsea vs Arsenal") is None
+    resolver.add_fixture("m5", "Chelsea", "Arsenal")
+    assert resolver.resolve("Chelsea vs Arsenal")["match_id"] == "m5", "New fixtures should clear cached misses"
+
+    bets = resolver.resolve_bets([{"match_name": "Man City vs Spurs"}, {"match_name": "PSG vs Marseille"}])
+    assert "match_id" not in bets[0] and bets[1]["match_id"] == "m4" and bets[1]["resolution_confidence"] == 1.0
+    print("[OK] Fixture resolution validated")
+
+
+def test_lookup_latency():
+    """Cached and uncached resolutions should be sub-millisecond"""
+    resolver = FixtureResolver(FIXTURES + [
+        {"match_id": f"x{i}", "home_team": f"Team {i} United", "away_team": f"Team {i} City"} for i in range(500)
+    ])
+    names = [f"Team {i} Utd vs Team {i} City" for i in range(200)]
+    start = time.perf_counter()
+    for name in names:
+        resolver.resolve(name)
+    uncached = (time.perf_counter() - start) / len(names)
+
+    start = time.perf_counter()
+    for name in names:
+        resolver.resolve(name)
+    cached = (time.perf_counter() - start) / len(names)
+    assert uncached < 0.001 and cached < 0.0001, (uncached, cached)
+    print(f"[OK] Resolution latency: {uncached * 1e6:.0f}us uncached, {cached * 1e6:.1f}us cached")
+
+
+def test_live_data_joined_to_bets():
+    """Active bet analysis should pick up live data for a resolvable match name"""
+    match = {'home_team': "Manchester United", 'away_team': "Liverpool", 'home_score': 1, 'away_score': 0,
+             'minute': 55, 'status': "LIVE", 'league': "Premier League", 'venue': "Old Trafford",
+             'match_datetime': "", 'last_update': ""}
+    live_updater.live_matches["match_001"] = match
+    try:
+        live = AIPredictor().live_data_for_bet({"match_name": "Man Utd vs Liverpool"})
+        assert live and live["match_id"] == "match_001" and live["score"] == "1-0"
+    finally:
+        live_updater.live_matches.pop("match_001", None)
+    print("[OK] Live data join validated")
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_resolution()
+    test_lookup_latency()
+    test_live_data_joined_to_bets()
+    print("\n[SUCCESS] Entity resolution tests passed!")
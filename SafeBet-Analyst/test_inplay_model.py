@@ -0,0 +1,100 @@
+"""
+SafeBet Analyst - In-Play Model Tests
+Validates Poisson in-play probabilities and live re-pricing on updater ticks
+"""
+
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.inplay_model import inplay_probabilities, InPlayPricer, OVER_UNDER_LINES
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
+from utils.live_score_updater import LiveScoreUpdater
+
+
+def test_probabilities_follow_game_state():
+    """Probabilities should sum to one and react to score, minute and red cards"""
+    kickoff = inplay_probabilities([1.5], [1.1], [0], [0], [0])
+    assert abs(kickoff["home"][0] + kickoff["draw"][0] + kickoff["away"][0] - 1) < 1e-6
+    assert kickoff["home"][0] > kickoff["away"][0]
+
+    leading = inplay_probabilities([1.5, 1.5], [1.1, 1.1], [1, 1], [0, 0], [30, 85])
+    assert leading["home"][1] > leading["home"][0] > kickoff["home"][0], "A lead should firm up as time runs out"
+
+    full_time = inplay_probabilities([1.5], [1.1], [2], [2], [90])
+    assert full_time["draw"][0] == 1.0 and full_time["btts"][0] == 1.0 and full_time["over_3.5"][0] == 1.0
+
+    red_card = inplay_probabilities([1.5], [1.1], [0], [0], [20], home_reds=[1])
+    level = inplay_probabilities([1.5], [1.1], [0], [0], [20])
+    assert red_card["home"][0] < level["home"][0], "A red card should hurt the short-handed side"
+
+    for line in OVER_UNDER_LINES:
+        assert 0 <= kickoff[f"over_{line}"][0] <= 1
+    print("[OK] In-play probabilities validated")
+
+
+def test_pricer_refreshes_on_every_tick():
+    """Each live score update should re-price live matches with predictor expectations"""
+    predictor = UpcomingEventPredictor()
+    match = predictor.matches_data[0]
+    prediction = predictor.predict_match_outcome(match)
+    assert prediction['expected_goals']['home'] > 0 and prediction['expected_goals']['away'] > 0
+
+    pricer = InPlayPricer()
+    pricer.set_expectations(match['match_id'], prediction['expected_goals']['home'], prediction['expected_goals']['away'])
+    updater = LiveScoreUpdater()
+    updater.add_update_listener(pricer.on_update)
+
+    state = {'home_team': match['home_team'], 'away_team': match['away_team'], 'home_score': 0, 'away_score': 0,
+             'minute': 10, 'status': "LIVE"}
+    feed = [{match['match_id']: state}, {match['match_id']: dict(state, home_score=1, minute=60)}]
+    updater.get_live_scores_from_api = lambda: feed.pop(0)
+
+    updater.update_live_data()
+    before = pricer.price(match['match_id'], "MatchResult", "Win")
+    updater.update_live_data()
+    after = pricer.price(match['match_id'], "MatchResult", "Win")
+    assert after > before, "A home goal should raise the home win price"
+    assert pricer.price(match['match_id'], "OverUnder", "Over", "0.5") == 100.0
+    assert pricer.price("unknown", "MatchResult", "Win") is None
+    print("[OK] Live re-pricing validated")
+
+
+def test_pricer_reads_live_red_cards():
+    """Red cards in the live data format ({'red_cards': {'home', 'away'}}) should move prices"""
+    pricer = InPlayPricer()
+    pricer.set_expectations("m1", 1.5, 1.1)
+    pricer.set_expectations("m2", 1.5, 1.1)
+    state = {'home_score': 0, 'away_score': 0, 'minute': 30, 'status': "LIVE", 'red_cards': {'home': 0, 'away': 0}}
+    prices = pricer.price_matches({"m1": state, "m2": dict(state, red_cards={'home': 1, 'away': 0})})
+    assert prices["m2"]["MatchResult"]["Win"] < prices["m1"]["MatchResult"]["Win"], "A home red card should lower the home price"
+    assert pricer.price_matches({"m3": dict(state, red_cards=None)})["m3"]["MatchResult"]["Win"] > 0
+    print("[OK] Live red cards validated")
+
+
+def test_vectorized_pricing_speed():
+    """Pricing thousands of live matches should take milliseconds"""
+    rng = np.random.default_rng(0)
+    n = 5000
+    live = {
+        f"m{i}": {'home_score': int(rng.integers(0, 4)), 'away_score': int(rng.integers(0, 4)),
+                  'minute': int(rng.integers(1, 90)), 'status': "LIVE"}
+        for i in range(n)
+    }
+    pricer = InPlayPricer()
+    start = time.perf_counter()
+    prices = pricer.price_matches(live)
+    elapsed = time.perf_counter() - start
+    assert len(prices) == n
+    assert elapsed < 1.0, f"Pricing {n} matches took {elapsed:.3f}s"
+    print(f"[OK] Priced {n} live matches in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_probabilities_follow_game_state()
+    test_pricer_refreshes_on_every_tick()
+    test_pricer_reads_live_red_cards()
+    test_vectorized_pricing_speed()
+    print("\n[SUCCESS] In-play model tests passed!")
@@ -0,0 +1,114 @@
+"""
+SafeBet Analyst - Job Runner Tests
+Validates background jobs, progress reporting and the scrape -> analyze pipeline
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.job_runner import JobRunner, DONE, FAILED, RUNNING
+from scraper.bet_pipeline import fetch_and_analyze_bets
+
+
+class FakeScraper:
+    """
+    Stands in for the Playwright scraper: same coroutine interface, canned bets
+    """
+    closed = False
+
+    async def initialize(self, headless=True):
+        await asyncio.sleep(0)
+
+    async def ensure_read_only_mode(self):
+        pass
+
+    async def login(self, username=None, password=None):
+        return True
+
+    async def get_active_bets(self):
+        return [{"match_name": f"Team {i} vs Team {i + 1}", "odds": 1.8, "status": "Active"} for i in range(10)]
+
+    async def navigate_to_history(self):
+        pass
+
+    async def scrape_bets(self):
+        return [{"match_name": "Old vs Match", "status": "Won"}]
+
+    async def close(self):
+        FakeScraper.closed = True
+
+
+class FakePredictor:
+    def batch_analyze_bets(self, bets, pack_size=None):
+        return [{"bet_data": bet, "analysis": {"win_probability": 60.0}} for bet in bets]
+
+
+def test_progress_and_results():
+    """Jobs run off the caller's thread and expose progress, partial results and the result"""
+    runner = JobRunner(max_workers=2)
+    release = threading.Event()
+
+    def work(job, n):
+        job.report(0.5, "Halfway", first=n)
+        release.wait(5)
+        return n * 2
+
+    start = time.perf_counter()
+    job_id = runner.submit("double", work, 21)
+    assert time.perf_counter() - start < 0.05, "submit() should not wait for the job"
+    assert runner.submit("double", work, 1, unique=True) == job_id, "Unfinished unique jobs should be reused"
+
+    deadline = time.monotonic() + 5
+    while runner.get(job_id)["progress"] < 0.5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    running = runner.get(job_id)
+    assert running["status"] == RUNNING and running["message"] == "Halfway" and running["partial"] == {"first": 21}
+
+    release.set()
+    done = runner.wait(job_id, timeout=5)
+    assert done["status"] == DONE and done["result"] == 42 and done["progress"] == 1.0
+    assert runner.get("unknown") is None
+    print("[OK] Job progress and results validated")
+
+
+def test_async_and_failed_jobs():
+    """Coroutine jobs get their own event loop; exceptions mark the job failed"""
+    runner = JobRunner(max_workers=1, keep_finished=2)
+
+    async def sleeper(job):
+        await asyncio.sleep(0.01)
+        return "slept"
+
+    def broken(job):
+        raise ValueError("no data")
+
+    assert runner.wait(runner.submit("sleep", sleeper), timeout=5)["result"] == "slept"
+    failed = runner.wait(runner.submit("broken", broken), timeout=5)
+    assert failed["status"] == FAILED and failed["error"] == "no data"
+
+    for _ in range(3):
+        runner.wait(runner.submit("sleep", sleeper), timeout=5)
+    assert len(runner.list_jobs()) <= 3, "Old finished jobs should be pruned"
+    print("[OK] Async and failed jobs validated")
+
+
+def test_fetch_pipeline():
+    """The pipeline publishes scraped bets before analysis and analyzes in chunks"""
+    runner = JobRunner(max_workers=1)
+    job = runner.wait(runner.submit("fetch_bets", fetch_and_analyze_bets, FakePredictor(), scraper_factory=FakeScraper), timeout=10)
+    assert job["status"] == DONE, job["error"]
+    assert len(job["result"]["bets_data"]["active"]) == 10 and len(job["result"]["bets_data"]["historical"]) == 1
+    assert len(job["result"]["analyzed_bets"]) == 10 and job["partial"]["analyzed_bets"] == job["result"]["analyzed_bets"]
+    assert FakeScraper.closed, "The browser should always be closed"
+    print("[OK] Fetch pipeline validated")
+
+
+if __name__ == "__main__":
+    test_progress_and_results()
+    test_async_and_failed_jobs()
+    test_fetch_pipeline()
+    print("\n[SUCCESS] Job runner tests passed!")
@@ -0,0 +1,101 @@
+"""
+SafeBet Analyst - Lineup Index Tests
+Validates alias-aware availability, cache invalidation and the predictor's use of lineups
+"""
+
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.lineup_index import LineupIndex, normalize_player_name
+from utils.data_utils import check_player_availability, load_mock_match_data
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor, DEFAULT_PREDICTOR_PARAMS
+from ai_analyzer.backtest import build_match_records, generate_synthetic_season, replay
+from ai_analyzer.param_search import extract_features, match_result_probabilities
+
+
+def test_name_matching():
+    """Accents, suffixes, surnames and initials should all match"""
+    assert normalize_player_name("Vinícius Júnior") == normalize_player_name("Vinicius Jr.")
+    result = check_player_availability(
+        ["Vinícius Júnior", "Jude Bellingham", "Virgil van Dijk", "Rodrygo"],
+        ["Vinicius Jr.", "Bellingham", "V. van Dijk", "Courtois", "Junior"]
+    )
+    assert result["available"] == ["Vinicius Jr.", "Bellingham", "V. van Dijk"], result
+    assert result["missing"] == ["Courtois", "Junior"], "A bare suffix should not match"
+    assert result["availability_rate"] == 0.6
+    print("[OK] Player name matching validated")
+
+
+def test_cache_follows_lineup_changes():
+    """Cached availability should be reused until the lineup changes"""
+    index = LineupIndex()
+    fixture = {"match_id": "m1", "key_players_home": ["Salah"], "key_players_away": ["Kane"]}
+    assert index.match_availability(fixture) is None, "No lineups means unknown availability"
+
+    index.set_lineup("m1", "home", ["Mohamed Salah"])
+    index.set_lineup("m1", "away", ["Harry Kane"])
+    first = index.match_availability(fixture)
+    assert first["home"]["availability_rate"] == 1.0
+    assert index.match_availability(fixture)["home"] is first["home"], "Unchanged lineups should hit the cache"
+
+    index.set_lineup("m1", "home", ["Darwin Nunez"])
+    assert index.match_availability(fixture)["home"]["availability_rate"] == 0.0
+    print("[OK] Lineup cache invalidation validated")
+
+
+def test_batch_availability():
+    """Availability for all fixtures with lineups should come back in one call"""
+    index = LineupIndex()
+    fixtures = [
+        {"match_id": f"m{i}", "key_players_home": ["Player A", "Player B"], "key_players_away": ["Player C"],
+         "lineups": {"home": [f"Player {c}" for c in "AXYZ"], "away": [f"Player {c}" for c in "CDEF"]}}
+        for i in range(1000)
+    ]
+    start = time.perf_counter()
+    results = index.batch_availability(fixtures)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    index.batch_availability(fixtures)
+    cached = time.perf_counter() - start
+    assert len(results) == 1000 and results["m0"]["home"]["availability_rate"] == 0.5
+    assert cached < first, (first, cached)
+    print(f"[OK] Batch availability for 1000 fixtures: {first * 1000:.1f}ms, cached {cached * 1000:.1f}ms")
+
+
+def test_predictor_uses_lineups():
+    """Player impact should follow real lineups and be neutral without them"""
+    predictor = UpcomingEventPredictor(params=DEFAULT_PREDICTOR_PARAMS)
+    match = dict(load_mock_match_data()[0], match_id="lineup_test")
+    assert predictor._calculate_player_impact(match) == {'home': 0, 'away': 0}
+
+    lineups = {"home": ["Bruno Fernandes", "Marcus Rashford", "Casemiro"], "away": ["Darwin Nunez"]}
+    impact = predictor._calculate_player_impact(dict(match, lineups=lineups))
+    assert impact['home'] == DEFAULT_PREDICTOR_PARAMS['player_impact_scale'] and impact['away'] == -impact['home']
+
+    prediction = predictor.predict_match_outcome(dict(match, lineups=lineups))
+    assert any("Key players missing" in factor for factor in prediction['key_factors'])
+    print("[OK] Predictor lineup impact validated")
+
+
+def test_lineups_in_vectorized_scores():
+    """Records with lineups should score the same in replay and parameter search"""
+    records = build_match_records(generate_synthetic_season(n_teams=6, seed=5))
+    for i, record in enumerate(records):
+        record['lineups'] = {"home": record['key_players_home'][:1 + i % 3], "away": record['key_players_away'][:1 + (i + 1) % 3]}
+
+    replayed = replay(records, workers=1, seed=1, params=DEFAULT_PREDICTOR_PARAMS)[:, :3]
+    home, draw, away = match_result_probabilities(extract_features(records, seed=1), [DEFAULT_PREDICTOR_PARAMS])
+    assert np.abs(replayed - np.column_stack([home[:, 0], draw[:, 0], away[:, 0]])).max() <= 0.0005 + 1e-9
+    print("[OK] Lineup features validated")
+
+
+if __name__ == "__main__":
+    test_name_matching()
+    test_cache_follows_lineup_changes()
+    test_batch_availability()
+    test_predictor_uses_lineups()
+    test_lineups_in_vectorized_scores()
+    print("\n[SUCCESS] Lineup index tests passed!")
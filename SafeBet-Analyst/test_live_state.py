@@ -0,0 +1,65 @@
+"""
+SafeBet Analyst - Live State Tests
+Validates the shared read-only snapshot and once-per-tick refreshes
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.live_score_updater import LiveScoreUpdater
+from utils.live_state import LiveStateService
+
+
+def _counting_updater():
+    updater = LiveScoreUpdater()
+    updater.calls = 0
+
+    def counted():
+        updater.calls += 1
+        return {"m1": {'home_team': "A", 'away_team': "B", 'home_score': updater.calls, 'away_score': 0,
+                       'minute': 50, 'status': "LIVE"}}
+    updater.get_live_scores_from_api = counted
+    return updater
+
+
+def test_snapshot_is_read_only():
+    """Readers should not be able to change the shared state"""
+    state = LiveStateService(_counting_updater())
+    snapshot = state.snapshot()
+    assert snapshot.version == 1 and snapshot.get("m1")['home_score'] == 1
+    for mapping, key in ((snapshot.matches, "m2"), (snapshot.get("m1"), 'home_score')):
+        try:
+            mapping[key] = 5
+            assert False, "Snapshots should be immutable"
+        except TypeError:
+            pass
+    assert list(snapshot.live()) == ["m1"] and snapshot.finished() == {}
+    print("[OK] Read-only snapshot validated")
+
+
+def test_refresh_once_per_tick():
+    """Many concurrent readers should share one feed refresh per interval"""
+    updater = _counting_updater()
+    state = LiveStateService(updater)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        versions = set(snapshot.version for snapshot in pool.map(lambda _: state.snapshot(), range(200)))
+    assert updater.calls == 1 and versions == {1}, (updater.calls, versions)
+
+    updater.update_interval = 0
+    assert state.snapshot().get("m1")['home_score'] == 2, "Stale snapshots should refresh"
+    assert state.current().version == 2 and updater.calls == 2, "current() never refreshes"
+
+    updater.is_running = True
+    state.snapshot()
+    assert updater.calls == 2, "A running auto-updater keeps the snapshot fresh"
+    updater.update_live_data()
+    assert state.current().get("m1")['home_score'] == 3, "Scheduled updates should publish snapshots"
+    print("[OK] Once-per-tick refresh validated")
+
+
+if __name__ == "__main__":
+    test_snapshot_is_read_only()
+    test_refresh_once_per_tick()
+    print("\n[SUCCESS] Live state tests passed!")
@@ -0,0 +1,338 @@
+"""
+SafeBet Analyst - LLM Client Tests
+Runs the client against a local stub server to validate retries,
+timeouts, the circuit breaker, fallback marking and streaming
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.llm_client import LLMClient, CircuitBreaker, CircuitOpenError
+from ai_analyzer.predictor import AIPredictor
+from ai_analyzer.json_stream import IncrementalJSONObjectParser
+
+
+ANALYSIS = {
+    "win_probability": 71.0,
+    "momentum_analysis": "Home side on top",
+    "player_status_analysis": "All key players on the pitch",
+    "ai_suggestion": "High Probability - Stay in",
+    "risk_level": "Low",
+    "confidence_level": "High"
+}
+
+
+class StubLLMServer:
+    """
+    Minimal OpenAI-compatible /chat/completions server
+    `script` is a list of actions consumed per request: an int status code,
+    ("sleep", seconds) or "ok"; once exhausted every request succeeds
+    Streams stop after `truncate` characters when it is set
+    """
+
+    def __init__(self, script=None, content=None, chunk_size=8, chunk_delay=0.0, truncate=None):
+        self.script = list(script or [])
+        self.content = content or ANALYSIS
+        self.truncate = truncate
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                server.requests.append(request)
+                action = server.script.pop(0) if server.script else "ok"
+                if isinstance(action, tuple) and action[0] == "sleep":
+                    time.sleep(action[1])
+                    action = "ok"
+                if action == "ok" and request.get("stream"):
+                    self.send_stream()
+                    return
+                if isinstance(action, int):
+                    body = json.dumps({"error": {"message": f"stub error {action}"}}).encode()
+                    self.send_response(action)
+                    if action == 429:
+                        self.send_header("Retry-After", "0")
+                else:
+                    body = json.dumps(server.completion_body()).encode()
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_stream(self):
+                # Server-sent events, one small content delta per event
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                text = json.dumps(server.content)[:server.truncate]
+                for i in range(0, len(text), server.chunk_size):
+                    event = server.chunk_body(text[i:i + server.chunk_size])
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(server.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def completion_body(self):
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "stub-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(self.content)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 40, "total_tokens": 140}
+        }
+
+    def chunk_body(self, content):
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "stub-model",
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]
+        }
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_client(server, **kwargs):
+    options = {"timeout": 2.0, "max_retries": 2, "backoff_base": 0.01, "backoff_max": 0.05}
+    options.update(kwargs)
+    return LLMClient(api_key="test-key", base_url=server.base_url, model="stub-model", **options)
+
+
+def test_successful_call_reuses_client():
+    """A healthy upstream should return parsed analyses through AIPredictor"""
+    server = StubLLMServer()
+    try:
+        predictor = AIPredictor(llm_client=make_client(server))
+        first = predictor.analyze_bet_slip({'match_name': 'A vs B', 'odds': 1.9})
+        second = predictor.analyze_bet_slip({'match_name': 'C vs D', 'odds': 2.1})
+        assert first['win_probability'] == 71.0 and 'is_fallback' not in first
+        assert second['risk_level'] == "Low"
+        assert len(server.requests) == 2
+        assert server.requests[0]['response_format'] == {"type": "json_object"}
+        print("[OK] Successful calls validated")
+    finally:
+        server.close()
+
+
+def test_retries_on_429_and_5xx():
+    """Rate limits and server errors should be retried with backoff"""
+    server = StubLLMServer(script=[429, 503])
+    try:
+        client = make_client(server)
+        response = client.create_chat_completion([{"role": "user", "content": "hi"}])
+        assert json.loads(response.choices[0].message.content)['win_probability'] == 71.0
+        assert len(server.requests) == 3, "Should retry twice before succeeding"
+        assert client.breaker.state == "closed"
+        print("[OK] Retries validated")
+    finally:
+        server.close()
+
+
+def test_client_errors_are_not_retried():
+    """A 400 is not transient and should not be retried"""
+    server = StubLLMServer(script=[400])
+    try:
+        client = make_client(server)
+        raised = None
+        try:
+            client.create_chat_completion([{"role": "user", "content": "hi"}])
+        except Exception as e:
+            raised = e
+        assert raised is not None, "400 should raise"
+        assert not isinstance(raised, CircuitOpenError)
+        assert len(server.requests) == 1
+        assert client.breaker.state == "closed", "400 should not trip the breaker"
+        print("[OK] Non-retryable errors validated")
+    finally:
+        server.close()
+
+
+def test_timeout_and_fallback_marking():
+    """A slow upstream should time out quickly and produce a marked fallback"""
+    server = StubLLMServer(script=[("sleep", 1.0)])
+    try:
+        predictor = AIPredictor(llm_client=make_client(server, timeout=0.2, max_retries=0))
+        start = time.perf_counter()
+        result = predictor.analyze_bet_slip({'match_name': 'A vs B'})
+        assert time.perf_counter() - start < 0.9, "Call should be cut off by the timeout"
+        assert result['is_fallback'] is True
+        assert result['win_probability'] == 50.0
+        assert result['fallback_reason']
+        print("[OK] Timeout and fallback marking validated")
+    finally:
+        server.close()
+
+
+def test_circuit_breaker_skips_calls_during_outage():
+    """After repeated failures calls should be skipped until the reset timeout"""
+    server = StubLLMServer(script=[500] * 10)
+    try:
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.3)
+        predictor = AIPredictor(llm_client=make_client(server, max_retries=0, breaker=breaker))
+
+        predictor.analyze_bet_slip({'match_name': 'A vs B'})
+        predictor.analyze_bet_slip({'match_name': 'A vs B'})
+        assert breaker.state == "open"
+        calls_before = len(server.requests)
+
+        skipped = predictor.analyze_active_bet_with_live_data({'match_name': 'A vs B'})
+        assert len(server.requests) == calls_before, "Open breaker should not call upstream"
+        assert skipped['is_fallback'] is True and "circuit" in skipped['fallback_reason']
+
+        # After the reset timeout a trial call goes through and closes the breaker
+        server.script = []
+        time.sleep(0.35)
+        recovered = predictor.analyze_bet_slip({'match_name': 'A vs B'})
+        assert 'is_fallback' not in recovered
+        assert breaker.state == "closed"
+        print("[OK] Circuit breaker validated")
+    finally:
+        server.close()
+
+
+def test_half_open_trial_with_client_error():
+    """A 400 on the half-open trial call means the server answered and should close the breaker"""
+    server = StubLLMServer(script=[500, 400])
+    try:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+        client = make_client(server, max_retries=0, breaker=breaker)
+        message = [{"role": "user", "content": "hi"}]
+        for expected_state in ("open", "closed"):
+            raised = None
+            try:
+                client.create_chat_completion(message)
+            except Exception as e:
+                raised = e
+            assert raised is not None and not isinstance(raised, CircuitOpenError)
+            assert breaker.state == expected_state, (breaker.state, expected_state)
+            time.sleep(0.15)
+        assert len(server.requests) == 2
+        response = client.create_chat_completion(message)
+        assert json.loads(response.choices[0].message.content)['win_probability'] == 71.0
+        print("[OK] Half-open trial with a client error validated")
+    finally:
+        server.close()
+
+
+LIVE_ANALYSIS = {
+    "updated_win_probability": 64.0,
+    "cashout_recommendation": "Hold - no cash-out needed",
+    "current_momentum": "Away side pressing after the \"equaliser\"",
+    "risk_assessment": "Moderate, {score level}",
+    "stay_in_recommendation": "Stay in",
+    "confidence_in_prediction": "Medium"
+}
+
+
+def test_incremental_parser_handles_arbitrary_chunks():
+    """Fields should be emitted as soon as they complete, whatever the chunking"""
+    text = json.dumps({"a": 1.5, "b": "x, {y}", "c": {"d": [1, 2]}, "e": "q\"z"})
+    for size in (1, 3, 7, len(text)):
+        parser = IncrementalJSONObjectParser()
+        emitted = []
+        for i in range(0, len(text), size):
+            emitted.extend(parser.feed(text[i:i + size]))
+        assert emitted == [("a", 1.5), ("b", "x, {y}"), ("c", {"d": [1, 2]}), ("e", 'q"z')], size
+        assert parser.done
+
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"updated_win_probability": 61.5') == [], "Field is not complete until its delimiter"
+    assert parser.feed(', "cash') == [("updated_win_probability", 61.5)]
+    print("[OK] Incremental JSON parser validated")
+
+
+def test_streaming_surfaces_key_fields_first():
+    """Key fields should be yielded before the stream finishes"""
+    server = StubLLMServer(content=LIVE_ANALYSIS, chunk_size=6, chunk_delay=0.01)
+    try:
+        predictor = AIPredictor(llm_client=make_client(server))
+        start = time.perf_counter()
+        arrivals = []
+        for field, value in predictor.stream_active_bet_analysis({'match_name': 'A vs B'}, {'score': '1-1', 'minute': 70}):
+            arrivals.append((field, value, time.perf_counter() - start))
+        total = time.perf_counter() - start
+
+        fields = [f for f, _, _ in arrivals]
+        assert fields[:2] == ["updated_win_probability", "cashout_recommendation"]
+        assert dict((f, v) for f, v, _ in arrivals) == LIVE_ANALYSIS
+        assert arrivals[0][2] < total * 0.5, "First field should arrive well before the stream ends"
+        assert server.requests[0]['stream'] is True
+        print("[OK] Streaming analysis validated")
+    finally:
+        server.close()
+
+
+def test_streaming_falls_back_on_error():
+    """A failed stream should still yield a complete, marked fallback"""
+    server = StubLLMServer(script=[500])
+    try:
+        predictor = AIPredictor(llm_client=make_client(server, max_retries=0))
+        result = dict(predictor.stream_active_bet_analysis({'match_name': 'A vs B'}))
+        assert result['is_fallback'] is True
+        assert result['updated_win_probability'] == 50.0
+        print("[OK] Streaming fallback validated")
+    finally:
+        server.close()
+
+
+def test_streaming_falls_back_when_cut_short():
+    """A stream that ends cleanly mid-object should fill the unfinished fields with marked fallbacks"""
+    cut = json.dumps(LIVE_ANALYSIS).index('"current_momentum"')
+    server = StubLLMServer(content=LIVE_ANALYSIS, truncate=cut)
+    try:
+        predictor = AIPredictor(llm_client=make_client(server))
+        result = dict(predictor.stream_active_bet_analysis({'match_name': 'A vs B'}))
+        assert result['updated_win_probability'] == LIVE_ANALYSIS['updated_win_probability']
+        assert result['is_fallback'] is True and "ended" in result['fallback_reason']
+        assert result['current_momentum'] == "Unable to assess with current data"
+
+        # A complete stream is not marked
+        server.truncate = None
+        assert 'is_fallback' not in dict(predictor.stream_active_bet_analysis({'match_name': 'A vs B'}))
+        print("[OK] Truncated stream fallback validated")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    test_successful_call_reuses_client()
+    test_retries_on_429_and_5xx()
+    test_client_errors_are_not_retried()
+    test_timeout_and_fallback_marking()
+    test_circuit_breaker_skips_calls_during_outage()
+    test_half_open_trial_with_client_error()
+    test_incremental_parser_handles_arbitrary_chunks()
+    test_streaming_surfaces_key_fields_first()
+    test_streaming_falls_back_on_error()
+    test_streaming_falls_back_when_cut_short()
+    print("\n[SUCCESS] LLM client tests passed!")
@@ -0,0 +1,123 @@
+"""
+SafeBet Analyst - Market Odds Tests
+Validates snapshot ingestion, best-price lookup and vectorized value detection
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.market_odds import MarketOddsStore, StubOddsFeed, find_value_bets, flatten_predictions
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
+from utils.data_utils import calculate_expected_value, calculate_expected_value_array
+
+
+def test_ingest_keeps_latest_and_best_price():
+    """Later snapshots should replace a bookmaker's price; best price wins across bookmakers"""
+    store = MarketOddsStore()
+    store.ingest([
+        {"match_id": "m1", "market": "MatchResult", "selection": "Win", "odds": 2.0, "bookmaker": "A", "timestamp": "2024-01-01T10:00"},
+        {"match_id": "m1", "market": "MatchResult", "selection": "Win", "odds": 2.2, "bookmaker": "B", "timestamp": "2024-01-01T10:00"},
+        {"match_id": "m1", "market": "OverUnder 2.5", "selection": "Over", "odds": 1.9, "bookmaker": "A", "timestamp": "2024-01-01T10:00"},
+    ])
+    store.ingest([{"match_id": "m1", "market": "MatchResult", "selection": "Win", "odds": 2.5, "bookmaker": "A", "timestamp": "2024-01-01T11:00"}])
+
+    assert len(store) == 3
+    best = store.best_prices()
+    assert best.loc[("m1", "MatchResult", "Win"), "odds"] == 2.5
+    assert best.loc[("m1", "MatchResult", "Win"), "bookmaker"] == "A"
+    assert store.odds_for("m1") == {("MatchResult", "Win"): 2.5, ("OverUnder", "2.5", "Over"): 1.9}
+    assert store.odds_for("unknown") == {}
+    print("[OK] Ingestion and best prices validated")
+
+
+def test_ingest_files():
+    """JSON and CSV snapshot files should both be ingested"""
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "a.json"), "w") as f:
+            json.dump([{"match_id": "m1", "market": "BTTS", "selection": "Yes", "odds": 1.8}], f)
+        pd.DataFrame([{"match_id": "m2", "market": "BTTS", "selection": "No", "odds": 2.1, "bookmaker": "C"}]).to_csv(
+            os.path.join(directory, "b.csv"), index=False)
+        store = MarketOddsStore()
+        assert store.ingest_directory(directory) == 2
+        assert set(store.frame['match_id']) == {"m1", "m2"}
+    print("[OK] Snapshot files validated")
+
+
+def test_value_scores_match_scalar_formulas():
+    """Edge, Kelly and EV should match the per-bet formulas"""
+    markets = pd.DataFrame({
+        "match_id": ["m1", "m1", "m2"], "match": ["A vs B", "A vs B", "C vs D"],
+        "market": ["MatchResult", "MatchResult", "BTTS"], "selection": ["Win", "Draw", "Yes"],
+        "probability": [55.0, 25.0, 60.0]
+    })
+    store = MarketOddsStore()
+    store.ingest([
+        {"match_id": "m1", "market": "MatchResult", "selection": "Win", "odds": 2.1},
+        {"match_id": "m1", "market": "MatchResult", "selection": "Draw", "odds": 3.2},
+        {"match_id": "m2", "market": "BTTS", "selection": "Yes", "odds": 1.5},
+    ])
+    scored = find_value_bets(markets, store).set_index("selection")
+
+    assert abs(scored.loc["Win", "edge"] - (0.55 * 2.1 - 1)) < 1e-4
+    assert abs(scored.loc["Win", "kelly_fraction"] - (0.55 * 2.1 - 1) / 1.1) < 1e-4
+    assert scored.loc["Win", "expected_value"] == calculate_expected_value(2.1, 55.0)
+    assert scored.loc["Draw", "kelly_fraction"] == 0, "Negative edge should stake nothing"
+    assert list(scored["is_value"]) == [True, False, False]
+
+    assert list(calculate_expected_value_array([2.0, 0, 3.0], [50, 40, 0])) == [
+        calculate_expected_value(2.0, 50), 0.0, 0.0]
+    print("[OK] Value scores validated")
+
+
+def test_thousands_of_markets_in_one_pass():
+    """Scoring tens of thousands of markets should be fast"""
+    rng = np.random.default_rng(1)
+    n = 60_000
+    markets = pd.DataFrame({
+        "match_id": [f"m{i // 12}" for i in range(n)], "match": "X vs Y",
+        "market": "MatchResult", "selection": [f"s{i % 12}" for i in range(n)],
+        "probability": rng.uniform(5, 90, n).round(1)
+    })
+    store = MarketOddsStore()
+    store.ingest(StubOddsFeed(seed=2).snapshot(markets))
+
+    start = time.perf_counter()
+    scored = find_value_bets(markets, store, min_edge=0.02)
+    elapsed = time.perf_counter() - start
+    assert len(scored) == n
+    assert elapsed < 1.0, f"Value detection took {elapsed:.2f}s"
+    print(f"[OK] Scored {n} markets in {elapsed:.2f}s")
+
+
+def test_predictor_value_bets():
+    """Predictions should be joined to bookmaker odds by match_id and market"""
+    predictor = UpcomingEventPredictor()
+    predictions = predictor.refresh_predictions()
+    predictor.odds_store.ingest(StubOddsFeed(noise=0.3, seed=4).snapshot(predictions))
+
+    value_bets = predictor.get_value_bets()
+    assert value_bets, "Noisy stub prices should leave some value"
+    assert all(bet['edge'] > 0 and bet['kelly_fraction'] > 0 for bet in value_bets)
+    assert len(flatten_predictions(predictions)) == len(predictions) * 16
+
+    # Accumulator legs should now be priced at bookmaker odds
+    match_ids = {p['match']: p['match_id'] for p in predictions}
+    slip = predictor.get_accumulator_slips(targets=(2.0,))[2.0]
+    for leg in slip['legs']:
+        assert leg['odds'] in predictor.odds_store.odds_for(match_ids[leg['match']]).values()
+    print("[OK] Predictor value bets validated")
+
+
+if __name__ == "__main__":
+    test_ingest_keeps_latest_and_best_price()
+    test_ingest_files()
+    test_value_scores_match_scalar_formulas()
+    test_thousands_of_markets_in_one_pass()
+    test_predictor_value_bets()
+    print("\n[SUCCESS] Market odds tests passed!")
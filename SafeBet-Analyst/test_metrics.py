@@ -0,0 +1,121 @@
+"""
+SafeBet Analyst - Metrics Tests
+Validates counters, histograms and the Prometheus export
+"""
+
+import os
+import sys
+import threading
+import urllib.request
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.metrics import MetricsRegistry
+
+
+def test_disabled_registry_records_nothing():
+    """A disabled registry should hand out no-op timers and keep no state"""
+    registry = MetricsRegistry(enabled=False)
+    with registry.time("live_update_seconds"):
+        pass
+    registry.inc("live_updates_total")
+    registry.observe("llm_request_seconds", 0.5)
+
+    assert registry.metrics == {}, "Disabled registry should not create metrics"
+    assert registry.render_prometheus() == "", "Disabled registry should export nothing"
+    print("[OK] Disabled metrics are no-ops")
+
+
+def test_counters_and_histograms():
+    """Counters and histograms should render in Prometheus text format"""
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("llm_tokens_total", 120, "LLM tokens used", operation="bet_slip", kind="prompt")
+    registry.inc("llm_tokens_total", 30, "LLM tokens used", operation="bet_slip", kind="prompt")
+    registry.observe("llm_request_seconds", 0.2, "LLM request latency", operation="bet_slip")
+    registry.observe("llm_request_seconds", 3.0, "LLM request latency", operation="bet_slip")
+
+    text = registry.render_prometheus()
+    assert '# TYPE safebet_llm_tokens_total counter' in text
+    assert 'safebet_llm_tokens_total{kind="prompt",operation="bet_slip"} 150' in text
+    assert 'safebet_llm_request_seconds_bucket{operation="bet_slip",le="0.25"} 1' in text
+    assert 'safebet_llm_request_seconds_bucket{operation="bet_slip",le="+Inf"} 2' in text
+    assert 'safebet_llm_request_seconds_count{operation="bet_slip"} 2' in text
+
+    rows = {(r['metric'], r['type']): r for r in registry.snapshot()}
+    histogram = rows[('safebet_llm_request_seconds', 'histogram')]
+    assert histogram['count'] == 2 and histogram['avg'] == 1.6
+    print("[OK] Counters and histograms validated")
+
+
+def test_render_while_recording():
+    """Rendering while other threads add label sets should not fail, and label values are escaped"""
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("scrape_errors_total", 1, "Scrape errors\nby page", page='bets "active"\\n')
+    text = registry.render_prometheus()
+    assert 'safebet_scrape_errors_total{page="bets \\"active\\"\\\\n"} 1' in text
+    assert "# HELP safebet_scrape_errors_total Scrape errors\\nby page" in text
+
+    done = threading.Event()
+
+    def record():
+        for i in range(20000):
+            registry.inc("llm_calls_total", operation=f"op{i}")
+            registry.observe("llm_request_seconds", 0.1, operation=f"op{i}")
+        done.set()
+
+    writer = threading.Thread(target=record)
+    writer.start()
+    try:
+        while not done.is_set():
+            registry.render_prometheus()
+            registry.snapshot()
+    finally:
+        writer.join()
+    assert len(registry.snapshot()) == 40001
+    print("[OK] Concurrent rendering validated")
+
+
+def test_timer_and_decorator():
+    """time() and timed() should both observe elapsed time"""
+    registry = MetricsRegistry(enabled=True)
+
+    @registry.timed("prediction_batch_seconds")
+    def predict():
+        return "done"
+
+    assert predict() == "done"
+    with registry.time("live_update_seconds"):
+        pass
+
+    names = {r['metric'] for r in registry.snapshot()}
+    assert {'safebet_prediction_batch_seconds', 'safebet_live_update_seconds'} <= names
+    print("[OK] Timers validated")
+
+
+def test_file_dump_and_http_endpoint(tmp_path=None):
+    """Metrics should be exportable to a file and over HTTP"""
+    import tempfile
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("live_updates_total")
+
+    out_dir = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    path = registry.dump(os.path.join(out_dir, "metrics.prom"))
+    with open(path) as f:
+        assert "safebet_live_updates_total 1" in f.read()
+
+    server = registry.start_http_server(port=0, host="127.0.0.1")
+    try:
+        port = server.server_address[1]
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+        assert "safebet_live_updates_total 1" in body
+    finally:
+        registry.stop_http_server()
+    print("[OK] File dump and HTTP endpoint validated")
+
+
+if __name__ == "__main__":
+    test_disabled_registry_records_nothing()
+    test_counters_and_histograms()
+    test_render_while_recording()
+    test_timer_and_decorator()
+    test_file_dump_and_http_endpoint()
+    print("\n[SUCCESS] Metrics tests passed!")
@@ -0,0 +1,111 @@
+"""
+SafeBet Analyst - Momentum Tests
+Validates ring-buffer window sums, snapshot deltas and the live prompt integration
+"""
+
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath('.'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from utils.momentum import MomentumTracker, momentum_tracker, COUNT_STATS
+from ai_analyzer.predictor import AIPredictor
+
+
+def test_window_sums_match_full_history():
+    """Running sums should equal a rescan of the last N minutes"""
+    rng = np.random.default_rng(0)
+    tracker = MomentumTracker(initial_slots=1)
+    history = []
+    for minute in range(60):
+        stats = {stat: {"home": int(rng.integers(0, 4)), "away": int(rng.integers(0, 4))} for stat in COUNT_STATS}
+        stats["possession"] = {"home": int(rng.integers(40, 61)), "away": 0}
+        tracker.record_minute("m1", stats)
+        history.append(stats)
+
+        for window in (5, 10, 15):
+            recent = history[-window:]
+            stats_now = tracker.window_stats("m1", window)
+            for stat in COUNT_STATS:
+                assert stats_now[stat]["home"] == sum(s[stat]["home"] for s in recent), (minute, window, stat)
+            expected_possession = round(sum(s["possession"]["home"] for s in recent) / len(recent), 1)
+            assert abs(stats_now["possession"]["home"] - expected_possession) < 0.11
+    print("[OK] Window sums validated")
+
+
+def test_snapshots_and_slots():
+    """Cumulative snapshots become per-minute deltas and finished matches free their slot"""
+    tracker = MomentumTracker(initial_slots=1)
+    tracker.record_snapshot("m1", {"minute": 10, "dangerous_attacks": {"home": 20, "away": 10}})
+    tracker.record_snapshot("m1", {"minute": 12, "dangerous_attacks": {"home": 26, "away": 10}})
+    tracker.record_snapshot("m1", {"minute": 30, "dangerous_attacks": {"home": 26, "away": 14}})
+
+    last_5 = tracker.window_stats("m1", 5)["dangerous_attacks"]
+    last_15 = tracker.window_stats("m1", 15)["dangerous_attacks"]
+    assert last_5 == {"home": 0.0, "away": 4.0}, last_5
+    assert last_15 == {"home": 0.0, "away": 4.0}, "The minute-12 burst is older than 15 minutes"
+    assert tracker.momentum("m1", 5)["away"] == 100.0
+
+    tracker.record_snapshot("m2", {"minute": 5, "shots": {"home": 1, "away": 1}})
+    assert len(tracker.buffer) == 2, "Slots should grow on demand"
+    tracker.on_update({"m1": {"status": "FINISHED"}})
+    assert tracker.window_stats("m1") is None
+    tracker.record_snapshot("m3", {"minute": 1})
+    assert len(tracker.buffer) == 2, "Freed slots should be reused"
+    try:
+        tracker.window_stats("m3", 7)
+        assert False, "Unknown windows should be rejected"
+    except ValueError:
+        pass
+    print("[OK] Snapshots and slot reuse validated")
+
+
+def test_first_snapshot_is_a_baseline():
+    """Joining a match in progress should not put its whole history into one minute"""
+    tracker = MomentumTracker(initial_slots=1)
+    tracker.record_snapshot("m1", {"minute": 60, "shots": {"home": 45, "away": 20}, "corners": {"home": 8, "away": 3}})
+    window = tracker.window_stats("m1", 10)
+    assert window["shots"] == {"home": 0.0, "away": 0.0} and window["corners"] == {"home": 0.0, "away": 0.0}, window
+
+    tracker.record_snapshot("m1", {"minute": 61, "shots": {"home": 46, "away": 20}, "corners": {"home": 8, "away": 3}})
+    assert tracker.window_stats("m1", 10)["shots"] == {"home": 1.0, "away": 0.0}
+    print("[OK] First snapshot baseline validated")
+
+
+def test_live_prompt_includes_window():
+    """The live analysis prompt should carry last-10-minute stats for tracked matches"""
+    momentum_tracker.record_snapshot("prompt_match", {"minute": 68, "shots": {"home": 5, "away": 2}})
+    momentum_tracker.record_snapshot("prompt_match", {"minute": 70, "shots": {"home": 8, "away": 3}})
+    try:
+        messages = AIPredictor()._build_live_messages({"match_name": "A vs B"}, {"match_id": "prompt_match", "score": "1-0"})
+        assert "Last 10 Minutes" in messages[1]["content"] and "Shots 3 / 1" in messages[1]["content"]
+    finally:
+        momentum_tracker.remove("prompt_match")
+    print("[OK] Live prompt momentum validated")
+
+
+def test_many_matches_update_cost():
+    """Per-minute updates for thousands of matches should stay cheap"""
+    tracker = MomentumTracker()
+    stats = {"dangerous_attacks": {"home": 1, "away": 0}, "shots": {"home": 0, "away": 1}}
+    start = time.perf_counter()
+    for i in range(2000):
+        tracker.record_minute(f"m{i}", stats)
+    for i in range(2000):
+        tracker.record_minute(f"m{i}", stats)
+    elapsed = time.perf_counter() - start
+    match_ids, shares = tracker.momentum_all(10)
+    assert len(match_ids) == 2000 and np.allclose(shares, 100 / 3, atol=0.1)
+    assert elapsed < 1.0, f"4000 updates took {elapsed:.3f}s"
+    print(f"[OK] 4000 ring-buffer updates in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_window_sums_match_full_history()
+    test_snapshots_and_slots()
+    test_first_snapshot_is_a_baseline()
+    test_live_prompt_includes_window()
+    test_many_matches_update_cost()
+    print("\n[SUCCESS] Momentum tests passed!")
@@ -0,0 +1,115 @@
+"""
+SafeBet Analyst - Packed Analysis Tests
+Validates multi-bet packing, result splitting and individual retries
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath('.'))
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_analyzer.predictor import AIPredictor
+from ai_analyzer.analysis_cache import AnalysisCache
+
+
+class StubPredictor(AIPredictor):
+    """AIPredictor with the network call replaced by canned responses"""
+
+    def __init__(self, drop_ids=()):
+        # Private cache: canned responses differ between stubs
+        super().__init__(cache=AnalysisCache())
+        self.drop_ids = set(drop_ids)
+        self.requests = []
+
+    def _chat_completion(self, operation, messages, temperature, max_tokens):
+        self.requests.append((operation, messages, max_tokens))
+        if operation == "bet_slip_packed":
+            rows = messages[1]["content"].split("\n")[1:]
+            results = []
+            for row in rows:
+                bet_id = row.split("|")[0]
+                if bet_id in self.drop_ids:
+                    continue
+                results.append({
+                    "id": bet_id,
+                    "win_probability": 62.5,
+                    "momentum_analysis": "Home side pressing",
+                    "player_status_analysis": "Key players available",
+                    "ai_suggestion": "Stay in",
+                    "risk_level": "Low",
+                    "confidence_level": "Medium"
+                })
+            return {"results": results}
+        return {
+            "win_probability": 40.0,
+            "momentum_analysis": "Even",
+            "player_status_analysis": "Unknown",
+            "ai_suggestion": "Monitor",
+            "risk_level": "High",
+            "confidence_level": "Low"
+        }
+
+
+def make_bets(count):
+    return [{
+        'match_name': f'Team {i} vs Team {i + 1}',
+        'bet_type': 'W1',
+        'odds': 2.5,
+        'stake': 10.0,
+        'status': 'Active',
+        'potential_win': 25.0
+    } for i in range(count)]
+
+
+def test_packed_requests_reduce_round_trips():
+    """Ten bets with pack size 5 should take two requests"""
+    predictor = StubPredictor()
+    results = predictor.batch_analyze_bets(make_bets(10), pack_size=5)
+
+    assert len(predictor.requests) == 2, "Should send one request per pack"
+    assert all(op == "bet_slip_packed" for op, _, _ in predictor.requests)
+    assert len(results) == 10
+    assert all(r['analysis']['win_probability'] == 62.5 for r in results)
+    assert results[3]['bet_data']['match_name'] == 'Team 3 vs Team 4', "Results should keep bet order"
+    print("[OK] Packed requests validated")
+
+
+def test_compact_encoding():
+    """Bets should be encoded as one pipe-separated row each"""
+    predictor = StubPredictor()
+    table = predictor._encode_bet_table([("b0", {'match_name': 'A | B', 'odds': 1.8})])
+    header, row = table.split("\n")
+    assert header.startswith("id|match|bet|odds")
+    assert row == "b0|A / B|-|1.8|-|-|-|-"
+    print("[OK] Compact encoding validated")
+
+
+def test_missing_results_retried_individually():
+    """Bets missing from a packed response should fall back to single analysis"""
+    predictor = StubPredictor(drop_ids={"b1"})
+    analyses = predictor.analyze_bets_packed(make_bets(3), pack_size=3)
+
+    operations = [op for op, _, _ in predictor.requests]
+    assert operations == ["bet_slip_packed", "bet_slip"], "Only the missing bet should be retried"
+    assert analyses[1]['win_probability'] == 40.0
+    assert analyses[0]['win_probability'] == 62.5 and analyses[2]['win_probability'] == 62.5
+    print("[OK] Individual retries validated")
+
+
+def test_invalid_results_rejected():
+    """Out-of-range or malformed entries should not be accepted"""
+    predictor = StubPredictor()
+    assert predictor._validate_packed_result({"win_probability": 140}) is None
+    assert predictor._validate_packed_result({"win_probability": "n/a"}) is None
+    analysis = predictor._validate_packed_result({"win_probability": "55", "risk_level": "Extreme"})
+    assert analysis['win_probability'] == 55.0 and analysis['risk_level'] == "Medium"
+    print("[OK] Result validation checked")
+
+
+if __name__ == "__main__":
+    test_packed_requests_reduce_round_trips()
+    test_compact_encoding()
+    test_missing_results_retried_individually()
+    test_invalid_results_rejected()
+    print("\n[SUCCESS] Packed analysis tests passed!")
@@ -0,0 +1,115 @@
+"""
+SafeBet Analyst - Parameter Search Tests
+Validates the vectorized scorer, search strategies and the predictor config file
+"""
+
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.param_search import (ParameterSearch, extract_features, match_result_probabilities,
+                                      grid_candidates, main)
+from ai_analyzer.backtest import build_match_records, replay, generate_synthetic_season
+from ai_analyzer.upcoming_predictor import (UpcomingEventPredictor, DEFAULT_PREDICTOR_PARAMS,
+                                            load_predictor_params, save_predictor_params)
+
+
+SEASON = generate_synthetic_season(n_teams=12, seasons=2, seed=5)
+
+
+def test_vectorized_scorer_matches_predictor():
+    """Vectorized 1X2 probabilities should match full predictor replays"""
+    records = build_match_records(SEASON)
+    features = extract_features(records, seed=2)
+    tuned = dict(DEFAULT_PREDICTOR_PARAMS, h2h_scale=4.0, venue_bonus=2.5, form_weights=[0.2] * 5)
+
+    for params in (dict(DEFAULT_PREDICTOR_PARAMS), tuned):
+        replayed = replay(records, workers=1, seed=2, params=params)
+        home, draw, away = match_result_probabilities(features, [params])
+        # Predictor output is rounded to 0.1%
+        assert np.abs(replayed[:, 0] - home[:, 0]).max() <= 0.0005 + 1e-9
+        assert np.abs(replayed[:, 1] - draw[:, 0]).max() <= 0.0005 + 1e-9
+        assert np.abs(replayed[:, 2] - away[:, 0]).max() <= 0.0005 + 1e-9
+    print("[OK] Vectorized scorer parity validated")
+
+
+def test_search_strategies_improve_on_defaults():
+    """Every strategy should find parameters at least as good as the defaults"""
+    search = ParameterSearch(SEASON, workers=2, batch_size=64, seed=1)
+    space = {"venue_bonus": (0.0, 4.0), "news_impact_range": (0.0, 3.0), "form_weights": [[0.2] * 5, [0.15, 0.15, 0.2, 0.25, 0.25]]}
+    assert len(grid_candidates(space, points=3)) == 18
+
+    for strategy in ("grid", "random", "refine"):
+        result = search.run(strategy=strategy, trials=200)
+        assert result['best_score'] <= result['default_score'], strategy
+        assert result['top'][0]['score'] == result['best_score']
+        assert set(result['best_params']) == set(DEFAULT_PREDICTOR_PARAMS)
+    print("[OK] Search strategies validated")
+
+
+def test_config_round_trip():
+    """The predictor should load tuned parameters from the config file"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "params.json")
+        save_predictor_params(dict(DEFAULT_PREDICTOR_PARAMS, venue_bonus=3.0), path, meta={"score": 0.6})
+        with open(path) as f:
+            assert json.load(f)["_meta"] == {"score": 0.6}
+
+        loaded = load_predictor_params(path)
+        assert loaded['venue_bonus'] == 3.0 and loaded['h2h_scale'] == DEFAULT_PREDICTOR_PARAMS['h2h_scale']
+
+        previous = os.environ.get("SAFEBET_PREDICTOR_CONFIG")
+        os.environ["SAFEBET_PREDICTOR_CONFIG"] = path
+        try:
+            predictor = UpcomingEventPredictor()
+            assert predictor._calculate_venue_advantage("Anywhere") == {'home': 3.0, 'away': -3.0}
+        finally:
+            if previous is None:
+                os.environ.pop("SAFEBET_PREDICTOR_CONFIG")
+            else:
+                os.environ["SAFEBET_PREDICTOR_CONFIG"] = previous
+
+        assert load_predictor_params(os.path.join(directory, "missing.json")) == DEFAULT_PREDICTOR_PARAMS
+    print("[OK] Config round trip validated")
+
+
+def test_constant_features_are_pinned():
+    """Parameters whose features never vary should keep their defaults"""
+    search = ParameterSearch(SEASON, workers=1, seed=1)
+    assert not search.features['player_diff'].any(), "Backtest records carry no lineups"
+    assert search.pinned == ['player_impact_scale'] and 'player_impact_scale' not in search.space
+    assert {'rating_weight', 'rating_only_weight'} <= set(search.space), "Both rating weights should be tuned"
+    result = search.run(strategy="random", trials=20)
+    assert all(c['params']['player_impact_scale'] == DEFAULT_PREDICTOR_PARAMS['player_impact_scale'] for c in result['top'])
+    print("[OK] Constant features pinned")
+
+
+def test_cli_writes_config():
+    """The command line tool should write the best parameters only when they beat the defaults"""
+    with tempfile.TemporaryDirectory() as directory:
+        fixtures_path = os.path.join(directory, "season.csv")
+        output = os.path.join(directory, "tuned.json")
+        SEASON.to_csv(fixtures_path, index=False)
+        result = main([fixtures_path, "--strategy", "random", "--trials", "50", "--workers", "1", "--output", output])
+        assert result['written'] and result['best_score'] < result['default_score']
+        assert load_predictor_params(output)['venue_bonus'] == result['best_params']['venue_bonus']
+
+        # A single random trial worse than the defaults leaves the config alone
+        rejected = os.path.join(directory, "rejected.json")
+        result = main([fixtures_path, "--strategy", "random", "--trials", "1", "--workers", "1", "--seed", "7",
+                       "--output", rejected])
+        assert not result['written'] and result['best_score'] > result['default_score']
+        assert not os.path.exists(rejected)
+    print("[OK] CLI validated")
+
+
+if __name__ == "__main__":
+    test_vectorized_scorer_matches_predictor()
+    test_search_strategies_improve_on_defaults()
+    test_config_round_trip()
+    test_constant_features_are_pinned()
+    test_cli_writes_config()
+    print("\n[SUCCESS] Parameter search tests passed!")
@@ -0,0 +1,103 @@
+"""
+SafeBet Analyst - Portfolio Tests
+Validates the columnar summary report, exposure, expected P&L and Monte Carlo speed
+"""
+
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath('.'))
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_analyzer.portfolio import PortfolioAnalyzer
+from ai_analyzer.predictor import AIPredictor
+
+
+def make_analyzed(match, league, bet_type, stake, odds, probability, status="Active", risk="Medium"):
+    return {
+        "bet_data": {'match_name': match, 'league': league, 'bet_type': bet_type, 'stake': stake,
+                     'odds': odds, 'potential_win': round(stake * odds, 2), 'status': status},
+        "analysis": {'win_probability': probability, 'risk_level': risk, 'ai_suggestion': f"{match} suggestion"},
+        "timestamp": "2024-01-01T00:00:00"
+    }
+
+
+ANALYZED = [
+    make_analyzed("A vs B", "Premier League", "1X2", 10, 2.0, 50.0),
+    make_analyzed("C vs D", "Premier League", "Over/Under", 20, 1.5, 70.0, risk="Low"),
+    make_analyzed("E vs F", "La Liga", "1X2", 5, 6.0, 15.0, risk="High"),
+    make_analyzed("G vs H", "La Liga", "1X2", 10, 3.0, 100.0, status="Won", risk="Low"),
+]
+
+
+def test_summary_keeps_report_keys():
+    """The report should keep its original fields alongside the portfolio ones"""
+    report = AIPredictor().generate_summary_report(ANALYZED, seed=1)
+    assert report['total_bets'] == 4
+    assert report['total_staked'] == 45
+    assert report['total_potential_wins'] == 20 + 30 + 30 + 30
+    assert report['average_win_probability'] == 58.75
+    assert report['high_risk_count'] == 1
+    assert report['recommendations_summary'][0] == "A vs B suggestion"
+    assert report['active_bets'] == 3, "Settled bets should not count as active exposure"
+    assert report['pnl_simulation']['draws'] == 10_000
+
+    no_potential = dict(ANALYZED[0], bet_data=dict(ANALYZED[0]['bet_data'], potential_win=None))
+    report = AIPredictor().generate_summary_report([no_potential], seed=1)
+    assert report['total_potential_wins'] == 0, "Slips without a potential win should add nothing, as before"
+    assert PortfolioAnalyzer([no_potential]).exposure('league')['Premier League']['potential_payout'] == 20.0
+    print("[OK] Summary report validated")
+
+
+def test_exposure_and_expected_return():
+    """Exposure and expected P&L should only cover active bets"""
+    portfolio = PortfolioAnalyzer(ANALYZED)
+    by_league = portfolio.exposure('league')
+    assert by_league['Premier League'] == {'stake': 30.0, 'potential_payout': 50.0}
+    assert by_league['La Liga'] == {'stake': 5.0, 'potential_payout': 30.0}
+    assert portfolio.exposure('market')['1X2']['stake'] == 15.0
+
+    expected = portfolio.expected_return()
+    # 0.5*20-10 + 0.7*30-20 + 0.15*30-5
+    assert expected['expected_pnl'] == 0.5
+    assert abs(expected['pnl_variance'] - (0.25 * 400 + 0.21 * 900 + 0.1275 * 900)) < 0.01
+    print("[OK] Exposure and expected return validated")
+
+
+def test_simulation_matches_analytic_moments():
+    """Simulated mean and spread should agree with the closed-form values"""
+    portfolio = PortfolioAnalyzer(ANALYZED)
+    expected = portfolio.expected_return()
+    simulation = portfolio.simulate_pnl(n_draws=200_000, seed=7)
+    assert abs(simulation['mean_pnl'] - expected['expected_pnl']) < 0.3
+    assert abs(simulation['std_pnl'] - expected['pnl_std']) < 0.3
+    assert simulation['percentiles']['p5'] <= simulation['percentiles']['p50'] <= simulation['percentiles']['p95']
+    assert PortfolioAnalyzer(ANALYZED[3:]).simulate_pnl() is None, "No active bets means nothing to simulate"
+    print("[OK] Simulation moments validated")
+
+
+def test_simulation_speed():
+    """100k draws over 1,000 active bets should finish well under a second"""
+    rng = np.random.default_rng(0)
+    analyzed = [
+        make_analyzed(f"Match {i}", f"League {i % 12}", "1X2", float(rng.integers(1, 50)),
+                      float(rng.uniform(1.2, 8.0)), float(rng.uniform(5, 90)))
+        for i in range(1000)
+    ]
+    portfolio = PortfolioAnalyzer(analyzed)
+    start = time.perf_counter()
+    simulation = portfolio.simulate_pnl(n_draws=100_000, seed=3)
+    elapsed = time.perf_counter() - start
+    assert simulation['draws'] == 100_000
+    assert elapsed < 1.0, f"Simulation took {elapsed:.2f}s"
+    print(f"[OK] Simulated 100k draws x 1,000 bets in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_summary_keeps_report_keys()
+    test_exposure_and_expected_return()
+    test_simulation_matches_analytic_moments()
+    test_simulation_speed()
+    print("\n[SUCCESS] Portfolio tests passed!")
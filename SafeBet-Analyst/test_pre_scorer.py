@@ -0,0 +1,87 @@
+"""
+SafeBet Analyst - Pre-Scorer Tests
+Validates local triage of settled, clear-cut and ambiguous bets
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath('.'))
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_analyzer.pre_scorer import BetPreScorer
+from ai_analyzer.predictor import AIPredictor
+from utils.data_utils import calculate_expected_value
+
+
+class CountingPredictor(AIPredictor):
+    """AIPredictor that counts LLM calls instead of making them"""
+
+    def __init__(self):
+        super().__init__()
+        self.llm_calls = 0
+
+    def analyze_bet_slip(self, bet_data):
+        self.llm_calls += 1
+        return {"win_probability": 55.0, "risk_level": "Medium", "ai_suggestion": "LLM"}
+
+
+def test_score_values():
+    """Implied probability and EV should come from the odds"""
+    scorer = BetPreScorer()
+    score = scorer.score({'odds': 2.5, 'status': 'Active'})
+    assert score['implied_probability'] == 40.0
+    assert score['expected_value'] == calculate_expected_value(2.5, score['fair_probability'])
+    assert score['risk_level'] == "Medium" and score['needs_llm']
+    print("[OK] Score values validated")
+
+
+def test_settled_bets_skip_llm():
+    """Settled bets should be resolved from status or payout"""
+    scorer = BetPreScorer()
+    won = scorer.score({'odds': 2.5, 'status': 'Won', 'actual_win': 25.0})
+    lost = scorer.score({'odds': 2.5, 'status': 'Lost'})
+    by_payout = scorer.score({'odds': 3.0, 'status': 'Calculated', 'actual_win': 0})
+    still_open = scorer.score({'odds': 3.0, 'status': 'Active', 'actual_win': None})
+    cashed_out = scorer.score({'odds': 3.0, 'status': 'Cashed Out', 'actual_win': 7.5})
+
+    assert won['settled_outcome'] == 'won' and not won['needs_llm']
+    assert lost['settled_outcome'] == 'lost'
+    assert by_payout['settled_outcome'] == 'lost'
+    assert still_open['settled_outcome'] is None and still_open['needs_llm']
+    assert cashed_out['settled_outcome'] == 'cashed_out' and not cashed_out['needs_llm'], "Cash-outs are not wins"
+    assert scorer.local_analysis({}, cashed_out)['ai_suggestion'] == "Settled - cashed out"
+    print("[OK] Settled bets validated")
+
+
+def test_batch_only_sends_ambiguous_bets():
+    """Only ambiguous active bets should reach the LLM"""
+    bets = [
+        {'match_name': 'A vs B', 'odds': 2.4, 'status': 'Active'},   # ambiguous
+        {'match_name': 'C vs D', 'odds': 1.15, 'status': 'Active'},  # heavy favourite
+        {'match_name': 'E vs F', 'odds': 9.0, 'status': 'Pending'},  # long shot
+        {'match_name': 'G vs H', 'odds': 2.0, 'status': 'Won', 'actual_win': 20.0},
+        {'match_name': 'I vs J', 'odds': 3.1, 'status': 'Lost', 'actual_win': 0},
+    ]
+    predictor = CountingPredictor()
+    results = predictor.batch_analyze_bets(bets)
+
+    assert predictor.llm_calls == 1, "Only the ambiguous bet should call the LLM"
+    assert [r['bet_data']['match_name'] for r in results] == [b['match_name'] for b in bets]
+    assert results[0]['analysis']['ai_suggestion'] == "LLM"
+    assert results[1]['analysis']['source'] == "pre_scorer" and results[1]['analysis']['risk_level'] == "Low"
+    assert results[2]['analysis']['risk_level'] == "High"
+    assert results[3]['analysis']['win_probability'] == 100.0
+    assert results[4]['analysis']['win_probability'] == 0.0
+
+    untriaged = CountingPredictor()
+    untriaged.batch_analyze_bets(bets, triage=False)
+    assert untriaged.llm_calls == len(bets)
+    print("[OK] Batch triage validated")
+
+
+if __name__ == "__main__":
+    test_score_values()
+    test_settled_bets_skip_llm()
+    test_batch_only_sends_ambiguous_bets()
+    print("\n[SUCCESS] Pre-scorer tests passed!")
@@ -0,0 +1,61 @@
+"""
+SafeBet Analyst - Rerun Profiler Tests
+Validates opt-in switching, span timing and the per-rerun output files
+"""
+
+import os
+import sys
+import time
+import tempfile
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.profiling import RerunProfiler, profiling_requested
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
+
+
+def test_profiling_is_opt_in():
+    """Profiling should only turn on via env var or query param"""
+    os.environ.pop("SAFEBET_PROFILE", None)
+    assert not profiling_requested({})
+    assert profiling_requested({"profile": "1"})
+    assert profiling_requested({"profile": ["true"]})
+
+    profiler = RerunProfiler.from_request({})
+    profiler.start()
+    with profiler.span("prologue"):
+        pass
+    assert profiler.finish() is None, "Disabled profiler should not produce a report"
+    print("[OK] Profiling is opt-in")
+
+
+def test_rerun_profile_output():
+    """An enabled profiler should write collapsed stacks and a hotspot summary"""
+    output_dir = tempfile.mkdtemp()
+    profiler = RerunProfiler(enabled=True, output_dir=output_dir, sample_interval=0.001)
+    predictor = UpcomingEventPredictor()
+
+    profiler.start()
+    with profiler.span("prologue"):
+        predictor.get_2plus_best_predictions(top_n=10)
+    with profiler.span("show_dashboard"):
+        time.sleep(0.05)
+    report = profiler.finish()
+
+    assert set(report['sections']) == {"prologue", "show_dashboard"}
+    assert report['sections']['show_dashboard'] >= 0.05
+    assert report['hotspots'], "Report should list hotspots"
+    assert report['samples'] > 0, "Sampler should have recorded stacks"
+
+    with open(report['folded_path']) as f:
+        lines = f.read().strip().split("\n")
+    assert all(line.startswith("rerun;") for line in lines)
+    assert any(";show_dashboard;" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert os.path.exists(report['summary_path'])
+    print("[OK] Rerun profile output validated")
+
+
+if __name__ == "__main__":
+    test_profiling_is_opt_in()
+    test_rerun_profile_output()
+    print("\n[SUCCESS] Profiler tests passed!")
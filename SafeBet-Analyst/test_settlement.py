@@ -0,0 +1,137 @@
+"""
+SafeBet Analyst - Settlement Tests
+Validates market resolution and automatic settlement of finished matches
+"""
+
+import os
+import sys
+import time
+import random
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.settlement import settle_markets, PredictionSettler, settler
+from utils.live_score_updater import LiveScoreUpdater
+from ai_analyzer.calibration import calibrator
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
+
+
+MARKETS = {
+    "MatchResult": {"Win": 50.0, "Draw": 30.0, "Lose": 20.0},
+    "DoubleChance": {"TeamA/Draw": 80.0, "TeamB/Draw": 50.0, "TeamA/TeamB": 70.0},
+    "OverUnder": {"1.5": {"Over": 70.0, "Under": 30.0}, "2.5": {"Over": 45.0, "Under": 55.0}},
+    "BTTS": {"Yes": 55.0, "No": 45.0},
+    "CorrectScores": {"1-0": 30.0, "2-1": 25.0, "1-1": 20.0}
+}
+
+
+def prediction(match_id):
+    return {"match_id": match_id, "match": "Home vs Away", "confidence": 70.0, "betting_markets": MARKETS}
+
+
+def test_settle_markets():
+    """Every market should resolve against the final score"""
+    won = {(market, selection) for market, selection, _, hit in settle_markets(MARKETS, 2, 1) if hit}
+    assert won == {
+        ("MatchResult", "Win"), ("DoubleChance", "TeamA/Draw"), ("DoubleChance", "TeamA/TeamB"),
+        ("OverUnder 1.5", "Over"), ("OverUnder 2.5", "Over"), ("BTTS", "Yes"), ("CorrectScore", "2-1")
+    }, won
+
+    won = {(market, selection) for market, selection, _, hit in settle_markets(MARKETS, 0, 0) if hit}
+    assert ("MatchResult", "Draw") in won and ("OverUnder 1.5", "Under") in won and ("BTTS", "No") in won
+    assert len(settle_markets(MARKETS, 0, 0)) == 15
+    print("[OK] Market settlement validated")
+
+
+def test_finished_matches_settle_automatically():
+    """A match turning FINISHED should settle its predictions into the history once"""
+    calibrator.reset()
+    try:
+        updater = LiveScoreUpdater()
+        local_settler = PredictionSettler(updater)
+        updater.add_status_listener(local_settler.on_status_change)
+        local_settler.register(prediction("m1"), "2+")
+        local_settler.register(prediction("m1"), None)
+
+        match = {'home_team': "Home", 'away_team': "Away", 'home_score': 1, 'away_score': 1, 'status': "LIVE"}
+        feed = [{"m1": match}, {"m1": dict(match, status="FINISHED")}, {"m1": dict(match, status="FINISHED")}]
+        updater.get_live_scores_from_api = lambda: feed.pop(0)
+        for _ in range(3):
+            updater.update_live_data()
+
+        history = updater.get_prediction_history()
+        assert len(history) == 2 and local_settler.pending_count() == 0
+        record = updater.get_vip_prediction_history("2+")[0]
+        assert record['actual_outcome'] == "Draw" and not record['was_correct'] and record['actual_score'] == "1-1"
+        assert len(record['market_results']) == 15
+        assert len(calibrator.samples[("MatchResult", None)][0]) == 6
+    finally:
+        calibrator.reset()
+    print("[OK] Automatic settlement validated")
+
+
+def test_resettling_does_not_drift_calibration():
+    """Samples come from raw model values, so refits never train on their own outputs"""
+    calibrator.reset()
+    try:
+        for i in range(300):
+            p = 0.2 + 0.6 * (i % 50) / 50
+            calibrator.record("MatchResult", None, p, i % 10 < 3)
+            calibrator.record("confidence", None, 0.5 + p / 2, i % 10 < 5)
+        predictor = UpcomingEventPredictor()
+        match = predictor.matches_data[0]
+        updater = LiveScoreUpdater()
+        local_settler = PredictionSettler(updater)
+
+        inputs = []
+        for round_number in range(2):
+            random.seed(7)  # news impacts are drawn at random
+            pred = predictor.predict_match_outcome(match)
+            assert pred['probabilities'] != pred['raw_probabilities'], "Calibration should be active"
+            local_settler.register(dict(pred, match_id=f"m{round_number}"), "2+")
+            local_settler.settle(f"m{round_number}", 2, 0)
+            inputs.append((list(calibrator.samples[("MatchResult", "2+")][0])[-3:], calibrator.samples[("confidence", "2+")][0][-1]))
+
+        raw = pred['raw_probabilities']
+        assert inputs[0] == inputs[1], "A refit must not change the next samples' inputs"
+        assert inputs[0][0] == [raw['home_win'] / 100, raw['draw'] / 100, raw['away_win'] / 100]
+        assert inputs[0][1] == pred['raw_confidence'] / 100
+    finally:
+        calibrator.reset()
+    print("[OK] Calibration samples use raw model values")
+
+
+def test_predictor_registers_predictions():
+    """Indexed predictions should be queued for settlement"""
+    predictor = UpcomingEventPredictor()
+    predictions = predictor.refresh_predictions()
+    assert predictions and all(p['match_id'] in settler.pending for p in predictions)
+    print("[OK] Prediction registration validated")
+
+
+def test_busy_match_day():
+    """Settling hundreds of finished matches should stay cheap per match"""
+    calibrator.reset()
+    try:
+        updater = LiveScoreUpdater()
+        local_settler = PredictionSettler(updater)
+        for i in range(500):
+            local_settler.register(prediction(f"m{i}"), "2+")
+
+        start = time.perf_counter()
+        for i in range(500):
+            local_settler.settle(f"m{i}", i % 4, i % 3)
+        elapsed = time.perf_counter() - start
+        assert len(updater.prediction_history) == 500
+        assert elapsed < 0.5, f"Settling 500 matches took {elapsed:.3f}s"
+    finally:
+        calibrator.reset()
+    print(f"[OK] Settled 500 matches in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_settle_markets()
+    test_finished_matches_settle_automatically()
+    test_resettling_does_not_drift_calibration()
+    test_predictor_registers_predictions()
+    test_busy_match_day()
+    print("\n[SUCCESS] Settlement tests passed!")
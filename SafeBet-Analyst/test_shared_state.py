@@ -0,0 +1,189 @@
+"""
+SafeBet Analyst - Shared State Tests
+Validates leader election, follower reads and the shared prediction history
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.shared_state import SharedState
+from utils.live_score_updater import LiveScoreUpdater
+from utils.settlement import PredictionSettler
+from utils.team_ratings import TeamRatingStore
+from ai_analyzer.calibration import calibrator
+from utils.columnar_store import ColumnarStore
+import ai_analyzer.upcoming_predictor as upcoming
+
+
+def _updater(path, fetches):
+    # Each updater opens its own lock file handle, like a separate worker process
+    updater = LiveScoreUpdater(shared_state=SharedState(path))
+
+    def fetch():
+        fetches.append(updater)
+        return {"m1": {'home_team': "A", 'away_team': "B", 'home_score': len(fetches), 'away_score': 0,
+                       'minute': 50, 'status': "LIVE"}}
+    updater.get_live_scores_from_api = fetch
+    return updater
+
+
+def test_leader_election():
+    """Only one holder of the lock at a time, across processes too"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.db")
+        first, second = SharedState(path), SharedState(path)
+        assert first.acquire_leadership() and not second.acquire_leadership()
+
+        probe = "import sys; from utils.shared_state import SharedState; print(SharedState(sys.argv[1]).acquire_leadership())"
+        other_process = subprocess.run([sys.executable, "-c", probe, path], capture_output=True, text=True, cwd=os.path.abspath('.'))
+        assert other_process.stdout.strip() == "False", other_process.stdout + other_process.stderr
+
+        first.release_leadership()
+        assert second.acquire_leadership(), "Leadership should pass on once released"
+        second.release_leadership()
+    print("[OK] Leader election validated")
+
+
+def test_followers_read_leader_scores():
+    """The leader fetches once per tick; followers apply the same scores and fire their listeners"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.db")
+        fetches, changes = [], []
+        leader, follower = _updater(path, fetches), _updater(path, fetches)
+        follower.add_status_listener(lambda match_id, old, new, match: changes.append((match_id, new)))
+
+        leader.is_running = follower.is_running = True
+        leader.update_live_data()
+        follower.update_live_data()
+        assert fetches == [leader], "Only the leader should fetch"
+        assert follower.live_matches == leader.live_matches and changes == [("m1", "LIVE")]
+
+        follower.sync_shared_state()
+        assert len(changes) == 1, "Unchanged versions should not be re-applied"
+
+        # The leader stops: the next follower tick takes over
+        leader.is_running = False
+        leader.shared_state.release_leadership()
+        follower.update_live_data()
+        assert fetches == [leader, follower] and follower.shared_state.is_leader
+        follower.shared_state.release_leadership()
+    print("[OK] Leader/follower live scores validated")
+
+
+def test_on_demand_refreshes_are_shared():
+    """Without a running updater, a fresh shared result is reused instead of refetched"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.db")
+        fetches = []
+        first, second = _updater(path, fetches), _updater(path, fetches)
+        first.update_live_data()
+        second.update_live_data()
+        assert fetches == [first] and second.live_matches["m1"]["home_score"] == 1
+        assert not first.shared_state.is_leader, "On-demand refreshes should not keep the lock"
+
+        second.update_interval = 0
+        second.update_live_data()
+        assert fetches == [first, second], "Stale shared data should be refetched"
+    print("[OK] On-demand refreshes validated")
+
+
+def test_shared_history():
+    """History written by any process is visible to all, without duplicates"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.db")
+        first, second = _updater(path, []), _updater(path, [])
+        record = {"prediction_id": "m1:2+", "match_id": "m1", "vip_section": "2+", "was_correct": True,
+                  "predicted_at": "2026-01-01T12:00:00"}
+        written = []
+        for updater in (first, second):
+            updater.add_history_listener(lambda records: written.extend(r["prediction_id"] for r in records))
+        first.record_prediction_results([record])
+        second.record_prediction_results([record, dict(record, prediction_id="m2:2+", match_id="m2")])
+        second.record_prediction_results([record])
+        assert written == ["m1:2+", "m2:2+"], "History listeners should only see records their process inserted"
+
+        assert [r["match_id"] for r in first.get_prediction_history(days_back=100000)] == ["m1", "m2"]
+        assert [r["match_id"] for r in second.get_prediction_history(days_back=100000)] == ["m1", "m2"]
+    print("[OK] Shared prediction history validated")
+
+
+def test_finished_match_with_several_workers():
+    """Every worker settles and rates a finished match in memory; history, counts and the ratings file are written once"""
+    calibrator.reset()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.db")
+            fetches = []
+            workers = [_updater(path, fetches), _updater(path, fetches)]
+            feed = ["LIVE", "FINISHED"]
+            fetch = workers[0].get_live_scores_from_api
+            workers[0].get_live_scores_from_api = lambda: {"m1": dict(fetch()["m1"], status=feed.pop(0))}
+
+            settled, ratings = [], []
+            prediction = {"match_id": "m1", "match": "A vs B", "confidence": 70.0,
+                          "betting_markets": {"MatchResult": {"Win": 60.0, "Draw": 25.0, "Lose": 15.0}}}
+            for i, worker in enumerate(workers):
+                worker.is_running = True
+                settler = PredictionSettler(worker)
+                settler.register(prediction, "2+")
+                settle = settler.settle
+                settler.settle = lambda *args, settle=settle: settled.extend(settle(*args)) or []
+                worker.add_status_listener(settler.on_status_change)
+                store = TeamRatingStore(path=os.path.join(tmp, f"ratings_{i}.json"))
+                worker.add_status_listener(lambda *change, store=store, worker=worker:
+                                           store.on_status_change(*change, save=worker.is_leader()))
+                ratings.append(store)
+
+            for _ in range(2):
+                for worker in workers:
+                    worker.update_live_data()
+
+            assert len(fetches) == 2 and all(worker.live_matches["m1"]["status"] == "FINISHED" for worker in workers)
+            assert len(settled) == 1, "Only the first worker to settle should count the records"
+            assert all(len(worker.get_prediction_history()) == 1 for worker in workers)
+            assert ratings[0].rating("A") == ratings[1].rating("A") > 1500, "Every worker should rate the match"
+            assert os.path.exists(ratings[0].path) and not os.path.exists(ratings[1].path), \
+                "Only the leader should write the ratings file"
+            assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+    finally:
+        calibrator.reset()
+    print("[OK] Several workers validated")
+
+
+def test_only_leader_stores_predictions():
+    """Every worker refreshes predictions; only the leader writes them to the columnar store"""
+    saved = upcoming.prediction_snapshot.dump()
+    previous = (upcoming.columnar_store, upcoming.live_updater.shared_state)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = upcoming.columnar_store = ColumnarStore(os.path.join(tmp, "data"))
+            upcoming.live_updater.shared_state = SharedState(os.path.join(tmp, "state.db"))
+            leader = SharedState(os.path.join(tmp, "state.db"))
+            assert leader.acquire_leadership()
+
+            predictions = upcoming.UpcomingEventPredictor().refresh_predictions()
+            assert store.read("predictions").empty, "A follower should not store predictions"
+
+            leader.release_leadership()
+            assert upcoming.live_updater.shared_state.acquire_leadership()
+            upcoming.UpcomingEventPredictor().refresh_predictions()
+            assert len(store.read("predictions")) == len(predictions)
+            upcoming.live_updater.shared_state.release_leadership()
+    finally:
+        upcoming.columnar_store, upcoming.live_updater.shared_state = previous
+        upcoming.prediction_snapshot.created_at = saved["created_at"]
+        upcoming.prediction_snapshot.predictions = saved["predictions"]
+    print("[OK] Leader-only prediction storage validated")
+
+
+if __name__ == "__main__":
+    test_leader_election()
+    test_followers_read_leader_scores()
+    test_on_demand_refreshes_are_shared()
+    test_shared_history()
+    test_finished_match_with_several_workers()
+    test_only_leader_stores_predictions()
+    print("\n[SUCCESS] Shared state tests passed!")
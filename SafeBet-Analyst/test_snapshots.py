@@ -0,0 +1,218 @@
+"""
+SafeBet Analyst - Warm-Start Snapshot Tests
+Validates the snapshot format, version check and warm restore of live, prediction and analysis state
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.abspath('.'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from utils.snapshots import write_snapshot, read_snapshot, SnapshotManager, HEADER, SNAPSHOT_MAGIC
+from ai_analyzer.analysis_cache import AnalysisCache
+from ai_analyzer.predictor import AIPredictor
+from ai_analyzer.upcoming_predictor import PredictionSnapshot, UpcomingEventPredictor, prediction_snapshot
+from utils.job_runner import job_runner, DONE
+from utils.live_score_updater import LiveScoreUpdater
+
+
+def test_format_and_version_check():
+    """Snapshots round-trip; other versions, corrupt and missing files are ignored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.snap")
+        assert read_snapshot(path) is None
+        write_snapshot(path, {"live": {"m1": {"home_score": 2}}})
+        assert read_snapshot(path)["sections"] == {"live": {"m1": {"home_score": 2}}}
+
+        with open(path, "rb") as f:
+            body = f.read()[HEADER.size:]
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(SNAPSHOT_MAGIC, 99) + body)
+        assert read_snapshot(path) is None, "Other format versions should be ignored"
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(SNAPSHOT_MAGIC, 1) + b"not zlib")
+        assert read_snapshot(path) is None, "Corrupt snapshots should be ignored"
+    print("[OK] Snapshot format validated")
+
+
+def test_concurrent_writers():
+    """Writers sharing a path (several app processes) should never corrupt the snapshot"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.snap")
+        errors = []
+
+        def write(n):
+            for _ in range(20):
+                try:
+                    write_snapshot(path, {"writer": n, "data": list(range(2000))})
+                except Exception as e:
+                    errors.append(e)
+
+        writers = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        assert not errors, errors
+        assert read_snapshot(path)["sections"]["data"] == list(range(2000))
+        assert os.listdir(tmp) == ["state.snap"], "Temp files should all be renamed into place"
+    print("[OK] Concurrent snapshot writers validated")
+
+
+def test_expired_predictions_served_while_refreshing():
+    """Predictions older than the TTL (e.g. restored after a restart) are served while a job re-predicts"""
+    saved = prediction_snapshot.dump()
+    calls = []
+
+    class CountingPredictor(UpcomingEventPredictor):
+        def refresh_predictions(self):
+            calls.append(1)
+            return super().refresh_predictions()
+
+    try:
+        restored = UpcomingEventPredictor().refresh_predictions()
+        prediction_snapshot.created_at = time.time() - prediction_snapshot.ttl - 3600
+        best = CountingPredictor().get_2plus_best_predictions()
+        assert best and not calls, "Expired predictions should be served without re-predicting inline"
+        assert {p['match_id'] for p in best} <= {p['match_id'] for p in restored}
+
+        job = job_runner.list_jobs("refresh_predictions")[-1]
+        assert job_runner.wait(job["id"], timeout=60)["status"] == DONE
+        assert prediction_snapshot.fresh() is not None, "The background refresh should publish new predictions"
+    finally:
+        prediction_snapshot.created_at, prediction_snapshot.predictions = saved["created_at"], saved["predictions"]
+    print("[OK] Expired predictions served while refreshing")
+
+
+def test_stale_live_matches_skipped():
+    """Live matches are restored from a recent snapshot only; history is restored whatever its age"""
+    source = LiveScoreUpdater()
+    source.update_live_data()
+    source.prediction_history = [{"prediction_id": "p1", "match_id": "m1", "predicted_at": "2026-05-01T10:00:00"}]
+    state = source.snapshot_state()
+    assert source.live_matches
+
+    changes = []
+    recent = LiveScoreUpdater()
+    recent.add_status_listener(lambda *change: changes.append(change))
+    recent.restore_state(state)
+    assert recent.live_matches == source.live_matches and changes
+
+    stale = LiveScoreUpdater()
+    stale.add_status_listener(lambda *change: changes.append(change))
+    changes.clear()
+    stale.restore_state(dict(state, saved_at=time.time() - stale.restore_intervals * stale.update_interval - 1))
+    assert not stale.live_matches and not changes, "Old live scores should not be published as current"
+    assert len(stale.prediction_history) == 1
+    print("[OK] Stale live matches skipped")
+
+
+def test_manager_sections():
+    """Sections are dumped and restored by name; a failing section does not block the others"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.snap")
+        source, restored = SnapshotManager(path), {}
+        source.register("good", lambda: [1, 2, 3], None)
+        source.register("broken", lambda: 1 / 0, None)
+        source.save()
+
+        target = SnapshotManager(path)
+        target.register("good", lambda: None, lambda state: restored.update(good=state))
+        assert target.restore() == ["good"] and restored == {"good": [1, 2, 3]}
+    print("[OK] Snapshot sections validated")
+
+
+def test_analysis_cache():
+    """Repeated analyses of an unchanged slip should not call the LLM again"""
+    calls = []
+
+    class CountingPredictor(AIPredictor):
+        def _chat_completion(self, operation, messages, temperature, max_tokens):
+            calls.append(operation)
+            return {"win_probability": 58.0, "risk_level": "Low"}
+
+    predictor = CountingPredictor(cache=AnalysisCache(max_entries=2))
+    bet = {"match_name": "A vs B", "bet_type": "W1", "odds": 2.1, "stake": 5, "status": "Active"}
+    first = predictor.analyze_bet_slip(bet)
+    second = predictor.analyze_bet_slip(dict(bet, timestamp="later"))
+    assert calls == ["bet_slip"] and first == second
+    predictor.analyze_bet_slip(dict(bet, odds=2.2))
+    assert len(calls) == 2, "Changed prompt fields should miss the cache"
+
+    predictor.cache.put({"match_name": "C vs D"}, {"win_probability": 50.0, "is_fallback": True})
+    assert predictor.cache.get({"match_name": "C vs D"}) is None, "Fallbacks should not be cached"
+    predictor.cache.put({"match_name": "E vs F"}, {"win_probability": 50.0})
+    assert len(predictor.cache) == 2, "The cache should stay within max_entries"
+
+    snapshot = PredictionSnapshot(ttl=300)
+    assert snapshot.fresh() is None
+    snapshot.load({"created_at": 0, "predictions": [{"match_id": "m1"}]})
+    assert snapshot.fresh() is None, "Predictions older than the TTL should not be reused"
+    print("[OK] Analysis cache validated")
+
+
+WARM_BOOT = """
+import os, sys, json, time
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+from utils.live_score_updater import live_updater
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor, prediction_snapshot
+from ai_analyzer.predictor import AIPredictor
+from ai_analyzer.analysis_cache import analysis_cache
+from utils.snapshots import snapshot_manager
+
+bet = {"match_name": "A vs B", "bet_type": "W1", "odds": 2.1, "stake": 5, "status": "Active"}
+if sys.argv[1] == "save":
+    live_updater.update_live_data()
+    live_updater.track_prediction_result("p1", "m1", "Home Win", "Home Win", 80, "2+")
+    UpcomingEventPredictor().get_2plus_best_predictions()
+    analysis_cache.put(bet, {"win_probability": 61.0})
+    snapshot_manager.save()
+else:
+    start = time.perf_counter()
+    snapshot_manager.restore()
+    elapsed = time.perf_counter() - start
+    class NoLLM(AIPredictor):
+        def _chat_completion(self, *args):
+            raise AssertionError("LLM called")
+    print(json.dumps({
+        "elapsed": elapsed,
+        "live": len(live_updater.live_matches),
+        "history": len(live_updater.get_prediction_history()),
+        "predictions": len(prediction_snapshot.fresh() or []),
+        "analysis": NoLLM().analyze_bet_slip(bet)["win_probability"]
+    }))
+"""
+
+
+def test_warm_boot():
+    """A fresh process should restore live, history, prediction and analysis state quickly"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SAFEBET_SNAPSHOT_PATH=os.path.join(tmp, "state.snap"),
+                   SAFEBET_RATINGS_PATH=os.path.join(tmp, "ratings.json"))
+        run = lambda mode: subprocess.run([sys.executable, "-c", WARM_BOOT, mode], capture_output=True, text=True,
+                                          cwd=os.path.abspath('.'), env=env)
+        saved = run("save")
+        assert saved.returncode == 0, saved.stderr
+        restored = run("restore")
+        assert restored.returncode == 0, restored.stderr
+        state = json.loads(restored.stdout.strip().splitlines()[-1])
+    assert state["live"] > 0 and state["history"] == 1 and state["predictions"] > 0, state
+    assert state["analysis"] == 61.0
+    assert state["elapsed"] < 1.0, state
+    print(f"[OK] Warm boot restored in {state['elapsed'] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_format_and_version_check()
+    test_concurrent_writers()
+    test_stale_live_matches_skipped()
+    test_manager_sections()
+    test_analysis_cache()
+    test_expired_predictions_served_while_refreshing()
+    test_warm_boot()
+    print("\n[SUCCESS] Snapshot tests passed!")
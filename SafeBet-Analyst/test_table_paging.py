@@ -0,0 +1,87 @@
+"""
+SafeBet Analyst - Table Paging Tests
+Validates cached typed frames, server-side filter/sort and paging of large tables
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath('.'))
+
+from ui.table_paging import TablePager, data_version, format_datetime
+
+
+COLUMNS = ['match_name', 'odds', 'status', 'date']
+
+
+def make_bets(count):
+    start = datetime(2026, 1, 1)
+    return [{
+        'match_name': f'Team {i} vs Team {i + 1}',
+        'odds': 1.5 + i % 7,
+        'status': 'Won' if i % 3 else 'Lost',
+        'date': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M")
+    } for i in range(count)]
+
+
+def test_frames_cached_per_version():
+    """Frames are built once per data version and rebuilt when records change"""
+    pager = TablePager()
+    bets = make_bets(10)
+    df = pager.frame(bets, COLUMNS, date_columns=('date',), numeric_columns=('odds',))
+    assert str(df['date'].dtype).startswith('datetime64') and df['odds'].dtype.kind == 'f'
+    assert pager.frame(list(bets), COLUMNS, date_columns=('date',), numeric_columns=('odds',)) is df, \
+        "A new list of the same records should reuse the frame"
+
+    bets.append({'match_name': 'Late vs Entry', 'odds': 3.0, 'status': 'Won', 'date': 'not a date'})
+    updated = pager.frame(bets, COLUMNS, date_columns=('date',), numeric_columns=('odds',))
+    assert updated is not df and len(updated) == 11 and updated['date'].isna().iloc[-1]
+    assert data_version([]) == (0, None, None)
+    print("[OK] Frame caching validated")
+
+
+def test_filter_sort_and_pages():
+    """Views filter, sort with missing values last and slice pages"""
+    pager = TablePager()
+    bets = make_bets(100) + [{'match_name': 'Team X vs Team Y', 'odds': None, 'status': 'Won', 'date': None}]
+    df = pager.frame(bets, COLUMNS, date_columns=('date',), numeric_columns=('odds',))
+
+    newest_first = pager.view(df, sort_by='date', descending=True)
+    assert df['match_name'].iloc[newest_first[0]] == 'Team 99 vs Team 100'
+    assert df['match_name'].iloc[newest_first[-1]] == 'Team X vs Team Y', "Missing dates should sort last"
+
+    lost = pager.view(df, "team 1", search_columns=('match_name',), sort_by='odds', where={'status': 'Lost'})
+    assert all(df['status'].iloc[lost] == 'Lost') and all('Team 1' in name for name in df['match_name'].iloc[lost])
+    assert list(df['odds'].iloc[lost]) == sorted(df['odds'].iloc[lost])
+    assert pager.view(df, "team 1", search_columns=('match_name',), sort_by='odds', where={'status': 'Lost'}) is lost
+
+    page = pager.page(df, newest_first, 3, page_size=40)
+    assert len(page) == 21 and page['match_name'].iloc[0] == 'Team 19 vs Team 20'
+    assert list(format_datetime(page['date']).iloc[-2:]) == ['2026-01-01 00:00', 'Unknown']
+    print("[OK] Filter, sort and paging validated")
+
+
+def test_large_history():
+    """50k records: building the frame once and serving pages should be well under a second"""
+    pager = TablePager()
+    bets = make_bets(50000)
+    start = time.perf_counter()
+    df = pager.frame(bets, COLUMNS, date_columns=('date',), numeric_columns=('odds',), category_columns=('status',))
+    positions = pager.view(df, sort_by='date', descending=True)
+    page = pager.page(df, positions, 1)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = pager.frame(bets, COLUMNS, date_columns=('date',), numeric_columns=('odds',), category_columns=('status',))
+    page = pager.page(df, pager.view(df, sort_by='date', descending=True), 2)
+    warm = time.perf_counter() - start
+    assert len(page) == 50 and cold < 1.0 and warm < 0.01, (cold, warm)
+    print(f"[OK] 50k rows: first page {cold * 1000:.0f}ms, cached page {warm * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    test_frames_cached_per_version()
+    test_filter_sort_and_pages()
+    test_large_history()
+    print("\n[SUCCESS] Table paging tests passed!")
@@ -0,0 +1,104 @@
+"""
+SafeBet Analyst - Team Rating Tests
+Validates Elo updates, persistence, live updater wiring and rating-driven predictions
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.insert(0, os.path.abspath('.'))
+
+from utils.team_ratings import TeamRatingStore
+from utils.live_score_updater import LiveScoreUpdater
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor, DEFAULT_PREDICTOR_PARAMS
+from ai_analyzer.backtest import build_match_records, generate_synthetic_season, replay
+from ai_analyzer.param_search import extract_features, match_result_probabilities
+
+
+def test_elo_updates():
+    """Wins move ratings in opposite directions, bigger wins further, and results count once"""
+    store = TeamRatingStore()
+    assert store.expected_home_score("A", "B") > 0.5, "Home advantage should favour the home side"
+
+    delta = store.record_result("m1", "A", "B", 1, 0)
+    assert delta > 0 and store.rating("A") == 1500 + delta and store.rating("B") == 1500 - delta
+    assert store.record_result("m1", "A", "B", 1, 0) == 0.0, "Duplicate results must be ignored"
+
+    big = TeamRatingStore()
+    assert big.record_result("m1", "A", "B", 4, 0) > delta, "Goal margin should scale the update"
+
+    probs = store.probabilities("A", "B")
+    assert abs(sum(probs.values()) - 1) < 1e-9 and probs["home"] > probs["away"]
+    print("[OK] Elo updates validated")
+
+
+def test_persistence():
+    """Ratings survive a reload from the JSON file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ratings.json")
+        store = TeamRatingStore(path=path)
+        store.record_result("m1", "A", "B", 2, 1)
+        reloaded = TeamRatingStore(path=path)
+        assert reloaded.rating("A") == store.rating("A")
+        assert reloaded.record_result("m1", "A", "B", 2, 1) == 0.0, "Processed matches are persisted too"
+    print("[OK] Rating persistence validated")
+
+
+def test_live_updater_feeds_ratings():
+    """A match turning FINISHED between updates should update the ratings once"""
+    store = TeamRatingStore()
+    updater = LiveScoreUpdater()
+    updater.add_status_listener(store.on_status_change)
+
+    match = {'home_team': "A", 'away_team': "B", 'home_score': 0, 'away_score': 2, 'status': "LIVE"}
+    feed = [{"m1": match}, {"m1": dict(match, status="FINISHED")}, {"m1": dict(match, status="FINISHED")}]
+    updater.get_live_scores_from_api = lambda: feed.pop(0)
+    for _ in range(3):
+        updater.update_live_data()
+
+    assert store.rating("B") > store.rating("A")
+    assert store.games == {"A": 1, "B": 1}
+    print("[OK] Live updater rating updates validated")
+
+
+def test_rating_driven_predictions():
+    """Fixtures that only name the teams should be predicted from ratings"""
+    store = TeamRatingStore()
+    for i in range(10):
+        store.record_result(f"m{i}", "Strong", "Weak", 3, 0)
+
+    predictor = UpcomingEventPredictor(params=DEFAULT_PREDICTOR_PARAMS, ratings=store)
+    favourite = predictor.predict_from_ratings("Strong", "Weak", league="Test League")
+    underdog = predictor.predict_from_ratings("Weak", "Strong")
+    assert favourite['probabilities']['home_win'] > underdog['probabilities']['home_win']
+    assert favourite['predicted_outcome'] == "Strong to Win"
+    assert any(f.startswith("Ratings:") for f in favourite['key_factors'])
+    print("[OK] Rating-driven predictions validated")
+
+
+def test_backtest_ratings_match_vectorized_scores():
+    """Pre-match ratings in backtest records should score the same in replay and param search"""
+    records = build_match_records(generate_synthetic_season(n_teams=8, seed=3))
+    assert records[0]['ratings'] == {"home": 1500.0, "away": 1500.0}
+    assert any(r['ratings']['home'] != 1500.0 for r in records[-10:])
+
+    assert any('recent_form' not in r and r['ratings']['home'] != r['ratings']['away'] for r in records), \
+        "Fixtures of teams without earlier results should be rated-only"
+
+    features = extract_features(records, seed=0)
+    for params in (dict(DEFAULT_PREDICTOR_PARAMS, rating_weight=1.5), dict(DEFAULT_PREDICTOR_PARAMS, rating_only_weight=3.5)):
+        replayed = replay(records, workers=1, seed=0, params=params)[:, :3]
+        home, draw, away = match_result_probabilities(features, [params])
+        vectorized = np.column_stack([home[:, 0], draw[:, 0], away[:, 0]])
+        assert np.abs(replayed - vectorized).max() <= 0.0005 + 1e-9
+    print("[OK] Backtest rating features validated")
+
+
+if __name__ == "__main__":
+    test_elo_updates()
+    test_persistence()
+    test_live_updater_feeds_ratings()
+    test_rating_driven_predictions()
+    test_backtest_ratings_match_vectorized_scores()
+    print("\n[SUCCESS] Team rating tests passed!")
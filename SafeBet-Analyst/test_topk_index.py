@@ -0,0 +1,105 @@
+"""
+SafeBet Analyst - Top-K Index Tests
+Validates incremental best-probability queries against a full sort
+"""
+
+import os
+import sys
+import random
+sys.path.insert(0, os.path.abspath('.'))
+
+from ai_analyzer.topk_index import PredictionTopKIndex
+from ai_analyzer.upcoming_predictor import UpcomingEventPredictor, prediction_snapshot
+
+
+def full_sort(items, n, min_odd, max_odd=None):
+    matching = [(key, odd, score) for key, (odd, score) in items.items()
+                if odd >= min_odd and (max_odd is None or odd <= max_odd)]
+    matching.sort(key=lambda x: (-x[2], x[0]))
+    return [key for key, _, _ in matching[:n]]
+
+
+def test_matches_full_sort_under_updates():
+    """Queries should agree with a full sort after inserts, updates and removals"""
+    rng = random.Random(5)
+    index = PredictionTopKIndex()
+    items = {}
+    for step in range(3000):
+        key = f"match_{rng.randrange(400)}"
+        if rng.random() < 0.1 and key in items:
+            index.remove(key)
+            del items[key]
+            continue
+        odd = round(rng.uniform(1.05, 15.0), 2)
+        score = round(rng.uniform(5, 95), 1)
+        index.upsert(key, odd, score, key)
+        items[key] = (odd, score)
+
+        if step % 100 == 0:
+            for min_odd, max_odd in ((0.0, None), (2.0, None), (5.0, None), (1.7, 4.2), (12.0, None)):
+                assert index.top(10, min_odd, max_odd) == full_sort(items, 10, min_odd, max_odd), (step, min_odd, max_odd)
+    assert len(index) == len(items)
+    print("[OK] Index matches full sort")
+
+
+def test_predictor_best_predictions():
+    """Best-probability sections should come from the index and refresh per match"""
+    predictor = UpcomingEventPredictor()
+    best = predictor.get_2plus_best_predictions(top_n=10)
+    assert all(p['calculated_odd'] >= 2.0 - 0.01 for p in best)
+    probabilities = [p['recommended_probability'] for p in best]
+    assert probabilities == sorted(probabilities, reverse=True)
+    assert all('match_id' in p for p in best)
+
+    # Refreshing one fixture replaces only its entry
+    size = len(predictor.best_index)
+    match = predictor.matches_data[0]
+    refreshed = predictor.refresh_match(match)
+    assert len(predictor.best_index) == size
+    assert predictor.best_index.entries[refreshed['match_id']][3]['confidence'] == refreshed['confidence']
+
+    best[0]['recommended_probability'] = -1
+    assert predictor.get_2plus_best_predictions(top_n=10)[0]['recommended_probability'] != -1, "Results should be copies"
+    print("[OK] Predictor best predictions validated")
+
+
+def test_long_lived_predictor_follows_shared_predictions():
+    """A predictor kept across reruns applies newer shared prediction sets to its index without re-predicting"""
+    saved = prediction_snapshot.dump()
+    calls = []
+
+    class CountingPredictor(UpcomingEventPredictor):
+        def refresh_predictions(self):
+            calls.append(1)
+            return super().refresh_predictions()
+
+    try:
+        predictor = CountingPredictor()
+        predictions = predictor.refresh_predictions()
+        index = predictor.best_index
+
+        # Another session publishes a set without the first match and a new confidence for the second
+        changed = dict(predictions[1], confidence=12.5)
+        prediction_snapshot.publish([changed] + predictions[2:])
+        prediction_snapshot.created_at += 1
+        predictor.get_2plus_best_predictions()
+        assert predictor.best_index is index and len(index) == len(predictions) - 1
+        assert predictions[0]['match_id'] not in index
+        assert index.entries[changed['match_id']][3]['confidence'] == 12.5
+
+        # An unchanged set leaves per-match refreshes alone
+        refreshed = dict(predictions[2], confidence=99.0)
+        predictor._index_prediction(refreshed)
+        predictor.get_5plus_best_predictions()
+        assert index.entries[refreshed['match_id']][3]['confidence'] == 99.0
+        assert len(calls) == 1, "Shared sets should be applied without re-predicting"
+    finally:
+        prediction_snapshot.created_at, prediction_snapshot.predictions = saved["created_at"], saved["predictions"]
+    print("[OK] Long-lived predictor validated")
+
+
+if __name__ == "__main__":
+    test_matches_full_sort_under_updates()
+    test_predictor_best_predictions()
+    test_long_lived_predictor_follows_shared_predictions()
+    print("\n[SUCCESS] Top-K index tests passed!")
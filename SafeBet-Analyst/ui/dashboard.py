@@ -12,9 +12,41 @@ from ai_analyzer.upcoming_predictor import UpcomingEventPredictor
 from scraper.bet_scraper import BetScraper
 from ai_analyzer.predictor import AIPredictor
 from utils.live_score_updater import live_updater
+from utils.live_state import live_state
+from ai_analyzer.inplay_model import inplay_pricer
+from utils.entity_resolution import fixture_resolver
+from utils.metrics import metrics
+from utils.profiling import RerunProfiler
+from utils.job_runner import job_runner, FINISHED_STATUSES, DONE
+from utils.snapshots import snapshot_manager
+from ui.table_paging import show_paged_table, table_pager, format_datetime
+from scraper.bet_pipeline import fetch_and_analyze_bets
 import asyncio
 
+@st.cache_resource
+def get_upcoming_predictor():
+    """
+    One predictor per process; its best-probability index outlives reruns and
+    sessions and follows the shared predictions incrementally
+    """
+    return UpcomingEventPredictor()
+
 def run_dashboard():
+    # Warm-start from the last snapshot on the first run of this process
+    snapshot_manager.start()
+
+    # Opt-in profiling of this rerun (SAFEBET_PROFILE=1 or ?profile=1)
+    profiler = RerunProfiler.from_request(st.query_params)
+    profiler.start()
+    try:
+        _render_dashboard(profiler)
+    finally:
+        report = profiler.finish()
+
+    if report:
+        show_profile_report(report)
+
+def _render_dashboard(profiler):
     # Custom header with SpeedoVIP branding
     st.markdown("<h1 style='text-align: center; color: #4A90E2;'>🚀 SpeedoVIP - Premium Football Analysis</h1>", unsafe_allow_html=True)
     st.markdown("<h3 style='text-align: center; color: #50C878;'>AI-Powered Betting Analysis & Prediction Tool</h3>", unsafe_allow_html=True)
@@ -22,49 +54,58 @@ def run_dashboard():
     # Add a custom logo/text representation for HemanVIP
     st.markdown("<div style='text-align: center; background-color: #f0f8ff; padding: 10px; border-radius: 10px; margin-bottom: 20px;'><h2 style='color: #FF6B35;'>🔥 HemanVIP Exclusive 🔥</h2></div>", unsafe_allow_html=True)
 
-    # Initialize session state
-    if 'bets_data' not in st.session_state:
-        st.session_state.bets_data = {'active': [], 'historical': []}
-    if 'predictions' not in st.session_state:
-        st.session_state.predictions = []
-    if 'live_scores' not in st.session_state:
-        st.session_state.live_scores = {}
-    if 'auto_update_enabled' not in st.session_state:
-        st.session_state.auto_update_enabled = False
-    if 'prediction_history' not in st.session_state:
-        st.session_state.prediction_history = []
-    if 'best_2plus_predictions' not in st.session_state:
-        st.session_state.best_2plus_predictions = []
-    if 'best_5plus_predictions' not in st.session_state:
-        st.session_state.best_5plus_predictions = []
-    if 'scraper' not in st.session_state:
-        st.session_state.scraper = None
-    if 'ai_predictor' not in st.session_state:
-        st.session_state.ai_predictor = AIPredictor()
-
-    # Initialize predictor
-    predictor = UpcomingEventPredictor()
-
-    # Auto-update live scores if enabled
-    if st.session_state.auto_update_enabled and not live_updater.is_running:
-        live_updater.start_auto_update()
-    elif not st.session_state.auto_update_enabled and live_updater.is_running:
-        live_updater.stop_auto_update()
-
-    # Update live scores in session state
-    if st.session_state.auto_update_enabled:
-        st.session_state.live_scores = live_updater.live_matches
+    # Data-loading prologue
+    with profiler.span("prologue"):
+        # Initialize session state
+        if 'bets_data' not in st.session_state:
+            st.session_state.bets_data = {'active': [], 'historical': []}
+        if 'predictions' not in st.session_state:
+            st.session_state.predictions = []
+        if 'live_scores' not in st.session_state:
+            st.session_state.live_scores = {}
+        if 'auto_update_enabled' not in st.session_state:
+            st.session_state.auto_update_enabled = False
+        if 'prediction_history' not in st.session_state:
+            st.session_state.prediction_history = []
+        if 'best_2plus_predictions' not in st.session_state:
+            st.session_state.best_2plus_predictions = []
+        if 'best_5plus_predictions' not in st.session_state:
+            st.session_state.best_5plus_predictions = []
+        if 'scraper' not in st.session_state:
+            st.session_state.scraper = None
+        if 'analyzed_bets' not in st.session_state:
+            st.session_state.analyzed_bets = []
+        if 'fetch_job_id' not in st.session_state:
+            st.session_state.fetch_job_id = None
+        if 'ai_predictor' not in st.session_state:
+            st.session_state.ai_predictor = AIPredictor()
+
+        # Process-wide predictor
+        predictor = get_upcoming_predictor()
+
+        # Auto-update live scores if enabled
+        if st.session_state.auto_update_enabled and not live_updater.is_running:
+            live_updater.start_auto_update()
+        elif not st.session_state.auto_update_enabled and live_updater.is_running:
+            live_updater.stop_auto_update()
+
+        # Update live scores in session state
+        if st.session_state.auto_update_enabled:
+            st.session_state.live_scores = live_state.current().matches
 
-    # Update prediction history
-    st.session_state.prediction_history = live_updater.get_prediction_history()
+        # Update prediction history
+        st.session_state.prediction_history = live_updater.get_prediction_history()
 
-    # Update best predictions for VIP sections
-    st.session_state.best_2plus_predictions = predictor.get_2plus_best_predictions(top_n=10)
-    st.session_state.best_5plus_predictions = predictor.get_5plus_best_predictions(top_n=10)
+        # Update best predictions for VIP sections
+        st.session_state.best_2plus_predictions = predictor.get_2plus_best_predictions(top_n=10)
+        st.session_state.best_5plus_predictions = predictor.get_5plus_best_predictions(top_n=10)
 
     # Sidebar for navigation and settings
     st.sidebar.header("🎯 SpeedoVIP Navigation")
-    page = st.sidebar.selectbox("Choose a page", ["🏠 Dashboard", "🎫 My Bets", "🔮 AI Predictions", "⚽ Live Scores", "📊 Prediction History", "⚙️ Settings"])
+    pages = ["🏠 Dashboard", "🎫 My Bets", "🔮 AI Predictions", "⚽ Live Scores", "📊 Prediction History", "⚙️ Settings"]
+    if metrics.enabled:
+        pages.append("🩺 Diagnostics")
+    page = st.sidebar.selectbox("Choose a page", pages)
 
     # Auto-update toggle
     st.sidebar.header("📡 Live Updates")
@@ -83,35 +124,43 @@ def run_dashboard():
         st.session_state.bets_data = {'active': [], 'historical': []}
         st.rerun()
 
+    # Scrape and analysis run in the background; the status panel polls the job
+    if st.sidebar.button("📥 Fetch Latest Bet Data"):
+        st.session_state.fetch_job_id = job_runner.submit(
+            "fetch_bets", fetch_and_analyze_bets, st.session_state.ai_predictor, unique=True
+        )
+    with st.sidebar:
+        show_fetch_job_status()
+
     if st.sidebar.button("🔮 Refresh AI Predictions"):
         st.session_state.predictions = predictor.predict_top_matches(count=3)
         st.rerun()
 
     if st.sidebar.button("⚽ Refresh Live Scores"):
-        live_updater.update_live_data()
-        st.session_state.live_scores = live_updater.live_matches
+        st.session_state.live_scores = live_state.refresh().matches
         st.rerun()
 
     # Get AI predictions
-    if not st.session_state.predictions:
-        try:
-            st.session_state.predictions = predictor.predict_top_matches(count=3)
-        except Exception as e:
-            st.error(f"Error getting AI predictions: {str(e)}")
-            st.session_state.predictions = []
-
-    if page == "🏠 Dashboard":
-        show_dashboard(st.session_state.bets_data['active'], st.session_state.bets_data['historical'], st.session_state.predictions)
-    elif page == "🎫 My Bets":
-        show_my_bets(st.session_state.bets_data['active'], st.session_state.bets_data['historical'])
-    elif page == "🔮 AI Predictions":
-        show_ai_predictions(st.session_state.predictions)
-    elif page == "⚽ Live Scores":
-        show_live_scores(st.session_state.live_scores)
-    elif page == "📊 Prediction History":
-        show_prediction_history(st.session_state.prediction_history)
-    elif page == "⚙️ Settings":
-        show_settings()
+    with profiler.span("load_predictions"):
+        if not st.session_state.predictions:
+            try:
+                st.session_state.predictions = predictor.predict_top_matches(count=3)
+            except Exception as e:
+                st.error(f"Error getting AI predictions: {str(e)}")
+                st.session_state.predictions = []
+
+    page_views = {
+        "🏠 Dashboard": (show_dashboard, (st.session_state.bets_data['active'], st.session_state.bets_data['historical'], st.session_state.predictions)),
+        "🎫 My Bets": (show_my_bets, (st.session_state.bets_data['active'], st.session_state.bets_data['historical'])),
+        "🔮 AI Predictions": (show_ai_predictions, (st.session_state.predictions,)),
+        "⚽ Live Scores": (show_live_scores, (st.session_state.live_scores,)),
+        "📊 Prediction History": (show_prediction_history, (st.session_state.prediction_history,)),
+        "⚙️ Settings": (show_settings, ()),
+        "🩺 Diagnostics": (show_diagnostics, ())
+    }
+    view, view_args = page_views[page]
+    with profiler.span(view.__name__):
+        view(*view_args)
 
 def show_dashboard(active_bets, historical_bets, ai_predictions):
     st.markdown("## 🏠 SpeedoVIP Dashboard Overview")
@@ -121,8 +170,9 @@ def show_dashboard(active_bets, historical_bets, ai_predictions):
 
     total_staked = sum([bet.get('stake', 0) for bet in active_bets])
     potential_winnings = sum([bet.get('potential_win', 0) for bet in active_bets if bet.get('status', '').lower() in ['active', 'pending']])
-    wins = len([bet for bet in historical_bets if bet.get('status', '').lower() == 'won'])
-    losses = len([bet for bet in historical_bets if bet.get('status', '').lower() == 'lost'])
+    historical_statuses = _bet_frame(historical_bets)['status'].astype(str).str.lower().value_counts()
+    wins = int(historical_statuses.get('won', 0))
+    losses = int(historical_statuses.get('lost', 0))
 
     with col1:
         st.metric(label="Active Bets", value=len(active_bets))
@@ -137,29 +187,16 @@ def show_dashboard(active_bets, historical_bets, ai_predictions):
     # Active bets section
     st.subheader("📈 My Active Bets")
     if active_bets:
-        active_df = pd.DataFrame(active_bets)
-        if not active_df.empty:
-            columns_to_show = [col for col in ['match_name', 'bet_type', 'odds', 'stake', 'potential_win', 'status', 'time_left'] if col in active_df.columns]
-            active_df_display = active_df[columns_to_show]
-            st.dataframe(active_df_display, use_container_width=True)
-        else:
-            st.info("No data to display")
+        _show_bets_table("dashboard_active", active_bets,
+                         ['match_name', 'bet_type', 'odds', 'stake', 'potential_win', 'status', 'time_left'])
     else:
         st.info("No active bets found")
 
     # Recent activity
     st.subheader("📋 Recent Activity")
     if historical_bets:
-        hist_df = pd.DataFrame(historical_bets)
-        if not hist_df.empty:
-            columns_to_show = [col for col in ['match_name', 'bet_type', 'stake', 'status', 'date', 'actual_win'] if col in hist_df.columns]
-            hist_df_display = hist_df[columns_to_show]
-            hist_df_display = hist_df_display.copy()  # Avoid SettingWithCopyWarning
-            if 'date' in hist_df_display.columns:
-                hist_df_display['date'] = pd.to_datetime(hist_df_display['date']).dt.strftime('%Y-%m-%d %H:%M')
-            st.dataframe(hist_df_display, use_container_width=True)
-        else:
-            st.info("No data to display")
+        _show_bets_table("dashboard_history", historical_bets,
+                         ['match_name', 'bet_type', 'stake', 'status', 'date', 'actual_win'], default_sort='date')
     else:
         st.info("No historical data found")
 
@@ -185,6 +222,100 @@ def show_dashboard(active_bets, historical_bets, ai_predictions):
     else:
         st.info("No AI predictions available")
 
+def show_fetch_job_status():
+    """
+    Status of the background bet fetch; polls only while a fetch is running
+    """
+    job_id = st.session_state.get('fetch_job_id')
+    job = job_runner.get(job_id) if job_id else None
+    if job is None:
+        return
+    if job['status'] in FINISHED_STATUSES:
+        _finish_fetch_job(job)
+    else:
+        _poll_fetch_job()
+
+def _finish_fetch_job(job):
+    if job['status'] == DONE:
+        st.session_state.fetch_job_id = None
+        st.session_state.bets_data = job['result']['bets_data']
+        st.session_state.analyzed_bets = job['result']['analyzed_bets']
+        st.rerun()
+    else:
+        st.error(f"Bet data fetch failed: {job['error']}")
+        if st.button("Dismiss", key="dismiss_fetch_error"):
+            st.session_state.fetch_job_id = None
+            st.rerun()
+
+@st.fragment(run_every=2)
+def _poll_fetch_job():
+    job = job_runner.get(st.session_state.get('fetch_job_id'))
+    if job is None or job['status'] in FINISHED_STATUSES:
+        # A full rerun shows the result and stops this fragment's polling
+        st.rerun()
+
+    st.progress(job['progress'], text=job['message'])
+    # Bets are usable as soon as they are scraped, before analysis finishes
+    if 'bets_data' in job['partial']:
+        bets_data = st.session_state.bets_data = job['partial']['bets_data']
+        scraped = bets_data['active'] + bets_data['historical']
+        st.caption(f"{len(bets_data['active'])} active and {len(bets_data['historical'])} settled bets scraped")
+        if scraped:
+            columns = [col for col in ('match_name', 'bet_type', 'odds', 'status') if any(col in bet for bet in scraped)]
+            st.dataframe(pd.DataFrame(scraped)[columns], hide_index=True)
+
+
+def _live_score(match_id):
+    live = live_state.current().get(match_id)
+    return f"{live['home_score']}-{live['away_score']} ({live['minute']})" if live else None
+
+
+def _inplay_home_draw_away(match_id):
+    inplay = inplay_pricer.markets_for(match_id)
+    if not inplay:
+        return None
+    result = inplay['MatchResult']
+    return f"{result['Win']} / {result['Draw']} / {result['Lose']}"
+
+
+BET_COLUMNS = ['match_name', 'bet_type', 'odds', 'stake', 'potential_win', 'status', 'time_left', 'actual_win', 'timestamp', 'date']
+BET_SORT_OPTIONS = {"Date": 'date', "Placed": 'timestamp', "Odds": 'odds', "Stake": 'stake', "Status": 'status', "Match": 'match_name'}
+
+
+def _bet_frame(bets):
+    return table_pager.frame(bets, BET_COLUMNS, date_columns=('timestamp', 'date'),
+                             numeric_columns=('odds', 'stake', 'potential_win', 'actual_win'))
+
+
+def _format_bets_page(page, columns, live=False):
+    """
+    Display rows for one page of bets: the listed columns that have data, dates
+    formatted and, for active bets, live score and in-play price of resolved fixtures
+    """
+    display = page[[col for col in columns if page[col].notna().any()]].copy()
+    if live:
+        # Link bets to fixtures so live scores and in-play prices can be shown
+        match_ids = [bet.get('match_id') for bet in fixture_resolver.resolve_bets(page[['match_name']].to_dict('records'))]
+        if any(match_ids):
+            position = display.columns.get_loc('timestamp') if 'timestamp' in display.columns else len(display.columns)
+            display.insert(position, 'live_score', [_live_score(match_id) if match_id else None for match_id in match_ids])
+            display.insert(position + 1, 'inplay_probability', [_inplay_home_draw_away(match_id) if match_id else None for match_id in match_ids])
+    for col in ('timestamp', 'date'):
+        if col in display.columns:
+            display[col] = format_datetime(display[col], missing=None)
+    return display
+
+
+def _show_bets_table(key, bets, columns, live=False, default_sort=None):
+    sort_options = {label: col for label, col in BET_SORT_OPTIONS.items() if col in columns}
+    show_paged_table(
+        key, bets, BET_COLUMNS, lambda page: _format_bets_page(page, columns, live=live),
+        date_columns=('timestamp', 'date'), numeric_columns=('odds', 'stake', 'potential_win', 'actual_win'),
+        search_columns=('match_name', 'bet_type', 'status'), sort_options=sort_options,
+        default_sort=default_sort or next(iter(sort_options.values()))
+    )
+
+
 def show_my_bets(active_bets, historical_bets):
     st.markdown("## 🎫 SpeedoVIP My Bets")
 
@@ -192,39 +323,33 @@ def show_my_bets(active_bets, historical_bets):
 
     with tab1:
         if active_bets:
-            df = pd.DataFrame(active_bets)
-            if not df.empty:
-                columns_to_show = [col for col in ['match_name', 'bet_type', 'odds', 'stake', 'potential_win', 'status', 'time_left', 'timestamp'] if col in df.columns]
-                df_display = df[columns_to_show]
-                df_display = df_display.copy()  # Avoid SettingWithCopyWarning
-                if 'timestamp' in df_display.columns:
-                    df_display['timestamp'] = pd.to_datetime(df_display['timestamp']).dt.strftime('%Y-%m-%d %H:%M')
-                st.dataframe(df_display, use_container_width=True)
-            else:
-                st.info("No data to display")
+            _show_bets_table("my_bets_active", active_bets,
+                             ['match_name', 'bet_type', 'odds', 'stake', 'potential_win', 'status', 'time_left', 'timestamp'],
+                             live=True, default_sort='timestamp')
         else:
             st.info("No active bets found")
 
+        if st.session_state.get('analyzed_bets'):
+            with st.expander("🤖 AI Analysis of Active Bets"):
+                st.dataframe(pd.DataFrame([{
+                    'match_name': item['bet_data'].get('match_name'),
+                    'win_probability': item['analysis'].get('win_probability'),
+                    'risk_level': item['analysis'].get('risk_level'),
+                    'ai_suggestion': item['analysis'].get('ai_suggestion')
+                } for item in st.session_state.analyzed_bets]), use_container_width=True)
+
     with tab2:
         if historical_bets:
-            df = pd.DataFrame(historical_bets)
-            if not df.empty:
-                columns_to_show = [col for col in ['match_name', 'bet_type', 'odds', 'stake', 'status', 'actual_win', 'date'] if col in df.columns]
-                df_display = df[columns_to_show]
-                df_display = df_display.copy()  # Avoid SettingWithCopyWarning
-                if 'date' in df_display.columns:
-                    df_display['date'] = pd.to_datetime(df_display['date']).dt.strftime('%Y-%m-%d %H:%M')
-                st.dataframe(df_display, use_container_width=True)
-            else:
-                st.info("No data to display")
+            _show_bets_table("my_bets_history", historical_bets,
+                             ['match_name', 'bet_type', 'odds', 'stake', 'status', 'actual_win', 'date'], default_sort='date')
         else:
             st.info("No historical data found")
 
 def show_ai_predictions(predictions):
     st.header("🤖 AI Predictions")
 
-    # Initialize predictor to get specialized sections
-    predictor = UpcomingEventPredictor()
+    # Process-wide predictor for the specialized sections
+    predictor = get_upcoming_predictor()
 
     # Create tabs for different sections
     tab1, tab2, tab3, tab4 = st.tabs(["General Probability", "2+ VIP Section", "5+ VIP Section", "Slip Format"])
@@ -449,6 +574,26 @@ def show_ai_predictions(predictions):
                     if slip['confidence'] >= 90:
                         st.success("💎 PREMIUM PICK")
 
+        st.markdown("### Accumulators")
+        objective = "probability"
+        # Expected value only differs from win probability against bookmaker prices
+        if len(predictor.odds_store):
+            objective = st.radio("Optimize for", ["probability", "ev"], horizontal=True,
+                                 format_func=lambda o: "Win probability" if o == "probability" else "Expected value")
+        accumulators = predictor.get_accumulator_slips(targets=(2.0, 5.0, 10.0), objective=objective)
+        acc_cols = st.columns(len(accumulators))
+        for col, (target, acc) in zip(acc_cols, accumulators.items()):
+            with col:
+                with st.container(border=True):
+                    st.write(f"**{target:g}+ Odds Accumulator**")
+                    if not acc:
+                        st.info("No combination reaches this odd")
+                        continue
+                    for leg in acc['legs']:
+                        st.write(f"- {leg['match']}: {leg['selection']} @ {leg['odds']}")
+                    st.write(f"Combined odd: {acc['combined_odd']}")
+                    st.write(f"Win probability: {acc['joint_probability']}%")
+
 def show_settings():
     st.markdown("## ⚙️ SpeedoVIP Settings")
 
@@ -532,6 +677,16 @@ def show_live_scores(live_scores):
                     # Status indicator
                     st.success(f"🔴 LIVE - {match_data['minute']}' minute")
 
+                    # In-play probabilities from the local model
+                    inplay = inplay_pricer.markets_for(match_id)
+                    if inplay:
+                        result = inplay['MatchResult']
+                        st.caption(
+                            f"In-play: {match_data['home_team']} {result['Win']}% | Draw {result['Draw']}% | "
+                            f"{match_data['away_team']} {result['Lose']}% | Over 2.5 {inplay['OverUnder']['2.5']['Over']}% | "
+                            f"BTTS {inplay['BTTS']['Yes']}%"
+                        )
+
                     # Last update time
                     try:
                         last_update = datetime.fromisoformat(match_data['last_update'].replace('Z', '+00:00'))
@@ -593,6 +748,49 @@ def show_live_scores(live_scores):
         st.info("No live matches to show statistics for.")
 
 
+HISTORY_COLUMNS = ['predicted_at', 'match_id', 'match', 'predicted_outcome', 'actual_outcome', 'confidence', 'vip_section', 'was_correct']
+
+
+def _format_history_page(page, show_section=True):
+    display = pd.DataFrame({
+        "Date": format_datetime(page['predicted_at']),
+        "Match": page['match_id'].fillna(page['match']).fillna("Unknown"),
+        "Predicted": page['predicted_outcome'],
+        "Actual": page['actual_outcome'],
+        "Confidence": page['confidence'].map(lambda value: f"{value:g}%"),
+        "VIP Section": page['vip_section'],
+        "Result": page['was_correct'].map(lambda correct: "✅ Correct" if correct else "❌ Wrong")
+    })
+    return display if show_section else display.drop(columns="VIP Section")
+
+
+def _show_history_section(key, history, frame, section=None):
+    """
+    Summary metrics and the paged table for all history or one VIP section
+    """
+    rows = frame if section is None else frame[frame['vip_section'] == section]
+    total = len(rows)
+    correct = int(rows['was_correct'].fillna(False).astype(bool).sum())
+    accuracy = (correct / total * 100) if total > 0 else 0
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Predictions", total)
+    with col2:
+        st.metric("Correct Predictions", correct)
+    with col3:
+        st.metric("Accuracy Rate", f"{accuracy:.1f}%")
+
+    show_paged_table(
+        key, history, HISTORY_COLUMNS,
+        lambda page: _format_history_page(page, show_section=section is None),
+        date_columns=('predicted_at',), numeric_columns=('confidence',),
+        search_columns=('match_id', 'predicted_outcome', 'actual_outcome'),
+        sort_options={"Date": 'predicted_at', "Confidence": 'confidence', "Match": 'match_id'},
+        default_sort='predicted_at', where={'vip_section': section} if section else None
+    )
+
+
 def show_prediction_history(history):
     st.markdown("## 📊 SpeedoVIP Prediction History")
 
@@ -600,136 +798,83 @@ def show_prediction_history(history):
         st.info("No prediction history available yet. Predictions will appear here after they are completed.")
         return
 
+    # Typed frame cached per history version; tables below page over it
+    frame = table_pager.frame(history, HISTORY_COLUMNS, ('predicted_at',), ('confidence',))
+    section_counts = frame['vip_section'].value_counts()
+
     # Tabs for overall history and VIP sections
     overall_tab, two_plus_tab, five_plus_tab = st.tabs([
         f"📈 Overall History ({len(history)})",
-        f"🎯 2+ VIP History ({len([h for h in history if h['vip_section'] == '2+'])})",
-        f"💎 5+ VIP History ({len([h for h in history if h['vip_section'] == '5+'])})"
+        f"🎯 2+ VIP History ({int(section_counts.get('2+', 0))})",
+        f"💎 5+ VIP History ({int(section_counts.get('5+', 0))})"
     ])
 
     with overall_tab:
         st.subheader("All Predictions - Last 30 Days")
-
-        # Summary metrics
-        total_predictions = len(history)
-        correct_predictions = len([h for h in history if h['was_correct']])
-        accuracy_rate = (correct_predictions / total_predictions * 100) if total_predictions > 0 else 0
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Predictions", total_predictions)
-        with col2:
-            st.metric("Correct Predictions", correct_predictions)
-        with col3:
-            st.metric("Accuracy Rate", f"{accuracy_rate:.1f}%")
-
-        # Display history table
-        history_data = []
-        for record in history:
-            # Parse the date
-            try:
-                pred_date = datetime.fromisoformat(record['predicted_at'].replace('Z', '+00:00'))
-                formatted_date = pred_date.strftime("%Y-%m-%d %H:%M")
-            except:
-                formatted_date = "Unknown"
-
-            history_data.append({
-                "Date": formatted_date,
-                "Match": record['match_id'] if 'match_id' in record else record.get('match', 'Unknown'),
-                "Predicted": record['predicted_outcome'],
-                "Actual": record['actual_outcome'],
-                "Confidence": f"{record['confidence']}%",
-                "VIP Section": record['vip_section'],
-                "Result": "✅ Correct" if record['was_correct'] else "❌ Wrong"
-            })
-
-        if history_data:
-            import pandas as pd
-            df = pd.DataFrame(history_data)
-            st.dataframe(df, use_container_width=True)
+        _show_history_section("history_all", history, frame)
 
     with two_plus_tab:
         st.subheader("2+ VIP Section - Best Performers")
-        two_plus_history = [h for h in history if h['vip_section'] == '2+']
-
-        if two_plus_history:
-            # Summary for 2+ section
-            total_2plus = len(two_plus_history)
-            correct_2plus = len([h for h in two_plus_history if h['was_correct']])
-            accuracy_2plus = (correct_2plus / total_2plus * 100) if total_2plus > 0 else 0
-
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Predictions", total_2plus)
-            with col2:
-                st.metric("Correct Predictions", correct_2plus)
-            with col3:
-                st.metric("Accuracy Rate", f"{accuracy_2plus:.1f}%")
-
-            # Show 2+ VIP history
-            two_plus_data = []
-            for record in two_plus_history:
-                try:
-                    pred_date = datetime.fromisoformat(record['predicted_at'].replace('Z', '+00:00'))
-                    formatted_date = pred_date.strftime("%Y-%m-%d %H:%M")
-                except:
-                    formatted_date = "Unknown"
-
-                two_plus_data.append({
-                    "Date": formatted_date,
-                    "Match": record['match_id'] if 'match_id' in record else record.get('match', 'Unknown'),
-                    "Predicted": record['predicted_outcome'],
-                    "Actual": record['actual_outcome'],
-                    "Confidence": f"{record['confidence']}%",
-                    "Result": "✅ Correct" if record['was_correct'] else "❌ Wrong"
-                })
-
-            if two_plus_data:
-                import pandas as pd
-                df_2plus = pd.DataFrame(two_plus_data)
-                st.dataframe(df_2plus, use_container_width=True)
+        if section_counts.get('2+', 0):
+            _show_history_section("history_2plus", history, frame, section='2+')
         else:
             st.info("No 2+ VIP predictions in history yet.")
 
     with five_plus_tab:
         st.subheader("5+ VIP Section - Premium Picks")
-        five_plus_history = [h for h in history if h['vip_section'] == '5+']
-
-        if five_plus_history:
-            # Summary for 5+ section
-            total_5plus = len(five_plus_history)
-            correct_5plus = len([h for h in five_plus_history if h['was_correct']])
-            accuracy_5plus = (correct_5plus / total_5plus * 100) if total_5plus > 0 else 0
-
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Predictions", total_5plus)
-            with col2:
-                st.metric("Correct Predictions", correct_5plus)
-            with col3:
-                st.metric("Accuracy Rate", f"{accuracy_5plus:.1f}%")
-
-            # Show 5+ VIP history
-            five_plus_data = []
-            for record in five_plus_history:
-                try:
-                    pred_date = datetime.fromisoformat(record['predicted_at'].replace('Z', '+00:00'))
-                    formatted_date = pred_date.strftime("%Y-%m-%d %H:%M")
-                except:
-                    formatted_date = "Unknown"
-
-                five_plus_data.append({
-                    "Date": formatted_date,
-                    "Match": record['match_id'] if 'match_id' in record else record.get('match', 'Unknown'),
-                    "Predicted": record['predicted_outcome'],
-                    "Actual": record['actual_outcome'],
-                    "Confidence": f"{record['confidence']}%",
-                    "Result": "✅ Correct" if record['was_correct'] else "❌ Wrong"
-                })
-
-            if five_plus_data:
-                import pandas as pd
-                df_5plus = pd.DataFrame(five_plus_data)
-                st.dataframe(df_5plus, use_container_width=True)
+        if section_counts.get('5+', 0):
+            _show_history_section("history_5plus", history, frame, section='5+')
         else:
-            st.info("No 5+ VIP predictions in history yet.")
\ No newline at end of file
+            st.info("No 5+ VIP predictions in history yet.")
+
+
+def show_diagnostics():
+    st.markdown("## 🩺 SpeedoVIP Diagnostics")
+    st.caption("Timings and counters recorded since this process started (enabled with SAFEBET_METRICS=1)")
+
+    rows = metrics.snapshot()
+    if not rows:
+        st.info("No metrics recorded yet. Refresh predictions or live scores to collect timings.")
+        return
+
+    timings = [r for r in rows if r['type'] == 'histogram']
+    counters = [r for r in rows if r['type'] == 'counter']
+
+    if timings:
+        st.subheader("⏱️ Timings")
+        timing_df = pd.DataFrame([{
+            "Metric": r['metric'],
+            "Labels": ", ".join(f"{k}={v}" for k, v in r['labels'].items()),
+            "Count": r['count'],
+            "Total (s)": r['sum'],
+            "Avg (s)": r['avg']
+        } for r in timings])
+        st.dataframe(timing_df, use_container_width=True)
+
+    if counters:
+        st.subheader("🔢 Counters")
+        counter_df = pd.DataFrame([{
+            "Metric": r['metric'],
+            "Labels": ", ".join(f"{k}={v}" for k, v in r['labels'].items()),
+            "Value": r['count']
+        } for r in counters])
+        st.dataframe(counter_df, use_container_width=True)
+
+    prometheus_text = metrics.render_prometheus()
+    with st.expander("Prometheus Export"):
+        st.code(prometheus_text, language="text")
+    st.download_button("Download metrics", prometheus_text, file_name="safebet_metrics.prom", mime="text/plain")
+
+
+def show_profile_report(report):
+    with st.expander(f"⏱️ Rerun Profile ({report['samples']} samples)", expanded=False):
+        st.markdown("**Sections (wall time)**")
+        sections_df = pd.DataFrame(
+            [{"Section": name, "Seconds": seconds} for name, seconds in report['sections'].items()]
+        ).sort_values("Seconds", ascending=False)
+        st.dataframe(sections_df, use_container_width=True)
+
+        st.markdown("**Top hotspots (own time)**")
+        st.dataframe(pd.DataFrame(report['hotspots']), use_container_width=True)
+
+        st.caption(f"Flame graph stacks: {report['folded_path']} | Summary: {report['summary_path']}")
@@ -0,0 +1,157 @@
+"""
+SafeBet Analyst - Table Paging
+Server-side paging, sorting and filtering for large bet and history tables:
+records become a typed frame once per data version, sort/filter orders are
+cached, and only the visible page is formatted and sent to the browser
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def data_version(records):
+    """
+    Cheap version of a list of record dicts: its length and the identity of its
+    first and last records (lists are replaced or appended to, not edited in place)
+    """
+    if not records:
+        return (0, None, None)
+    return (len(records), id(records[0]), id(records[-1]))
+
+
+class TablePager:
+    def __init__(self, max_frames=32, max_views=128):
+        self.max_frames = max_frames
+        self.max_views = max_views
+        self.frames = OrderedDict()
+        self.views = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _cached(self, cache, limit, key, build):
+        """
+        build() returns (value, objects to keep alive while cached); keys contain
+        ids, so the objects they refer to must not be freed and reused
+        """
+        with self.lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key][0]
+        value, keep_alive = build()
+        with self.lock:
+            cache[key] = (value, keep_alive)
+            cache.move_to_end(key)
+            while len(cache) > limit:
+                cache.popitem(last=False)
+        return value
+
+    def frame(self, records, columns, date_columns=(), numeric_columns=(), category_columns=()):
+        """
+        Typed DataFrame of records, built once per data version
+        Dates are parsed in one vectorized pass; unparseable values become NaT
+        """
+        key = (tuple(columns), tuple(date_columns), tuple(numeric_columns), tuple(category_columns), data_version(records))
+
+        def build():
+            df = pd.DataFrame.from_records(records, columns=list(columns)) if records else pd.DataFrame(columns=list(columns))
+            for column in date_columns:
+                df[column] = pd.to_datetime(df[column], errors="coerce", utc=True, format="mixed")
+            for column in numeric_columns:
+                df[column] = pd.to_numeric(df[column], errors="coerce")
+            for column in category_columns:
+                df[column] = df[column].astype("category")
+            return df, (records[:1], records[-1:])
+
+        return self._cached(self.frames, self.max_frames, key, build)
+
+    def view(self, df, query="", search_columns=(), sort_by=None, descending=False, where=None):
+        """
+        Row positions of df matching where ({column: value}) and the text query,
+        ordered by sort_by; cached per frame and view parameters
+        """
+        where = tuple(sorted((where or {}).items()))
+        key = (id(df), query.strip().lower(), tuple(search_columns), sort_by, descending, where)
+
+        def build():
+            mask = np.ones(len(df), dtype=bool)
+            for column, value in where:
+                mask &= (df[column] == value).to_numpy()
+            if key[1]:
+                text = np.zeros(len(df), dtype=bool)
+                for column in search_columns:
+                    text |= df[column].astype(str).str.lower().str.contains(key[1], regex=False, na=False).to_numpy()
+                mask &= text
+            positions = np.flatnonzero(mask)
+            if sort_by is not None and len(positions):
+                # The frame has a RangeIndex, so sorted labels are row positions; missing values go last
+                values = df[sort_by].iloc[positions]
+                try:
+                    ordered = values.sort_values(ascending=not descending, kind="stable", na_position="last")
+                except TypeError:
+                    ordered = values.astype(str).sort_values(ascending=not descending, kind="stable")
+                positions = ordered.index.to_numpy()
+            return positions, df
+
+        return self._cached(self.views, self.max_views, key, build)
+
+    @staticmethod
+    def page(df, positions, page_number, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Rows of one page (1-based) as a small DataFrame
+        """
+        start = (page_number - 1) * page_size
+        return df.iloc[positions[start:start + page_size]]
+
+
+# Global instance; frames are shared by sessions showing the same records
+table_pager = TablePager()
+
+
+def show_paged_table(key, records, columns, format_page, date_columns=(), numeric_columns=(),
+                     category_columns=(), search_columns=(), sort_options=None, default_sort=None,
+                     descending=True, where=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Render filter/sort/page controls and the current page of records
+    format_page(page_df) turns the typed page rows into the displayed DataFrame
+    sort_options maps labels shown in the sort box to frame columns
+    """
+    df = table_pager.frame(records, columns, date_columns, numeric_columns, category_columns)
+    sort_options = sort_options or {column: column for column in columns}
+    labels = list(sort_options)
+
+    filter_col, sort_col, order_col, page_col = st.columns([3, 2, 1, 1])
+    with filter_col:
+        query = st.text_input("Filter", key=f"{key}_filter", placeholder="Search...") if search_columns else ""
+    with sort_col:
+        default_label = next((label for label, column in sort_options.items() if column == default_sort), labels[0])
+        sort_label = st.selectbox("Sort by", labels, index=labels.index(default_label), key=f"{key}_sort")
+    with order_col:
+        descending = st.checkbox("Descending", value=descending, key=f"{key}_desc")
+
+    positions = table_pager.view(df, query, search_columns, sort_options[sort_label], descending, where)
+    n_pages = max(1, -(-len(positions) // page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    with page_col:
+        page_number = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    if not len(positions):
+        st.info("No matching rows")
+        return
+    start = (page_number - 1) * page_size
+    st.dataframe(format_page(table_pager.page(df, positions, page_number, page_size)), use_container_width=True, hide_index=True)
+    st.caption(f"Rows {start + 1}-{min(start + page_size, len(positions))} of {len(positions)}")
+
+
+def format_datetime(series, fmt="%Y-%m-%d %H:%M", missing="Unknown"):
+    """
+    Format a parsed datetime column of a page, showing missing for NaT
+    """
+    formatted = series.dt.strftime(fmt)
+    return formatted if missing is None else formatted.fillna(missing)
@@ -0,0 +1,374 @@
+"""
+SafeBet Analyst - Columnar Store
+Typed Arrow datasets of scraped bets, predictions with their market
+probabilities and settled prediction history, partitioned by day (and account
+for bets) so date-range reads only open the files of the days asked for
+"""
+
+import os
+import uuid
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, date, timezone
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from pyarrow import fs
+from utils.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, only the in-process lock applies
+    fcntl = None
+
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+BET_SCHEMA = pa.schema([
+    ("account", pa.string()),
+    ("kind", pa.string()),
+    ("match_name", pa.string()),
+    ("bet_type", pa.string()),
+    ("odds", pa.float64()),
+    ("stake", pa.float64()),
+    ("potential_win", pa.float64()),
+    ("actual_win", pa.float64()),
+    ("status", pa.string()),
+    ("time_left", pa.string()),
+    ("placed_at", TIMESTAMP),
+    ("scraped_at", TIMESTAMP),
+])
+
+PREDICTION_SCHEMA = pa.schema([
+    ("match_id", pa.string()),
+    ("match", pa.string()),
+    ("predicted_outcome", pa.string()),
+    ("confidence", pa.float64()),
+    ("home_win", pa.float64()),
+    ("draw", pa.float64()),
+    ("away_win", pa.float64()),
+    ("expected_home_goals", pa.float64()),
+    ("expected_away_goals", pa.float64()),
+    ("match_date", TIMESTAMP),
+    ("predicted_at", TIMESTAMP),
+])
+
+MARKET_SCHEMA = pa.schema([
+    ("match_id", pa.string()),
+    ("market", pa.string()),
+    ("selection", pa.string()),
+    ("probability", pa.float64()),
+    ("predicted_at", TIMESTAMP),
+])
+
+MARKET_RESULT = pa.struct([
+    ("market", pa.string()),
+    ("selection", pa.string()),
+    ("probability", pa.float64()),
+    ("won", pa.bool_()),
+])
+
+HISTORY_SCHEMA = pa.schema([
+    ("prediction_id", pa.string()),
+    ("match_id", pa.string()),
+    ("match", pa.string()),
+    ("predicted_outcome", pa.string()),
+    ("actual_outcome", pa.string()),
+    ("confidence", pa.float64()),
+    ("vip_section", pa.string()),
+    ("market", pa.string()),
+    ("probability", pa.float64()),
+    ("was_correct", pa.bool_()),
+    ("actual_score", pa.string()),
+    ("market_results", pa.list_(MARKET_RESULT)),
+    ("predicted_at", TIMESTAMP),
+    ("settled_at", TIMESTAMP),
+])
+
+# Dataset name: (row schema, timestamp column giving the day partition, partition columns)
+DATASETS = {
+    "bets": (BET_SCHEMA, "placed_at", ("date", "account")),
+    "predictions": (PREDICTION_SCHEMA, "predicted_at", ("date",)),
+    "markets": (MARKET_SCHEMA, "predicted_at", ("date",)),
+    "history": (HISTORY_SCHEMA, "predicted_at", ("date",)),
+}
+
+FILE_FORMATS = {"arrow": ("ipc", "arrow"), "parquet": ("parquet", "parquet")}
+
+
+def _timestamp(value):
+    """
+    Aware UTC datetime from a datetime, date or ISO string; naive times are taken as UTC
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _number(value):
+    if isinstance(value, str):
+        value = value.replace(",", "").strip()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _day(value):
+    """
+    Partition value (YYYY-MM-DD) of a date, datetime or ISO string
+    """
+    return value.isoformat()[:10] if isinstance(value, (date, datetime)) else str(value)[:10]
+
+
+def bet_rows(bets_data, account, scraped_at=None):
+    """
+    Rows of scraped {'active': [...], 'historical': [...]} bets; bets without
+    a parseable placement time are dated by the scrape
+    """
+    scraped_at = _timestamp(scraped_at or datetime.now(timezone.utc))
+    rows = []
+    for kind in ("active", "historical"):
+        for bet in bets_data.get(kind, []):
+            rows.append({
+                "account": account,
+                "kind": kind,
+                "match_name": bet.get("match_name"),
+                "bet_type": bet.get("bet_type"),
+                "odds": _number(bet.get("odds")),
+                "stake": _number(bet.get("stake")),
+                "potential_win": _number(bet.get("potential_win")),
+                "actual_win": _number(bet.get("actual_win")),
+                "status": bet.get("status"),
+                "time_left": bet.get("time_left"),
+                "placed_at": _timestamp(bet.get("timestamp") or bet.get("date")) or scraped_at,
+                "scraped_at": scraped_at,
+            })
+    return rows
+
+
+def prediction_rows(predictions, predicted_at=None):
+    """
+    (prediction rows, market probability rows) of upcoming-match predictions;
+    nested markets such as Over/Under lines become "OverUnder 2.5" rows
+    """
+    predicted_at = _timestamp(predicted_at or datetime.now(timezone.utc))
+    rows, markets = [], []
+    for pred in predictions:
+        probabilities = pred.get("probabilities", {})
+        expected_goals = pred.get("expected_goals", {})
+        rows.append({
+            "match_id": pred.get("match_id"),
+            "match": pred.get("match"),
+            "predicted_outcome": pred.get("predicted_outcome"),
+            "confidence": _number(pred.get("confidence")),
+            "home_win": _number(probabilities.get("home_win")),
+            "draw": _number(probabilities.get("draw")),
+            "away_win": _number(probabilities.get("away_win")),
+            "expected_home_goals": _number(expected_goals.get("home")),
+            "expected_away_goals": _number(expected_goals.get("away")),
+            "match_date": _timestamp(pred.get("match_date")),
+            "predicted_at": predicted_at,
+        })
+        for market, selections in pred.get("betting_markets", {}).items():
+            if not isinstance(selections, dict):
+                continue
+            for selection, probability in selections.items():
+                if isinstance(probability, dict):
+                    markets += [{"match_id": pred.get("match_id"), "market": f"{market} {selection}", "selection": side,
+                                 "probability": _number(p), "predicted_at": predicted_at}
+                                for side, p in probability.items()]
+                else:
+                    markets.append({"match_id": pred.get("match_id"), "market": market, "selection": selection,
+                                    "probability": _number(probability), "predicted_at": predicted_at})
+    return rows, markets
+
+
+def history_rows(records):
+    """
+    Rows of settled prediction history records, with each settled market as a
+    nested {market, selection, probability, won} entry
+    """
+    return [{
+        "prediction_id": str(record.get("prediction_id")),
+        "match_id": record.get("match_id"),
+        "match": record.get("match"),
+        "predicted_outcome": record.get("predicted_outcome"),
+        "actual_outcome": record.get("actual_outcome"),
+        "confidence": _number(record.get("confidence")),
+        "vip_section": record.get("vip_section"),
+        "market": record.get("market"),
+        "probability": _number(record.get("probability")),
+        "was_correct": record.get("was_correct"),
+        "actual_score": record.get("actual_score"),
+        "market_results": [{
+            "market": result.get("market"),
+            "selection": result.get("selection"),
+            "probability": _number(result.get("probability")),
+            "won": result.get("won"),
+        } for result in record.get("market_results", [])] or None,
+        "predicted_at": _timestamp(record.get("predicted_at")) or datetime.now(timezone.utc),
+        "settled_at": _timestamp(record.get("settled_at")),
+    } for record in records]
+
+
+class ColumnarStore:
+    def __init__(self, root, file_format="arrow", max_files=16):
+        """
+        file_format "arrow" writes uncompressed Arrow IPC files that reads memory-map
+        without copying; "parquet" writes smaller compressed files
+        Partitions with more than max_files files are merged into one after a write
+        """
+        self.root = root
+        self.format, self.extension = FILE_FORMATS[file_format]
+        self.max_files = max_files
+        self.filesystem = fs.LocalFileSystem(use_mmap=True)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self, name, shared=False):
+        """
+        Lock a dataset across the processes sharing the data directory: writes
+        and compaction hold it exclusively, reads shared, so a reader never sees
+        a merged file next to the files it replaces
+        """
+        with nullcontext() if shared else self.lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, f".{name}.lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _partitioning(self, name):
+        return ds.partitioning(pa.schema([(column, pa.string()) for column in DATASETS[name][2]]), flavor="hive")
+
+    def _file_schema(self, name):
+        """
+        Columns stored in the files; partition columns live in the directory names
+        """
+        schema, _, partitions = DATASETS[name]
+        return pa.schema([field for field in schema if field.name not in partitions])
+
+    def _read_schema(self, name):
+        """
+        File columns followed by the partition columns, as datasets are read
+        """
+        schema = self._file_schema(name)
+        for column in DATASETS[name][2]:
+            schema = schema.append(pa.field(column, pa.string()))
+        return schema
+
+    def _dataset(self, name):
+        directory = os.path.join(self.root, name)
+        if not os.path.isdir(directory):
+            return None
+        return ds.dataset(directory, schema=self._read_schema(name), format=self.format, partitioning=self._partitioning(name),
+                          filesystem=self.filesystem)
+
+    def write(self, name, rows):
+        """
+        Append rows to a dataset as new files in their day partitions; returns rows written
+        """
+        if not rows:
+            return 0
+        schema, time_column, _ = DATASETS[name]
+        try:
+            table = pa.Table.from_pylist(rows, schema=schema)
+            table = table.append_column("date", pc.strftime(table[time_column], format="%Y-%m-%d"))
+            directory = os.path.join(self.root, name)
+            written = []
+            with self._locked(name), metrics.time("columnar_write_seconds", "Time to write rows to the columnar store", dataset=name):
+                ds.write_dataset(
+                    table, directory, format=self.format, partitioning=self._partitioning(name),
+                    basename_template=f"part-{uuid.uuid4().hex}-{{i}}.{self.extension}",
+                    existing_data_behavior="overwrite_or_ignore",
+                    file_visitor=lambda written_file: written.append(os.path.dirname(written_file.path))
+                )
+                for partition in set(written):
+                    self._compact_partition(name, partition)
+            metrics.inc("columnar_rows_written_total", len(rows), "Rows written to the columnar store", dataset=name)
+            return len(rows)
+        except Exception as e:
+            print(f"Error writing {name} to columnar store: {str(e)}")
+            return 0
+
+    def _compact_partition(self, name, partition, force=False):
+        """
+        Merge a partition's files into one when it has too many; caller holds the dataset lock
+        """
+        paths = sorted(os.path.join(partition, file) for file in os.listdir(partition)
+                       if file.endswith(f".{self.extension}") and not file.startswith((".", "_")))
+        if len(paths) < 2 or (len(paths) <= self.max_files and not force):
+            return False
+        table = ds.dataset(paths, schema=self._file_schema(name), format=self.format).to_table()
+        tmp_path = os.path.join(partition, f".compact-{uuid.uuid4().hex}.{self.extension}")
+        if self.format == "ipc":
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+        else:
+            pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(partition, f"part-{uuid.uuid4().hex}-0.{self.extension}"))
+        for path in paths:
+            os.remove(path)
+        return True
+
+    def compact(self, name):
+        """
+        Merge every multi-file partition of a dataset into one file; returns partitions merged
+        """
+        directory = os.path.join(self.root, name)
+        merged = 0
+        with self._locked(name):
+            for parent, _, files in os.walk(directory):
+                if any(file.endswith(f".{self.extension}") for file in files):
+                    merged += self._compact_partition(name, parent, force=True)
+        return merged
+
+    def read(self, name, start=None, end=None, columns=None, **equals):
+        """
+        DataFrame of a dataset's rows from day start to day end (inclusive), optionally
+        only some columns and rows whose columns equal the given values
+        The day bounds prune whole partitions before any file is opened
+        """
+        condition = None
+        bounds = [ds.field("date") >= _day(start)] if start is not None else []
+        bounds += [ds.field("date") <= _day(end)] if end is not None else []
+        for expression in bounds + [ds.field(column) == value for column, value in equals.items()]:
+            condition = expression if condition is None else condition & expression
+
+        with self._locked(name, shared=True):
+            dataset = self._dataset(name)
+            if dataset is None:
+                schema = self._read_schema(name)
+                return schema.empty_table().select(columns or schema.names).to_pandas()
+            with metrics.time("columnar_read_seconds", "Time to read rows from the columnar store", dataset=name):
+                table = dataset.to_table(columns=columns, filter=condition)
+        return table.to_pandas(split_blocks=True)
+
+    def write_bets(self, bets_data, account="default", scraped_at=None):
+        return self.write("bets", bet_rows(bets_data, account, scraped_at))
+
+    def write_predictions(self, predictions, predicted_at=None):
+        rows, markets = prediction_rows(predictions, predicted_at)
+        return self.write("predictions", rows) + self.write("markets", markets)
+
+    def write_history(self, records):
+        return self.write("history", history_rows(records))
+
+
+# Global instance; set SAFEBET_DATA_DIR to keep bets, predictions and history as columnar datasets
+data_dir = os.getenv("SAFEBET_DATA_DIR")
+columnar_store = ColumnarStore(data_dir, file_format=os.getenv("SAFEBET_DATA_FORMAT", "arrow")) if data_dir else None
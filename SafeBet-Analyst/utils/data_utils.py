@@ -7,6 +7,7 @@ import json
 import requests
 from datetime import datetime, timedelta
 import random
+import numpy as np
 
 
 def load_mock_match_data():
@@ -212,21 +213,11 @@ def calculate_momentum_factor(live_data):
 def check_player_availability(team_lineup, key_players):
     """
     Check if key players are in the starting lineup
+    Names are compared normalized, so accents, "Jr." and surname-only names match
     """
-    available_players = []
-    missing_players = []
-    
-    for player in key_players:
-        if player in team_lineup:
-            available_players.append(player)
-        else:
-            missing_players.append(player)
-    
-    return {
-        "available": available_players,
-        "missing": missing_players,
-        "availability_rate": len(available_players) / len(key_players) if key_players else 0
-    }
+    from utils.lineup_index import lineup_keys, availability
+
+    return availability(lineup_keys(team_lineup), key_players)
 
 
 def format_odds(probability):
@@ -247,4 +238,15 @@ def calculate_expected_value(odds, probability):
     
     probability_decimal = probability / 100
     ev = (odds * probability_decimal) - (1 - probability_decimal)
-    return round(ev, 3)
\ No newline at end of file
+    return round(ev, 3)
+
+
+def calculate_expected_value_array(odds, probability):
+    """
+    Vectorized calculate_expected_value over arrays of odds and probabilities
+    """
+    odds = np.asarray(odds, dtype=float)
+    probability_decimal = np.asarray(probability, dtype=float) / 100
+    ev = (odds * probability_decimal) - (1 - probability_decimal)
+    valid = (odds != 0) & (probability_decimal != 0) & ~np.isnan(odds) & ~np.isnan(probability_decimal)
+    return np.round(np.where(valid, ev, 0.0), 3)
@@ -0,0 +1,207 @@
+"""
+SafeBet Analyst - Entity Resolution
+Resolves the free-text match names of scraped bets ("Team A vs Team B") to
+fixture and live match ids through a normalized team-name, alias and trigram index
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from utils.data_utils import load_mock_match_data
+from utils.live_score_updater import live_updater
+
+
+# Tokens that carry no identity ("Arsenal FC" == "Arsenal")
+STOP_TOKENS = {"fc", "cf", "afc", "sc", "ac", "club", "the", "de", "calcio", "sv", "ssc"}
+# Common short forms, keyed and valued by normalized names
+ALIASES = {
+    "man utd": "manchester united",
+    "man united": "manchester united",
+    "man city": "manchester city",
+    "spurs": "tottenham",
+    "tottenham hotspur": "tottenham",
+    "paris saint germain": "psg",
+    "paris sg": "psg",
+    "barca": "barcelona",
+    "bayern": "bayern munich",
+    "bayern munchen": "bayern munich",
+    "inter": "inter milan",
+    "internazionale": "inter milan",
+    "atletico": "atletico madrid",
+    "atleti": "atletico madrid",
+    "bvb": "dortmund",
+    "borussia dortmund": "dortmund",
+    "juve": "juventus",
+    "real": "real madrid"
+}
+MATCH_SEPARATOR = re.compile(r"\s+(?:vs\.?|v\.?|versus|-|–|@)\s+", re.IGNORECASE)
+MIN_CONFIDENCE = 0.5
+# Confidence multiplier when the bet names the teams in the opposite order
+SWAPPED_PENALTY = 0.9
+
+
+def normalize_team_name(name):
+    """
+    Lowercase, strip accents and punctuation, drop filler tokens and apply aliases
+    """
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").lower().replace(".", "")
+    tokens = [token for token in re.sub(r"[^a-z0-9]+", " ", text).split() if token not in STOP_TOKENS]
+    normalized = " ".join(tokens)
+    return ALIASES.get(normalized, normalized)
+
+
+def split_match_name(match_name):
+    """
+    "Team A vs Team B" -> ("Team A", "Team B"); None when there are not two sides
+    """
+    parts = MATCH_SEPARATOR.split(str(match_name or "").strip(), maxsplit=1)
+    if len(parts) != 2 or not parts[0] or not parts[1]:
+        return None
+    return parts[0], parts[1]
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TeamNameIndex:
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.trigrams = []
+        self.trigram_index = defaultdict(list)
+        self.token_index = defaultdict(set)
+
+    def add(self, name):
+        """
+        Index a team name; returns its normalized key
+        """
+        key = normalize_team_name(name)
+        if key in self.ids:
+            return key
+        team_id = len(self.names)
+        self.ids[key] = team_id
+        self.names.append(key)
+        grams = _trigrams(key)
+        self.trigrams.append(grams)
+        for gram in grams:
+            self.trigram_index[gram].append(team_id)
+        for token in key.split():
+            self.token_index[token].add(team_id)
+        return key
+
+    def lookup(self, name):
+        """
+        Best matching indexed team as (key, score 0-1), or (None, 0.0)
+        """
+        key = normalize_team_name(name)
+        if key in self.ids:
+            return key, 1.0
+        if not key:
+            return None, 0.0
+
+        # Teams containing every known query token, e.g. "Bayern" -> "bayern munich"
+        tokens = key.split()
+        known = [token for token in tokens if token in self.token_index]
+        candidates = set.intersection(*(self.token_index[token] for token in known)) if known else set()
+        if len(candidates) == 1 and len(known) == len(tokens):
+            return self.names[next(iter(candidates))], 0.9
+
+        # Trigram Jaccard similarity, over the token candidates when there are any
+        grams = _trigrams(key)
+        if candidates:
+            scores = {team_id: len(grams & self.trigrams[team_id]) for team_id in candidates}
+        else:
+            scores = defaultdict(int)
+            for gram in grams:
+                for team_id in self.trigram_index.get(gram, ()):
+                    scores[team_id] += 1
+        if not scores:
+            return None, 0.0
+        best_id, best_score = None, 0.0
+        for team_id, count in scores.items():
+            score = count / (len(grams) + len(self.trigrams[team_id]) - count)
+            if score > best_score:
+                best_id, best_score = team_id, score
+        if best_id is None:
+            return None, 0.0
+        return self.names[best_id], best_score
+
+
+class FixtureResolver:
+    def __init__(self, fixtures=None):
+        self.teams = TeamNameIndex()
+        self.fixtures = {}
+        self.cache = {}
+        self.lock = threading.Lock()
+        for fixture in fixtures or []:
+            self.add_fixture(fixture['match_id'], fixture['home_team'], fixture['away_team'])
+
+    def add_fixture(self, match_id, home_team, away_team):
+        """
+        Index a fixture; a newer fixture for the same pairing replaces the older one
+        """
+        with self.lock:
+            pair = (self.teams.add(home_team), self.teams.add(away_team))
+            if self.fixtures.get(pair) != match_id:
+                self.fixtures[pair] = match_id
+                # New fixtures can turn earlier misses into matches
+                self.cache = {name: hit for name, hit in self.cache.items() if hit is not None}
+
+    def resolve(self, match_name):
+        """
+        Resolve a bet's match name to {"match_id", "home_team", "away_team", "confidence"}
+        Results (including misses) are cached per match name; None below MIN_CONFIDENCE
+        """
+        if match_name in self.cache:
+            cached = self.cache[match_name]
+            return dict(cached) if cached else None
+
+        resolution = self._resolve_uncached(match_name)
+        with self.lock:
+            self.cache[match_name] = resolution
+        return dict(resolution) if resolution else None
+
+    def _resolve_uncached(self, match_name):
+        sides = split_match_name(match_name)
+        if sides is None:
+            return None
+        (home, home_score), (away, away_score) = self.teams.lookup(sides[0]), self.teams.lookup(sides[1])
+        if home is None or away is None:
+            return None
+
+        confidence = min(home_score, away_score)
+        match_id = self.fixtures.get((home, away))
+        if match_id is None:
+            match_id = self.fixtures.get((away, home))
+            home, away = away, home
+            confidence *= SWAPPED_PENALTY
+        if match_id is None or confidence < MIN_CONFIDENCE:
+            return None
+        return {"match_id": match_id, "home_team": home, "away_team": away, "confidence": round(confidence, 3)}
+
+    def resolve_bets(self, bets):
+        """
+        Annotate bets with match_id and resolution_confidence where they resolve
+        """
+        resolved = []
+        for bet in bets:
+            resolution = self.resolve(bet.get('match_name'))
+            if resolution:
+                bet = dict(bet, match_id=resolution['match_id'], resolution_confidence=resolution['confidence'])
+            resolved.append(bet)
+        return resolved
+
+    def on_update(self, live_matches):
+        """
+        LiveScoreUpdater update listener: index live match ids as they appear
+        """
+        for match_id, match in live_matches.items():
+            self.add_fixture(match_id, match['home_team'], match['away_team'])
+
+
+# Global instance over the known fixtures, extended by the app's live score updater
+fixture_resolver = FixtureResolver(load_mock_match_data())
+live_updater.add_update_listener(fixture_resolver.on_update)
@@ -0,0 +1,156 @@
+"""
+SafeBet Analyst - Job Runner
+Background worker pool for long scrape and analysis workflows, so Streamlit
+reruns only enqueue work and poll its progress instead of blocking on it
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import metrics
+
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED_STATUSES = (DONE, FAILED)
+
+
+class Job:
+    """
+    One unit of background work; the job function reports progress and
+    partial results through it while it runs
+    """
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.partial = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.lock = threading.Lock()
+
+    def report(self, progress=None, message=None, **partial):
+        """
+        Update progress (0-1), the status message and any partial results
+        """
+        with self.lock:
+            if progress is not None:
+                self.progress = min(1.0, max(self.progress, progress))
+            if message is not None:
+                self.message = message
+            self.partial.update(partial)
+
+    def snapshot(self):
+        """
+        Plain-dict copy of the job's state, safe to read from any thread
+        """
+        with self.lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "progress": self.progress,
+                "message": self.message,
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+
+class JobRunner:
+    def __init__(self, max_workers=2, keep_finished=50):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="safebet-job")
+        self.keep_finished = keep_finished
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, name, func, *args, unique=False, **kwargs):
+        """
+        Queue func(job, *args, **kwargs) and return the job id; coroutine functions
+        run on their own event loop in the worker thread
+        With unique=True, an unfinished job of the same name is reused instead
+        """
+        with self.lock:
+            if unique:
+                for job in self.jobs.values():
+                    if job.name == name and job.status not in FINISHED_STATUSES:
+                        return job.id
+            job = Job(name)
+            self.jobs[job.id] = job
+            self._prune()
+        metrics.inc("jobs_submitted_total", 1, "Background jobs queued", job=name)
+        self.executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def _run(self, job, func, args, kwargs):
+        with job.lock:
+            job.status, job.message, job.started_at = RUNNING, "Running", time.time()
+        try:
+            with metrics.time("job_seconds", "Background job run time", job=job.name):
+                if inspect.iscoroutinefunction(func):
+                    result = asyncio.run(func(job, *args, **kwargs))
+                else:
+                    result = func(job, *args, **kwargs)
+            with job.lock:
+                job.status, job.result, job.progress, job.message = DONE, result, 1.0, "Done"
+        except Exception as e:
+            print(f"Error in background job {job.name} ({job.id}): {str(e)}")
+            with job.lock:
+                job.status, job.error, job.message = FAILED, str(e), f"Failed: {str(e)}"
+        finally:
+            with job.lock:
+                job.finished_at = time.time()
+            metrics.inc("jobs_finished_total", 1, "Background jobs finished", job=job.name, status=job.status)
+
+    def _prune(self):
+        """
+        Drop the oldest finished jobs beyond keep_finished; caller holds the lock
+        """
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        """
+        Snapshot of a job, or None for unknown (or pruned) ids
+        """
+        job = self.jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def list_jobs(self, name=None):
+        """
+        Snapshots of known jobs, oldest first
+        """
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [job.snapshot() for job in jobs if name is None or job.name == name]
+
+    def wait(self, job_id, timeout=None, poll_interval=0.05):
+        """
+        Block until a job finishes (for scripts and tests); returns its snapshot
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self.get(job_id)
+            if snapshot is None or snapshot["status"] in FINISHED_STATUSES:
+                return snapshot
+            if deadline is not None and time.monotonic() >= deadline:
+                return snapshot
+            time.sleep(poll_interval)
+
+
+# Global instance shared by all sessions of the app
+job_runner = JobRunner(max_workers=int(os.getenv("SAFEBET_JOB_WORKERS", "2")))
@@ -0,0 +1,152 @@
+"""
+SafeBet Analyst - Lineup Index
+Normalized player-name sets per match and team, so key player availability is a
+set lookup that tolerates accents, abbreviations and surname-only names
+"""
+
+import re
+import threading
+import unicodedata
+from utils.live_score_updater import live_updater
+
+
+# Name suffixes written in several ways ("Vinicius Jr." == "Vinícius Júnior")
+TOKEN_ALIASES = {"jr": "junior", "jnr": "junior", "snr": "senior", "sr": "senior"}
+# Players commonly listed under a nickname, keyed and valued by normalized names
+PLAYER_ALIASES = {
+    "vini junior": "vinicius junior",
+    "vini": "vinicius junior"
+}
+SUFFIX_TOKENS = set(TOKEN_ALIASES.values())
+
+
+def normalize_player_name(name):
+    """
+    Lowercase, strip accents and punctuation and expand suffix abbreviations
+    """
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").lower().replace(".", "")
+    tokens = [TOKEN_ALIASES.get(token, token) for token in re.sub(r"[^a-z0-9]+", " ", text).split()]
+    normalized = " ".join(tokens)
+    return PLAYER_ALIASES.get(normalized, normalized)
+
+
+def player_keys(name):
+    """
+    Keys a lineup entry can be found under: the full name, every surname suffix
+    ("van dijk" for "Virgil van Dijk") and initial plus surname ("v van dijk")
+    """
+    tokens = normalize_player_name(name).split()
+    # A bare suffix ("junior") would match too many players
+    keys = {" ".join(tokens[i:]) for i in range(len(tokens)) if not (i == len(tokens) - 1 and tokens[i] in SUFFIX_TOKENS)}
+    if len(tokens) > 1:
+        keys.add(f"{tokens[0][0]} {' '.join(tokens[1:])}")
+    return keys
+
+
+def lineup_keys(players):
+    """
+    Set of all lookup keys for a lineup
+    """
+    keys = set()
+    for player in players:
+        keys |= player_keys(player)
+    return frozenset(keys)
+
+
+def availability(keys, key_players):
+    """
+    Split key players into available/missing against a lineup key set
+    """
+    available, missing = [], []
+    for player in key_players:
+        (available if normalize_player_name(player) in keys else missing).append(player)
+    return {
+        "available": available,
+        "missing": missing,
+        "availability_rate": len(available) / len(key_players) if key_players else 0
+    }
+
+
+class LineupIndex:
+    def __init__(self):
+        self.lineups = {}
+        self.raw_lineups = {}
+        # (match_id, side) -> {key players tuple: availability}
+        self.cache = {}
+        self.lock = threading.Lock()
+
+    def set_lineup(self, match_id, side, players):
+        """
+        Store a team's lineup; availability cached for that team is dropped if it changed
+        """
+        players = tuple(players)
+        if self.raw_lineups.get((match_id, side)) == players:
+            return
+        keys = lineup_keys(players)
+        with self.lock:
+            self.raw_lineups[(match_id, side)] = players
+            if self.lineups.get((match_id, side)) == keys:
+                return
+            self.lineups[(match_id, side)] = keys
+            self.cache.pop((match_id, side), None)
+
+    def has_lineups(self, match_id):
+        return (match_id, "home") in self.lineups and (match_id, "away") in self.lineups
+
+    def team_availability(self, match_id, side, key_players):
+        """
+        Availability of key players for one team, cached until the lineup changes
+        None when no lineup is known
+        """
+        keys = self.lineups.get((match_id, side))
+        if keys is None:
+            return None
+        team_cache = self.cache.setdefault((match_id, side), {})
+        result = team_cache.get(tuple(key_players))
+        if result is None:
+            result = availability(keys, key_players)
+            team_cache[tuple(key_players)] = result
+        return result
+
+    def match_availability(self, match_data):
+        """
+        Home/away availability for a fixture, indexing match_data['lineups'] if present
+        None until both lineups are known
+        """
+        match_id = match_data.get('match_id')
+        lineups = match_data.get('lineups')
+        if lineups and match_id is not None:
+            for side in ("home", "away"):
+                self.set_lineup(match_id, side, lineups[side])
+        if match_id is None or not self.has_lineups(match_id):
+            return None
+        return {
+            "home": self.team_availability(match_id, "home", match_data.get('key_players_home', [])),
+            "away": self.team_availability(match_id, "away", match_data.get('key_players_away', []))
+        }
+
+    def batch_availability(self, fixtures):
+        """
+        Availability for every fixture with known lineups: match_id -> {"home", "away"}
+        """
+        results = {}
+        for fixture in fixtures:
+            result = self.match_availability(fixture)
+            if result is not None:
+                results[fixture['match_id']] = result
+        return results
+
+    def on_update(self, live_matches):
+        """
+        LiveScoreUpdater update listener: index lineups carried by the live feed
+        """
+        for match_id, match in live_matches.items():
+            lineups = match.get('lineups')
+            if lineups:
+                for side in ("home", "away"):
+                    self.set_lineup(match_id, side, lineups[side])
+
+
+# Global instance fed by the app's live score updater
+lineup_index = LineupIndex()
+live_updater.add_update_listener(lineup_index.on_update)
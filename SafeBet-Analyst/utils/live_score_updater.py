@@ -3,22 +3,41 @@ Live Football Data Integration Module
 Handles live scores and game states for SpeedoVIP
 """
 
+import os
 import requests
 import time
 from datetime import datetime, timedelta
 import json
-from threading import Thread
+from threading import Thread, Lock
 import schedule
 from utils.data_utils import load_mock_match_data
+from utils.metrics import metrics
+from ai_analyzer.calibration import calibrator
+from utils.team_ratings import team_ratings
+from utils.shared_state import SharedState
+from utils.snapshots import snapshot_manager
+from utils.columnar_store import columnar_store
 
 
 class LiveScoreUpdater:
-    def __init__(self):
+    def __init__(self, shared_state=None):
         self.live_matches = {}
         self.is_running = False
         self.update_interval = 30  # seconds
+        # Snapshotted live matches older than this many update intervals are not restored
+        self.restore_intervals = 4
         self.mock_data = load_mock_match_data()
-        
+        self.status_listeners = []
+        self.update_listeners = []
+        self.history_listeners = []
+        self.prediction_history = []
+        self.history_lock = Lock()
+        # Optional SharedState: one leader process fetches, the others follow
+        self.shared_state = shared_state
+        self.shared_version = 0
+        self.history_seq = 0
+        self.sync_lock = Lock()
+
     def get_live_scores_from_api(self):
         """
         Get live scores from a football API
@@ -91,14 +110,94 @@ class LiveScoreUpdater:
     def update_live_data(self):
         """
         Update the live scores and game states
+        With shared state, only the leader process fetches; the others read its result
         """
+        shared = self.shared_state
+        if shared is not None and not shared.acquire_leadership():
+            self.sync_shared_state()
+            return
         try:
-            new_data = self.get_live_scores_from_api()
-            self.live_matches = new_data
+            # Without a running leader, on-demand refreshes from other processes reuse fresh shared data
+            if shared is not None and not self.is_running and time.time() - shared.live_version()[1] < self.update_interval:
+                self.sync_shared_state()
+                return
+            with metrics.time("live_update_seconds", "Time to refresh live scores"):
+                new_data = self.get_live_scores_from_api()
+                if shared is not None:
+                    self.shared_version = shared.write_live(new_data)
+            self._apply_live_data(new_data)
+            metrics.inc("live_updates_total", 1, "Live score refreshes")
             print(f"[{datetime.now()}] Updated live scores for {len(new_data)} matches")
         except Exception as e:
+            metrics.inc("live_update_errors_total", 1, "Failed live score refreshes")
             print(f"Error updating live data: {str(e)}")
-    
+        finally:
+            if shared is not None and not self.is_running:
+                shared.release_leadership()
+
+    def sync_shared_state(self):
+        """
+        Apply live scores the leader process published since the last sync
+        """
+        try:
+            with self.sync_lock:
+                update = self.shared_state.read_live(newer_than=self.shared_version)
+                if update is not None:
+                    self.shared_version, new_data = update
+                    self._apply_live_data(new_data)
+        except Exception as e:
+            print(f"Error reading shared live data: {str(e)}")
+
+    def _apply_live_data(self, new_data):
+        previous = self.live_matches
+        self.live_matches = new_data
+        self._notify_status_changes(previous, new_data)
+        for callback in self.update_listeners:
+            try:
+                callback(new_data)
+            except Exception as e:
+                print(f"Error in update listener: {str(e)}")
+
+    def is_leader(self):
+        """
+        Whether this process runs the shared updater (always, without shared state)
+        """
+        return self.shared_state is None or self.shared_state.is_leader
+
+    def add_status_listener(self, callback):
+        """
+        Register callback(match_id, old_status, new_status, match), called
+        whenever a match changes status between two updates
+        """
+        self.status_listeners.append(callback)
+
+    def add_update_listener(self, callback):
+        """
+        Register callback(live_matches), called after every update
+        """
+        self.update_listeners.append(callback)
+
+    def add_history_listener(self, callback):
+        """
+        Register callback(records), called with the prediction records this process added
+        to the history; with shared state, records another process stored first are left out
+        """
+        self.history_listeners.append(callback)
+
+    def _notify_status_changes(self, previous, current):
+        """
+        Call status listeners for every match whose status changed
+        """
+        for match_id, match in current.items():
+            old_status = previous.get(match_id, {}).get('status')
+            if old_status == match['status']:
+                continue
+            for callback in self.status_listeners:
+                try:
+                    callback(match_id, old_status, match['status'], match)
+                except Exception as e:
+                    print(f"Error in status listener for {match_id}: {str(e)}")
+
     def start_auto_update(self):
         """
         Start the automatic update process
@@ -107,13 +206,15 @@ class LiveScoreUpdater:
             self.is_running = True
             self.update_live_data()  # Initial update
             
-            # Schedule periodic updates
+            # Schedule periodic updates; followers retry leadership on each tick
             schedule.every(self.update_interval).seconds.do(self.update_live_data)
             
             # Start scheduler in a separate thread
             def run_scheduler():
                 while self.is_running:
                     schedule.run_pending()
+                    if self.shared_state is not None and not self.shared_state.is_leader:
+                        self.sync_shared_state()
                     time.sleep(1)
             
             self.scheduler_thread = Thread(target=run_scheduler, daemon=True)
@@ -126,6 +227,8 @@ class LiveScoreUpdater:
         """
         self.is_running = False
         schedule.clear()
+        if self.shared_state is not None:
+            self.shared_state.release_leadership()
         print("Stopped live score auto-update")
     
     def get_match_details(self, match_id):
@@ -151,9 +254,14 @@ class LiveScoreUpdater:
             datetime.fromisoformat(v['last_update']) > one_hour_ago
         }
 
-    def track_prediction_result(self, prediction_id, match_id, predicted_outcome, actual_outcome, confidence, vip_section):
+    def track_prediction_result(self, prediction_id, match_id, predicted_outcome, actual_outcome, confidence, vip_section,
+                                probability=None, market="MatchResult", raw_confidence=None, raw_probability=None):
         """
         Track the result of a prediction to update history
+        Also feeds the calibration tables; probability is the model's 0-100
+        probability for predicted_outcome in the given market
+        When confidence and probability are calibrated outputs, pass the prediction's
+        raw_confidence and raw probability: the tables are fitted on those
         """
         # This would normally save to a database
         # For demo, we'll just store in memory
@@ -173,10 +281,49 @@ class LiveScoreUpdater:
             "predicted_at": datetime.now().isoformat(),
             "was_correct": was_correct
         }
+        if probability is not None:
+            prediction_record["market"] = market
+            prediction_record["probability"] = probability
 
-        self.prediction_history.append(prediction_record)
+        raw_confidence = confidence if raw_confidence is None else raw_confidence
+        raw_probability = probability if raw_probability is None else raw_probability
+        samples = [("confidence", vip_section, raw_confidence / 100, was_correct)]
+        if raw_probability is not None:
+            samples.append((market, vip_section, raw_probability / 100, was_correct))
+        self.record_prediction_results([prediction_record], samples)
         return prediction_record
 
+    def record_prediction_results(self, records, samples=()):
+        """
+        Append settled prediction records to the history in one step and feed
+        the calibration tables with (market, vip_section, probability 0-1, outcome) samples
+        Returns the records added; with shared state, records another process already
+        stored are left out. Calibration tables are per process, so samples are always recorded
+        """
+        with self.history_lock:
+            if self.shared_state is not None:
+                added = self.shared_state.append_history(records)
+                self._sync_history()
+            else:
+                added = list(records)
+                self.prediction_history.extend(records)
+        calibrator.record_many(samples)
+        if not added:
+            return added
+        for callback in self.history_listeners:
+            try:
+                callback(added)
+            except Exception as e:
+                print(f"Error in history listener: {str(e)}")
+        return added
+
+    def _sync_history(self):
+        """
+        Pull records other processes appended to the shared history; caller holds history_lock
+        """
+        records, self.history_seq = self.shared_state.read_history(after=self.history_seq)
+        self.prediction_history.extend(records)
+
     def get_prediction_history(self, days_back=30):
         """
         Get prediction history for the last N days
@@ -184,6 +331,10 @@ class LiveScoreUpdater:
         if not hasattr(self, 'prediction_history'):
             self.prediction_history = []
 
+        if self.shared_state is not None:
+            with self.history_lock:
+                self._sync_history()
+
         cutoff_date = datetime.now() - timedelta(days=days_back)
         recent_history = []
 
@@ -194,6 +345,28 @@ class LiveScoreUpdater:
 
         return recent_history
 
+    def snapshot_state(self):
+        """
+        Live matches and prediction history for warm-start snapshots
+        """
+        with self.history_lock:
+            history = list(self.prediction_history)
+        return {"live_matches": self.live_matches, "prediction_history": history, "saved_at": time.time()}
+
+    def restore_state(self, state):
+        """
+        Warm-start from a snapshot; state that is already populated is kept
+        With shared state the database already holds the history
+        Live matches are only restored from a snapshot younger than a few update
+        intervals; older scores would be published as current
+        """
+        with self.history_lock:
+            if self.shared_state is None and not self.prediction_history:
+                self.prediction_history = list(state.get("prediction_history", []))
+        age = time.time() - state.get("saved_at", 0)
+        if not self.live_matches and state.get("live_matches") and age <= self.restore_intervals * self.update_interval:
+            self._apply_live_data(state["live_matches"])
+
     def get_vip_prediction_history(self, vip_section, days_back=30):
         """
         Get prediction history for a specific VIP section
@@ -202,5 +375,19 @@ class LiveScoreUpdater:
         return [record for record in all_history if record['vip_section'] == vip_section]
 
 
-# Global instance for the app
-live_updater = LiveScoreUpdater()
\ No newline at end of file
+# Global instance for the app; set SAFEBET_SHARED_STATE_PATH to share it across worker processes
+shared_state_path = os.getenv("SAFEBET_SHARED_STATE_PATH")
+live_updater = LiveScoreUpdater(shared_state=SharedState(shared_state_path) if shared_state_path else None)
+
+
+def rate_finished_match(match_id, old_status, new_status, match):
+    """
+    Every process keeps its in-memory ratings current; only the leader rewrites the ratings file
+    """
+    team_ratings.on_status_change(match_id, old_status, new_status, match, save=live_updater.is_leader())
+
+
+live_updater.add_status_listener(rate_finished_match)
+if columnar_store is not None:
+    live_updater.add_history_listener(columnar_store.write_history)
+snapshot_manager.register("live", live_updater.snapshot_state, live_updater.restore_state)
\ No newline at end of file
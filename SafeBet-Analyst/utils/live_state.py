@@ -0,0 +1,86 @@
+"""
+SafeBet Analyst - Live State
+One shared, read-only view of the live match feed for every Streamlit entry point
+and session; the feed is refreshed at most once per update interval, not per render
+"""
+
+import time
+from threading import Lock
+from types import MappingProxyType
+from utils.live_score_updater import live_updater
+
+
+class LiveSnapshot:
+    """
+    Immutable live matches as of one update; version increases with every update
+    """
+    __slots__ = ("matches", "version", "updated_at")
+
+    def __init__(self, matches, version, updated_at):
+        self.matches = MappingProxyType({match_id: MappingProxyType(dict(match)) for match_id, match in matches.items()})
+        self.version = version
+        self.updated_at = updated_at
+
+    def get(self, match_id):
+        return self.matches.get(match_id)
+
+    def by_status(self, status):
+        return {match_id: match for match_id, match in self.matches.items() if match['status'] == status}
+
+    def live(self):
+        return self.by_status('LIVE')
+
+    def finished(self):
+        return self.by_status('FINISHED')
+
+
+class LiveStateService:
+    def __init__(self, updater=None):
+        self.updater = updater or live_updater
+        self.refresh_lock = Lock()
+        self._snapshot = LiveSnapshot({}, 0, None)
+        self.updater.add_update_listener(self.publish)
+
+    def publish(self, live_matches):
+        """
+        LiveScoreUpdater update listener: swap in a new snapshot
+        """
+        self._snapshot = LiveSnapshot(live_matches, self._snapshot.version + 1, time.monotonic())
+
+    def current(self):
+        """
+        Latest snapshot without refreshing the feed
+        """
+        return self._snapshot
+
+    def snapshot(self):
+        """
+        Latest snapshot, refreshing the feed first when it is older than one
+        update interval and the auto-updater is not keeping it fresh
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        return self.refresh(if_older_than=snapshot.version)
+
+    def refresh(self, if_older_than=None):
+        """
+        Refresh the feed now; concurrent callers share a single refresh
+        """
+        seen = self._snapshot.version if if_older_than is None else if_older_than
+        with self.refresh_lock:
+            # Another caller refreshed while we waited for the lock
+            if self._snapshot.version == seen:
+                self.updater.update_live_data()
+        return self._snapshot
+
+    def _is_fresh(self, snapshot):
+        if snapshot.updated_at is None:
+            return False
+        if self.updater.is_running:
+            return True
+        return time.monotonic() - snapshot.updated_at < self.updater.update_interval
+
+
+# Global instance shared by both Streamlit entry points
+live_state = LiveStateService()
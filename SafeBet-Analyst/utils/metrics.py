@@ -0,0 +1,326 @@
+"""
+SafeBet Analyst - Metrics Module
+Lightweight counters and histograms for the hot paths (scraping, LLM calls,
+predictions and live updates), exported in Prometheus text format
+"""
+
+import os
+import time
+import threading
+from threading import Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Latency buckets in seconds, from fast local work up to slow page loads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    """
+    Turn a labels dict into a hashable, ordered key
+    """
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _escape(value, quotes=True):
+    """
+    Escape a label value (or, without quotes, HELP text) for the Prometheus text format
+    """
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _format_labels(key, extra=None):
+    """
+    Format a label key as a Prometheus label set
+    """
+    pairs = list(key) + (list(extra) if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def _items(self):
+        """
+        Copy of the series taken under the lock; other threads may add label sets meanwhile
+        """
+        with self._lock:
+            return sorted(self.values.items())
+
+    def render(self):
+        lines = []
+        for key, value in self._items():
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+    def snapshot(self):
+        return [
+            {"metric": self.name, "type": self.kind, "labels": dict(key), "count": value, "sum": None, "avg": None}
+            for key, value in self._items()
+        ]
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # label key -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self.series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def _items(self):
+        """
+        Copy of the series taken under the lock; other threads may add label sets meanwhile
+        """
+        with self._lock:
+            return sorted((key, (list(bucket_counts), total, count))
+                          for key, (bucket_counts, total, count) in self.series.items())
+
+    def render(self):
+        lines = []
+        for key, (bucket_counts, total, count) in self._items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    def snapshot(self):
+        return [
+            {
+                "metric": self.name,
+                "type": self.kind,
+                "labels": dict(key),
+                "count": count,
+                "sum": round(total, 4),
+                "avg": round(total / count, 4) if count else 0.0
+            }
+            for key, (_, total, count) in self._items()
+        ]
+
+
+class _NullTimer:
+    """
+    Shared no-op timer handed out while metrics are disabled
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """
+    Context manager that observes its elapsed time into a histogram
+    """
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False, prefix="safebet_"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _get(self, cls, name, help_text, **kwargs):
+        full_name = self.prefix + name
+        metric = self.metrics.get(full_name)
+        if metric is None:
+            with self._lock:
+                metric = self.metrics.get(full_name)
+                if metric is None:
+                    metric = cls(full_name, help_text, **kwargs)
+                    self.metrics[full_name] = metric
+        return metric
+
+    def inc(self, name, amount=1, help_text="", **labels):
+        """
+        Increment a counter (no-op while disabled)
+        """
+        if not self.enabled:
+            return
+        self._get(Counter, name, help_text).inc(amount, **labels)
+
+    def observe(self, name, value, help_text="", **labels):
+        """
+        Record a value into a histogram (no-op while disabled)
+        """
+        if not self.enabled:
+            return
+        self._get(Histogram, name, help_text).observe(value, **labels)
+
+    def time(self, name, help_text="", **labels):
+        """
+        Time a block of code into a histogram, e.g. `with metrics.time("live_update_seconds"):`
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self._get(Histogram, name, help_text), labels)
+
+    def timed(self, name, help_text="", **labels):
+        """
+        Decorator version of time() for whole functions
+        """
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.time(name, help_text, **labels):
+                    return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            return wrapper
+        return decorator
+
+    def _metrics(self):
+        """
+        (name, metric) pairs in name order, copied under the lock
+        """
+        with self._lock:
+            return sorted(self.metrics.items())
+
+    def render_prometheus(self):
+        """
+        Render all metrics in the Prometheus text exposition format
+        """
+        lines = []
+        for name, metric in self._metrics():
+            if metric.help_text:
+                lines.append(f"# HELP {name} {_escape(metric.help_text, quotes=False)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def snapshot(self):
+        """
+        Get a flat list of metric series for display
+        """
+        rows = []
+        for _, metric in self._metrics():
+            rows.extend(metric.snapshot())
+        return rows
+
+    def dump(self, path):
+        """
+        Write the Prometheus text to a file (e.g. for the node-exporter textfile collector)
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        """
+        Drop all recorded metrics
+        """
+        with self._lock:
+            self.metrics = {}
+
+    def start_http_server(self, port=9108, host="0.0.0.0"):
+        """
+        Serve the metrics at /metrics from a background thread
+        """
+        if self._server is not None:
+            return self._server
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"Serving metrics on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server
+
+    def stop_http_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Global registry for the app, enabled with SAFEBET_METRICS=1
+metrics = MetricsRegistry(enabled=os.getenv("SAFEBET_METRICS", "").lower() in ("1", "true", "yes"))
+
+if metrics.enabled and os.getenv("SAFEBET_METRICS_PORT"):
+    try:
+        metrics.start_http_server(int(os.getenv("SAFEBET_METRICS_PORT")))
+    except OSError as e:
+        # Another Streamlit worker already owns the port
+        print(f"Metrics endpoint not started: {str(e)}")
@@ -0,0 +1,219 @@
+"""
+SafeBet Analyst - Momentum
+Per-minute live stats kept in fixed-size ring buffers, one slot per live match,
+with running sums so windowed momentum (last 5/10/15 minutes) costs O(1) per update
+"""
+
+import threading
+import numpy as np
+from utils.live_score_updater import live_updater
+
+
+STATS = ("dangerous_attacks", "shots", "corners", "possession")
+COUNT_STATS = ("dangerous_attacks", "shots", "corners")
+WINDOWS = (5, 10, 15)
+# Contribution of each stat to attacking pressure
+MOMENTUM_WEIGHTS = {"dangerous_attacks": 1.0, "shots": 2.0, "corners": 1.0}
+
+
+class MomentumTracker:
+    def __init__(self, windows=WINDOWS, initial_slots=64):
+        self.windows = np.array(sorted(windows))
+        self.capacity = int(self.windows[-1])
+        self.weights = np.array([MOMENTUM_WEIGHTS.get(stat, 0.0) for stat in STATS])
+        self.slots = {}
+        self.free_slots = []
+        self.lock = threading.Lock()
+
+        # Per-minute values of each stat (home, away), shape (slots, minutes, stats, 2)
+        self.buffer = np.zeros((0, self.capacity, len(STATS), 2))
+        # Running sums per window, shape (slots, windows, stats, 2)
+        self.sums = np.zeros((0, len(self.windows), len(STATS), 2))
+        # Last cumulative totals seen in snapshots, shape (slots, stats, 2)
+        self.totals = np.zeros((0, len(STATS), 2))
+        # Whether a stat's totals have been seen; the first sighting is a baseline, not a delta
+        self.seen = np.zeros((0, len(STATS)), dtype=bool)
+        self.position = np.zeros(0, dtype=int)
+        self.minutes = np.zeros(0, dtype=int)
+        self.last_minute = np.zeros(0, dtype=int)
+        self._allocate(initial_slots)
+
+    def _allocate(self, n_slots):
+        """
+        Grow the arrays to n_slots matches, keeping existing data
+        """
+        extra = n_slots - len(self.buffer)
+        self.buffer = np.concatenate([self.buffer, np.zeros((extra,) + self.buffer.shape[1:])])
+        self.sums = np.concatenate([self.sums, np.zeros((extra,) + self.sums.shape[1:])])
+        self.totals = np.concatenate([self.totals, np.zeros((extra,) + self.totals.shape[1:])])
+        self.seen = np.concatenate([self.seen, np.zeros((extra, len(STATS)), dtype=bool)])
+        self.position = np.concatenate([self.position, np.zeros(extra, dtype=int)])
+        self.minutes = np.concatenate([self.minutes, np.zeros(extra, dtype=int)])
+        self.last_minute = np.concatenate([self.last_minute, np.full(extra, -1)])
+        self.free_slots.extend(range(n_slots - 1, n_slots - extra - 1, -1))
+
+    def _slot(self, match_id):
+        slot = self.slots.get(match_id)
+        if slot is None:
+            if not self.free_slots:
+                self._allocate(2 * len(self.buffer))
+            slot = self.free_slots.pop()
+            self.slots[match_id] = slot
+        return slot
+
+    def _advance(self, slot):
+        """
+        Start a new minute: drop the value leaving each window and clear the new cell
+        """
+        position = (self.position[slot] + 1) % self.capacity
+        self.sums[slot] -= self.buffer[slot, (position - self.windows) % self.capacity]
+        self.buffer[slot, position] = 0
+        self.position[slot] = position
+        self.minutes[slot] += 1
+
+    def _set_current(self, slot, row):
+        """
+        Replace the current minute's values; every window contains the current minute
+        """
+        position = self.position[slot]
+        self.sums[slot] += row - self.buffer[slot, position]
+        self.buffer[slot, position] = row
+
+    def record_minute(self, match_id, minute_stats):
+        """
+        Append one minute of stats, e.g. {"shots": {"home": 1, "away": 0}, "possession": {"home": 55, "away": 45}}
+        """
+        with self.lock:
+            slot = self._slot(match_id)
+            if self.minutes[slot]:
+                self._advance(slot)
+            else:
+                self.minutes[slot] = 1
+            self._set_current(slot, self._row(minute_stats))
+
+    def record_snapshot(self, match_id, live_data):
+        """
+        Record a live data snapshot with cumulative counts and the current minute
+        Counts are turned into per-minute deltas; possession is taken as the current level
+        The first counts seen for a match already in progress are its baseline, not one minute's activity
+        """
+        try:
+            minute = int(live_data.get('minute', 0))
+        except (TypeError, ValueError):
+            return
+
+        with self.lock:
+            slot = self._slot(match_id)
+            if self.minutes[slot] == 0:
+                self.minutes[slot] = 1
+            # Minutes without a snapshot count as quiet minutes at the last known possession
+            elapsed = minute - self.last_minute[slot] if self.last_minute[slot] >= 0 else 0
+            possession = STATS.index("possession")
+            quiet = np.zeros((len(STATS), 2))
+            quiet[possession] = self.buffer[slot, self.position[slot], possession]
+            for _ in range(min(max(elapsed, 0), self.capacity)):
+                self._advance(slot)
+                self._set_current(slot, quiet)
+            self.last_minute[slot] = max(minute, self.last_minute[slot])
+
+            totals = self._row(live_data)
+            row = self.buffer[slot, self.position[slot]].copy()
+            for i, stat in enumerate(STATS):
+                if stat not in live_data:
+                    continue
+                if stat in COUNT_STATS:
+                    if self.seen[slot, i]:
+                        row[i] += np.maximum(totals[i] - self.totals[slot, i], 0)
+                    self.totals[slot, i] = totals[i]
+                    self.seen[slot, i] = True
+                else:
+                    row[i] = totals[i]
+            self._set_current(slot, row)
+
+    def _row(self, stats):
+        row = np.zeros((len(STATS), 2))
+        for i, stat in enumerate(STATS):
+            values = stats.get(stat) or {}
+            row[i] = (values.get('home', 0), values.get('away', 0))
+        return row
+
+    def remove(self, match_id):
+        """
+        Free a match's slot, e.g. once it has finished
+        """
+        with self.lock:
+            slot = self.slots.pop(match_id, None)
+            if slot is None:
+                return
+            self.buffer[slot] = 0
+            self.sums[slot] = 0
+            self.totals[slot] = 0
+            self.seen[slot] = False
+            self.position[slot] = 0
+            self.minutes[slot] = 0
+            self.last_minute[slot] = -1
+            self.free_slots.append(slot)
+
+    def _window_index(self, window):
+        w = int(np.searchsorted(self.windows, window))
+        if w == len(self.windows) or self.windows[w] != window:
+            raise ValueError(f"window must be one of {self.windows.tolist()}")
+        return w
+
+    def window_stats(self, match_id, window=10):
+        """
+        Stat totals over the last `window` minutes (possession as the average)
+        None when the match is not tracked
+        """
+        slot = self.slots.get(match_id)
+        if slot is None:
+            return None
+        sums = self.sums[slot, self._window_index(window)]
+        filled = max(1, min(self.minutes[slot], window))
+        stats = {stat: {"home": float(sums[i, 0]), "away": float(sums[i, 1])} for i, stat in enumerate(COUNT_STATS)}
+        possession = STATS.index("possession")
+        stats["possession"] = {"home": round(float(sums[possession, 0]) / filled, 1), "away": round(float(sums[possession, 1]) / filled, 1)}
+        return stats
+
+    def momentum(self, match_id, window=10):
+        """
+        Share of attacking pressure over the last `window` minutes, like calculate_momentum_factor
+        """
+        stats = self.window_stats(match_id, window)
+        if stats is None:
+            return None
+        home = sum(stats[stat]["home"] * weight for stat, weight in MOMENTUM_WEIGHTS.items())
+        away = sum(stats[stat]["away"] * weight for stat, weight in MOMENTUM_WEIGHTS.items())
+        if home + away == 0:
+            return {"home": 50, "away": 50, "window": window, "stats": stats}
+        return {"home": round(home / (home + away) * 100, 1), "away": round(away / (home + away) * 100, 1),
+                "window": window, "stats": stats}
+
+    def momentum_all(self, window=10):
+        """
+        Home momentum share (0-100) for every tracked match in one pass
+        Returns (match_ids, array)
+        """
+        w = self._window_index(window)
+        match_ids = list(self.slots)
+        slots = np.array([self.slots[match_id] for match_id in match_ids], dtype=int)
+        pressure = np.einsum("nsk,s->nk", self.sums[slots, w], self.weights) if len(slots) else np.zeros((0, 2))
+        total = pressure.sum(axis=1)
+        share = np.divide(pressure[:, 0], total, out=np.full(len(slots), 0.5), where=total > 0)
+        return match_ids, np.round(share * 100, 1)
+
+    def on_update(self, live_matches):
+        """
+        LiveScoreUpdater update listener: record live matches that carry stats and free finished ones
+        """
+        for match_id, match in live_matches.items():
+            if match['status'] == "LIVE":
+                if any(stat in match for stat in STATS):
+                    self.record_snapshot(match_id, match)
+            elif match_id in self.slots:
+                self.remove(match_id)
+
+
+# Global instance fed by the app's live score updater
+momentum_tracker = MomentumTracker()
+live_updater.add_update_listener(momentum_tracker.on_update)
@@ -0,0 +1,173 @@
+"""
+SafeBet Analyst - Rerun Profiler
+Opt-in profiling of a single Streamlit rerun: cProfile hotspots plus a sampling
+profiler that writes flame-graph compatible (collapsed stack) output per rerun
+"""
+
+import os
+import sys
+import time
+import io
+import cProfile
+import pstats
+import threading
+from threading import Thread
+from datetime import datetime
+
+
+def profiling_requested(query_params=None):
+    """
+    Check whether profiling was asked for via SAFEBET_PROFILE=1 or ?profile=1
+    """
+    if os.getenv("SAFEBET_PROFILE", "").lower() in ("1", "true", "yes"):
+        return True
+    if query_params is not None:
+        value = query_params.get("profile")
+        if isinstance(value, list):
+            value = value[0] if value else None
+        return str(value).lower() in ("1", "true", "yes")
+    return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.profiler.span_stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.profiler.span_stack.pop()
+        self.profiler.span_times[self.name] = self.profiler.span_times.get(self.name, 0.0) + elapsed
+        return False
+
+
+class RerunProfiler:
+    def __init__(self, enabled=False, output_dir=None, sample_interval=0.005, top_n=15):
+        self.enabled = enabled
+        self.output_dir = output_dir or os.getenv("SAFEBET_PROFILE_DIR", "profiles")
+        self.sample_interval = sample_interval
+        self.top_n = top_n
+        self.span_stack = []
+        self.span_times = {}
+        self.samples = {}
+        self._profile = None
+        self._sampler = None
+        self._sampling = False
+        self._target_thread = None
+        self._started_at = None
+
+    @classmethod
+    def from_request(cls, query_params=None):
+        """
+        Build a profiler that is only enabled when profiling was requested
+        """
+        return cls(enabled=profiling_requested(query_params))
+
+    def start(self):
+        """
+        Start profiling the calling (script) thread
+        """
+        if not self.enabled:
+            return
+        self._started_at = datetime.now()
+        self._target_thread = threading.get_ident()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self._sampling = True
+        self._sampler = Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+
+    def span(self, name):
+        """
+        Mark a named section of the rerun, e.g. `with profiler.span("show_dashboard"):`
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def _sample_loop(self):
+        """
+        Periodically record the script thread's stack, prefixed with the active spans
+        """
+        while self._sampling:
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                key = ";".join(["rerun"] + list(self.span_stack) + stack)
+                self.samples[key] = self.samples.get(key, 0) + 1
+            time.sleep(self.sample_interval)
+
+    def finish(self):
+        """
+        Stop profiling, write the per-rerun output files and return a report
+        """
+        if not self.enabled or self._profile is None:
+            return None
+
+        self._profile.disable()
+        self._sampling = False
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+
+        stats = pstats.Stats(self._profile)
+        hotspots = []
+        for (filename, line, func), (cc, nc, tottime, cumtime, callers) in stats.stats.items():
+            hotspots.append({
+                "function": f"{func} ({os.path.basename(filename)}:{line})",
+                "calls": nc,
+                "own_time": round(tottime, 4),
+                "cumulative_time": round(cumtime, 4)
+            })
+        hotspots.sort(key=lambda h: h["own_time"], reverse=True)
+        hotspots = hotspots[:self.top_n]
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = self._started_at.strftime("%Y%m%d-%H%M%S-%f")
+        folded_path = os.path.join(self.output_dir, f"rerun-{stamp}.folded")
+        summary_path = os.path.join(self.output_dir, f"rerun-{stamp}.txt")
+
+        # Collapsed stacks: one "frame;frame;frame count" line per unique stack
+        with open(folded_path, "w") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        with open(summary_path, "w") as f:
+            f.write(f"Rerun profile {self._started_at.isoformat()}\n\n")
+            f.write("Sections (wall time, s):\n")
+            for name, seconds in sorted(self.span_times.items(), key=lambda x: x[1], reverse=True):
+                f.write(f"  {seconds:10.4f}  {name}\n")
+            f.write("\n")
+            buffer = io.StringIO()
+            pstats.Stats(self._profile, stream=buffer).sort_stats("tottime").print_stats(self.top_n)
+            f.write(buffer.getvalue())
+
+        self._profile = None
+        return {
+            "sections": {name: round(seconds, 4) for name, seconds in self.span_times.items()},
+            "hotspots": hotspots,
+            "samples": sum(self.samples.values()),
+            "folded_path": folded_path,
+            "summary_path": summary_path
+        }
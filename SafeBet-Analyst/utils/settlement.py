@@ -0,0 +1,138 @@
+"""
+SafeBet Analyst - Settlement
+Settles every stored prediction and market for a match as soon as the live
+score updater reports it FINISHED
+"""
+
+import threading
+from datetime import datetime
+from utils.metrics import metrics
+from utils.live_score_updater import live_updater
+
+
+def settle_markets(betting_markets, home_goals, away_goals):
+    """
+    Resolve the 1X2, Double Chance, Over/Under, BTTS and correct score selections
+    of a prediction's betting markets against a final score
+    Returns (market, selection, probability 0-100, won) tuples
+    """
+    total_goals = home_goals + away_goals
+    result = "Win" if home_goals > away_goals else "Lose" if home_goals < away_goals else "Draw"
+    settled = []
+
+    for selection, probability in betting_markets.get("MatchResult", {}).items():
+        settled.append(("MatchResult", selection, probability, selection == result))
+
+    double_chance = {"TeamA/Draw": result != "Lose", "TeamB/Draw": result != "Win", "TeamA/TeamB": result != "Draw"}
+    for selection, probability in betting_markets.get("DoubleChance", {}).items():
+        settled.append(("DoubleChance", selection, probability, double_chance[selection]))
+
+    for line, sides in betting_markets.get("OverUnder", {}).items():
+        over = total_goals > float(line)
+        for side, probability in sides.items():
+            settled.append((f"OverUnder {line}", side, probability, over == (side == "Over")))
+
+    both_scored = home_goals > 0 and away_goals > 0
+    for side, probability in betting_markets.get("BTTS", {}).items():
+        settled.append(("BTTS", side, probability, both_scored == (side == "Yes")))
+
+    final_score = f"{home_goals}-{away_goals}"
+    for score, probability in betting_markets.get("CorrectScores", {}).items():
+        settled.append(("CorrectScore", score, probability, score == final_score))
+
+    return settled
+
+
+# MatchResult selections and the prediction's matching raw probabilities
+RAW_MATCH_RESULT = {"Win": "home_win", "Draw": "draw", "Lose": "away_win"}
+
+
+def calibration_samples(prediction, vip_section, settled, was_correct):
+    """
+    Calibration samples of a settled prediction, built from the model's pre-calibration
+    raw_confidence and raw MatchResult probabilities; calibrated outputs are never fed
+    back into the tables that produced them
+    """
+    raw_probabilities = prediction.get('raw_probabilities', {})
+    samples = [("confidence", vip_section, prediction.get('raw_confidence', prediction['confidence']) / 100, was_correct)]
+    for market, selection, probability, won in settled:
+        if market == "MatchResult":
+            probability = raw_probabilities.get(RAW_MATCH_RESULT[selection], probability)
+        samples.append((market, vip_section, probability / 100, won))
+    return samples
+
+
+class PredictionSettler:
+    def __init__(self, updater=None):
+        self.updater = updater or live_updater
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def register(self, prediction, vip_section=None):
+        """
+        Store a prediction for settlement; a newer prediction for the same
+        match and VIP section replaces the older one
+        """
+        with self.lock:
+            self.pending.setdefault(prediction['match_id'], {})[vip_section] = (prediction, datetime.now().isoformat())
+
+    def pending_count(self):
+        with self.lock:
+            return sum(len(predictions) for predictions in self.pending.values())
+
+    def settle(self, match_id, home_goals, away_goals):
+        """
+        Settle all stored predictions for a match and write them to the history in one step
+        Returns the history records added by this process
+        """
+        with self.lock:
+            predictions = self.pending.pop(match_id, {})
+        if not predictions:
+            return []
+
+        with metrics.time("settlement_seconds", "Time to settle a finished match"):
+            records, samples = [], []
+            actual_score = f"{home_goals}-{away_goals}"
+            for vip_section, (prediction, predicted_at) in predictions.items():
+                settled = settle_markets(prediction['betting_markets'], home_goals, away_goals)
+                match_result = prediction['betting_markets']['MatchResult']
+                predicted_outcome = max(match_result, key=match_result.get)
+                actual_outcome = next(selection for market, selection, _, won in settled if market == "MatchResult" and won)
+
+                records.append({
+                    "prediction_id": f"{match_id}:{vip_section or 'all'}",
+                    "match_id": match_id,
+                    "match": prediction['match'],
+                    "predicted_outcome": predicted_outcome,
+                    "actual_outcome": actual_outcome,
+                    "confidence": prediction['confidence'],
+                    "vip_section": vip_section,
+                    "predicted_at": predicted_at,
+                    "settled_at": datetime.now().isoformat(),
+                    "actual_score": actual_score,
+                    "was_correct": predicted_outcome == actual_outcome,
+                    "market": "MatchResult",
+                    "probability": match_result[predicted_outcome],
+                    "market_results": [
+                        {"market": market, "selection": selection, "probability": probability, "won": won}
+                        for market, selection, probability, won in settled
+                    ]
+                })
+                samples.extend(calibration_samples(prediction, vip_section, settled, predicted_outcome == actual_outcome))
+
+            # Other app processes settle the same match; only the records this one added count
+            records = self.updater.record_prediction_results(records, samples)
+        metrics.inc("settled_predictions_total", len(records), "Predictions settled from finished matches")
+        return records
+
+    def on_status_change(self, match_id, old_status, new_status, match):
+        """
+        LiveScoreUpdater status listener: settle matches when they finish
+        """
+        if new_status == "FINISHED" and old_status != "FINISHED":
+            self.settle(match_id, match.get('home_score', 0), match.get('away_score', 0))
+
+
+# Global instance wired to the app's live score updater
+settler = PredictionSettler()
+live_updater.add_status_listener(settler.on_status_change)
@@ -0,0 +1,134 @@
+"""
+SafeBet Analyst - Shared State
+Live scores and prediction history shared by several app processes through a
+SQLite database in WAL mode, plus a file lock electing the one process that
+runs the live score updater
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process acts as leader
+    fcntl = None
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS live_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    matches TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prediction_history (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    prediction_id TEXT UNIQUE,
+    record TEXT NOT NULL
+);
+"""
+
+
+class SharedState:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.lock_file = None
+        self.is_leader = False
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """
+        One connection per thread; WAL lets readers proceed while the leader writes
+        """
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def acquire_leadership(self):
+        """
+        Try to become the process that runs the updater; never blocks
+        The lock is released when the process exits, letting another take over
+        """
+        if self.is_leader:
+            return True
+        if fcntl is None:
+            self.is_leader = True
+            return True
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        self.is_leader = True
+        return True
+
+    def release_leadership(self):
+        if self.lock_file is not None:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
+        self.is_leader = False
+
+    def write_live(self, matches):
+        """
+        Replace the shared live matches; returns the new version
+        """
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO live_state (id, version, updated_at, matches) VALUES (1, 1, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at, "
+                "matches = excluded.matches",
+                (time.time(), json.dumps(matches))
+            )
+            return conn.execute("SELECT version FROM live_state WHERE id = 1").fetchone()[0]
+
+    def live_version(self):
+        """
+        (version, updated_at epoch seconds) of the shared live matches; (0, 0.0) before the first write
+        """
+        row = self._connection().execute("SELECT version, updated_at FROM live_state WHERE id = 1").fetchone()
+        return row if row else (0, 0.0)
+
+    def read_live(self, newer_than=0):
+        """
+        (version, matches), or None when the shared version is not newer than newer_than
+        """
+        row = self._connection().execute(
+            "SELECT version, matches FROM live_state WHERE id = 1 AND version > ?", (newer_than,)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def append_history(self, records):
+        """
+        Append prediction records; a prediction_id already stored by any process is skipped
+        Returns the records this call inserted
+        """
+        inserted = []
+        with self._connection() as conn:
+            for record in records:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO prediction_history (prediction_id, record) VALUES (?, ?)",
+                    (record.get("prediction_id"), json.dumps(record))
+                )
+                if cursor.rowcount:
+                    inserted.append(record)
+        return inserted
+
+    def read_history(self, after=0):
+        """
+        (records appended after sequence number `after`, last sequence number)
+        """
+        rows = self._connection().execute(
+            "SELECT seq, record FROM prediction_history WHERE seq > ? ORDER BY seq", (after,)
+        ).fetchall()
+        return [json.loads(record) for _, record in rows], (rows[-1][0] if rows else after)
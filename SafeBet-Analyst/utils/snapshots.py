@@ -0,0 +1,136 @@
+"""
+SafeBet Analyst - Warm-Start Snapshots
+Periodically writes live scores, predictions and cached analyses to one compact
+file and restores them at startup, so the first pages after a restart are warm
+"""
+
+import os
+import json
+import time
+import uuid
+import zlib
+import struct
+import atexit
+import threading
+from utils.metrics import metrics
+
+
+# File layout: magic, format version (uint16), zlib-compressed JSON payload
+SNAPSHOT_MAGIC = b"SBWS"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct(">4sH")
+
+
+def write_snapshot(path, sections):
+    """
+    Atomically write {section name: JSON-serializable state} to path
+    """
+    payload = zlib.compress(json.dumps({"saved_at": time.time(), "sections": sections}, default=str).encode("utf-8"), 6)
+    # Per-process temp file: app processes sharing a directory never truncate each other's
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """
+    Snapshot payload {"saved_at", "sections"}, or None when the file is missing,
+    corrupt or written by another snapshot format version
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        print(f"Ignoring snapshot {path}: format version {version}, expected {SNAPSHOT_VERSION}")
+        return None
+    try:
+        return json.loads(zlib.decompress(data[HEADER.size:]).decode("utf-8"))
+    except Exception as e:
+        print(f"Error reading snapshot {path}: {str(e)}")
+        return None
+
+
+class SnapshotManager:
+    def __init__(self, path, interval=60):
+        self.path = path
+        self.interval = interval
+        self.sections = {}
+        self.started = False
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def register(self, name, dump, restore):
+        """
+        Add a section: dump() returns its JSON-serializable state, restore(state) loads it back
+        """
+        self.sections[name] = (dump, restore)
+
+    def save(self):
+        """
+        Write every section to disk; a failing section is left out of the snapshot
+        """
+        state = {}
+        for name, (dump, _) in self.sections.items():
+            try:
+                state[name] = dump()
+            except Exception as e:
+                print(f"Error dumping snapshot section {name}: {str(e)}")
+        try:
+            with metrics.time("snapshot_save_seconds", "Time to write the warm-start snapshot"):
+                write_snapshot(self.path, state)
+        except Exception as e:
+            print(f"Error writing snapshot {self.path}: {str(e)}")
+
+    def restore(self):
+        """
+        Load the sections found in the snapshot; returns the names restored
+        """
+        with metrics.time("snapshot_restore_seconds", "Time to restore the warm-start snapshot"):
+            snapshot = read_snapshot(self.path)
+            if snapshot is None:
+                return []
+            restored = []
+            for name, state in snapshot["sections"].items():
+                if name not in self.sections:
+                    continue
+                try:
+                    self.sections[name][1](state)
+                    restored.append(name)
+                except Exception as e:
+                    print(f"Error restoring snapshot section {name}: {str(e)}")
+        print(f"Restored {', '.join(restored) or 'nothing'} from snapshot saved {time.time() - snapshot['saved_at']:.0f}s ago")
+        return restored
+
+    def start(self):
+        """
+        Restore once, then save every interval and at exit; later calls are no-ops
+        """
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        self.restore()
+
+        def run():
+            while not self.stop_event.wait(self.interval):
+                self.save()
+
+        threading.Thread(target=run, daemon=True, name="safebet-snapshots").start()
+        atexit.register(self.save)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+# Global instance; each stateful module registers its own section
+snapshot_manager = SnapshotManager(
+    os.getenv("SAFEBET_SNAPSHOT_PATH", "warm_state.snap"),
+    interval=int(os.getenv("SAFEBET_SNAPSHOT_INTERVAL", "60"))
+)
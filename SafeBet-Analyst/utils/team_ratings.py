@@ -0,0 +1,132 @@
+"""
+SafeBet Analyst - Team Ratings
+Persistent Elo ratings per team, updated incrementally as results come in
+"""
+
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+
+
+class TeamRatingStore:
+    def __init__(self, path=None, k_factor=20.0, home_advantage=60.0, initial_rating=1500.0):
+        """
+        path: JSON file the ratings are loaded from and saved to (None keeps them in memory)
+        home_advantage: Elo points added to the home side when computing expectations
+        """
+        self.path = path
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.initial_rating = initial_rating
+        self.ratings = {}
+        self.games = {}
+        self.processed = set()
+        self.lock = threading.Lock()
+        if path:
+            self.load()
+
+    def rating(self, team):
+        """
+        Current rating of a team (initial rating for unseen teams)
+        """
+        return self.ratings.get(team, self.initial_rating)
+
+    def expected_home_score(self, home_team, away_team):
+        """
+        Elo expectation for the home side (win=1, draw=0.5)
+        """
+        diff = self.rating(away_team) - self.rating(home_team) - self.home_advantage
+        return 1 / (1 + 10 ** (diff / 400))
+
+    def probabilities(self, home_team, away_team, max_draw=0.3):
+        """
+        Home/draw/away probabilities from the rating gap; draws are likeliest between even sides
+        """
+        expected = self.expected_home_score(home_team, away_team)
+        draw = max_draw * (1 - abs(2 * expected - 1))
+        return {"home": expected - draw / 2, "draw": draw, "away": 1 - expected - draw / 2}
+
+    def record_result(self, match_id, home_team, away_team, home_goals, away_goals, save=True):
+        """
+        Apply one final result; results already recorded for match_id are ignored
+        Returns the home side's rating change
+        """
+        with self.lock:
+            if match_id is not None and match_id in self.processed:
+                return 0.0
+
+            expected = self.expected_home_score(home_team, away_team)
+            actual = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+            # Bigger wins move ratings further (World Football Elo goal multiplier)
+            margin = abs(home_goals - away_goals)
+            multiplier = 1.0 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8
+            delta = self.k_factor * multiplier * (actual - expected)
+
+            self.ratings[home_team] = self.rating(home_team) + delta
+            self.ratings[away_team] = self.rating(away_team) - delta
+            self.games[home_team] = self.games.get(home_team, 0) + 1
+            self.games[away_team] = self.games.get(away_team, 0) + 1
+            if match_id is not None:
+                self.processed.add(match_id)
+
+        if save and self.path:
+            self.save()
+        return delta
+
+    def on_status_change(self, match_id, old_status, new_status, match, save=True):
+        """
+        LiveScoreUpdater status listener: rate matches when they finish
+        """
+        if new_status == "FINISHED" and old_status != "FINISHED":
+            self.record_result(match_id, match['home_team'], match['away_team'],
+                               match.get('home_score', 0), match.get('away_score', 0), save=save)
+
+    def table(self):
+        """
+        Teams sorted by rating
+        """
+        return sorted(
+            ({"team": team, "rating": round(rating, 1), "games": self.games.get(team, 0)} for team, rating in self.ratings.items()),
+            key=lambda row: row["rating"], reverse=True
+        )
+
+    def load(self):
+        """
+        Load ratings from the JSON file if it exists
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.ratings = {team: float(r) for team, r in data.get("ratings", {}).items()}
+            self.games = data.get("games", {})
+            self.processed = set(data.get("processed", []))
+        except Exception as e:
+            print(f"Error loading team ratings from {self.path}: {str(e)}")
+
+    def save(self):
+        """
+        Write ratings atomically to the JSON file
+        """
+        with self.lock:
+            data = {
+                "ratings": self.ratings,
+                "games": self.games,
+                "processed": sorted(self.processed),
+                "updated_at": datetime.now().isoformat()
+            }
+        # Per-process temp file, so concurrent writers never rename each other's half-written file
+        temp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving team ratings to {self.path}: {str(e)}")
+
+
+# Global instance, persisted to SAFEBET_RATINGS_PATH (default team_ratings.json)
+team_ratings = TeamRatingStore(path=os.getenv("SAFEBET_RATINGS_PATH", "team_ratings.json"))